@@ -0,0 +1,174 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Fake FRED backend for benchmarks.
+
+Fake clients replace the CORBA clients below the client layers, so memoization, caches and other layers are measured
+as well. Responses are built by `webwhois.tests.get_registry_objects`. Each call sleeps for the configured latency
+and fails with the configured error rate.
+"""
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict
+
+from fred_idl.Registry.PublicRequest import INTERNAL_SERVER_ERROR as PUBLIC_REQUEST_INTERNAL_SERVER_ERROR
+from fred_idl.Registry.Whois import INTERNAL_SERVER_ERROR, OBJECT_NOT_FOUND
+
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+
+
+class FakeBackend(object):
+    """Base class of fake backend clients.
+
+    @ivar latency: Mean latency of a call in seconds.
+    @ivar jitter: Maximal deviation of the latency in seconds.
+    @ivar error_rate: Probability of a call failure.
+    @ivar calls: Numbers of calls by method names.
+    """
+
+    error_class = Exception  # type: Any
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = Counter()  # type: Counter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def total_calls(self) -> int:
+        """Return total number of calls."""
+        with self._lock:
+            return sum(self.calls.values())
+
+    def call(self, method_name: str) -> None:
+        """Account the call, wait for the latency and fail according to the error rate."""
+        with self._lock:
+            self.calls[method_name] += 1
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            failed = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise self.error_class()
+
+
+class FakeWhois(FakeBackend):
+    """Fake WHOIS backend with a single registry object of each type."""
+
+    error_class = INTERNAL_SERVER_ERROR
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        builder = GetRegistryObjectMixin()
+        self.objects = {
+            'contact': {'KONTAKT': builder._get_contact()},
+            'domain': {'fred.cz': builder._get_domain()},
+            'keyset': {'KEYSID-1': builder._get_keyset()},
+            'nsset': {'NSSET-1': builder._get_nsset()},
+            'registrar': {'REG-FRED_A': builder._get_registrar()},
+        }  # type: Dict[str, Dict[str, Any]]
+        self.status_descriptions = {
+            'contact': builder._get_contact_status(),
+            'domain': builder._get_domain_status(),
+            'keyset': builder._get_keyset_status(),
+            'nsset': builder._get_nsset_status(),
+        }
+        self.certifications = builder._get_registrar_certs()
+
+    def _get_object(self, object_type, method_name, handle):
+        self.call(method_name)
+        try:
+            return self.objects[object_type][handle]
+        except KeyError:
+            raise OBJECT_NOT_FOUND()
+
+    def get_contact_by_handle(self, handle):
+        return self._get_object('contact', 'get_contact_by_handle', handle)
+
+    def get_domain_by_handle(self, handle):
+        return self._get_object('domain', 'get_domain_by_handle', handle)
+
+    def get_keyset_by_handle(self, handle):
+        return self._get_object('keyset', 'get_keyset_by_handle', handle)
+
+    def get_nsset_by_handle(self, handle):
+        return self._get_object('nsset', 'get_nsset_by_handle', handle)
+
+    def get_registrar_by_handle(self, handle):
+        return self._get_object('registrar', 'get_registrar_by_handle', handle)
+
+    def _get_status_descriptions(self, object_type, method_name):
+        self.call(method_name)
+        return self.status_descriptions[object_type]
+
+    def get_contact_status_descriptions(self, lang):
+        return self._get_status_descriptions('contact', 'get_contact_status_descriptions')
+
+    def get_domain_status_descriptions(self, lang):
+        return self._get_status_descriptions('domain', 'get_domain_status_descriptions')
+
+    def get_keyset_status_descriptions(self, lang):
+        return self._get_status_descriptions('keyset', 'get_keyset_status_descriptions')
+
+    def get_nsset_status_descriptions(self, lang):
+        return self._get_status_descriptions('nsset', 'get_nsset_status_descriptions')
+
+    def get_managed_zone_list(self):
+        self.call('get_managed_zone_list')
+        return ['cz', '0.2.4.e164.arpa']
+
+    def get_registrars(self):
+        self.call('get_registrars')
+        return list(self.objects['registrar'].values())
+
+    def get_registrar_groups(self):
+        self.call('get_registrar_groups')
+        return []
+
+    def get_registrar_certification_list(self):
+        self.call('get_registrar_certification_list')
+        return self.certifications
+
+
+class FakePublicRequest(FakeBackend):
+    """Fake public request backend."""
+
+    error_class = PUBLIC_REQUEST_INTERNAL_SERVER_ERROR
+
+    def _create_request(self, method_name):
+        self.call(method_name)
+        return 42
+
+    def create_authinfo_request_registry_email(self, *args):
+        return self._create_request('create_authinfo_request_registry_email')
+
+    def create_authinfo_request_non_registry_email(self, *args):
+        return self._create_request('create_authinfo_request_non_registry_email')
+
+    def create_personal_info_request_registry_email(self, *args):
+        return self._create_request('create_personal_info_request_registry_email')
+
+    def create_personal_info_request_non_registry_email(self, *args):
+        return self._create_request('create_personal_info_request_non_registry_email')
+
+    def create_block_unblock_request(self, *args):
+        return self._create_request('create_block_unblock_request')
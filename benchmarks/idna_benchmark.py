@@ -0,0 +1,138 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Microbenchmark of IDNA conversions on NSSET pages with many name servers.
+
+Compares the memoized codec `webwhois.utils.idna_codec` with plain `idna` package, both for the `idn_decode`
+template filter alone and for whole NSSET detail pages rendered with a fake FRED backend. Run from the repository
+root, e.g.::
+
+    PYTHONPATH=.:$IDL_DIR python benchmarks/idna_benchmark.py --nameservers 40 --idn-ratio 0.25
+"""
+import argparse
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import django
+from django.conf import settings
+from run_benchmark import DJANGO_SETTINGS, percentile
+
+# Labels used to build names of name servers.
+ASCII_LABELS = ('ns', 'dns', 'a', 'b', 'nic', 'example', 'hosting', 'server')
+IDN_LABELS = ('háčkyčárky', 'příklad', 'žluťoučký', 'münchen', 'bücher', 'ελληνικά')
+ZONES = ('cz', 'com', 'net', 'org')
+
+
+def get_fqdns(count: int, idn_ratio: float) -> List[str]:
+    """Return names of name servers, IDN names are returned encoded in ASCII as they are stored in the registry."""
+    import idna
+
+    idn_count = int(round(count * idn_ratio))
+    fqdns = []
+    for index in range(count):
+        if index < idn_count:
+            label = idna.encode(IDN_LABELS[index % len(IDN_LABELS)]).decode()
+        else:
+            label = ASCII_LABELS[index % len(ASCII_LABELS)]
+        fqdns.append('ns{}.{}.{}'.format(index, label, ZONES[index % len(ZONES)]))
+    return fqdns
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Return statistics of durations of the function calls in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return OrderedDict((
+        ('mean_ms', round(sum(durations) / len(durations) * 1000, 4)),
+        ('p50_ms', round(percentile(durations, 50) * 1000, 4)),
+        ('p95_ms', round(percentile(durations, 95) * 1000, 4)),
+    ))
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    """Print a table with the results."""
+    row = '{:<22} {:>10} {:>10} {:>10}'
+    print(row.format('variant', 'mean ms', 'p50 ms', 'p95 ms'))
+    for name, stats in results.items():
+        print(row.format(name, stats['mean_ms'], stats['p50_ms'], stats['p95_ms']))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nameservers', type=int, default=40, help='number of name servers in the NSSET')
+    parser.add_argument('--idn-ratio', type=float, default=0.25, help='ratio of name servers with IDN names')
+    parser.add_argument('--repeat', type=int, default=500, help='number of measured runs of each variant')
+    args = parser.parse_args(argv)
+
+    settings.configure(**DJANGO_SETTINGS)
+    django.setup()
+
+    from unittest.mock import patch
+
+    import idna
+    from django.test import Client
+    from fake_backend import FakeWhois
+    from fred_idl.Registry.Whois import NameServer
+
+    from webwhois.templatetags.webwhois_filters import idn_decode
+    from webwhois.utils import WHOIS, idna_codec
+
+    fqdns = get_fqdns(args.nameservers, args.idn_ratio)
+    whois = FakeWhois()
+    nsset = whois.objects['nsset']['NSSET-1']
+    ip_addresses = nsset.nservers[0].ip_addresses
+    nsset.nservers = [NameServer(fqdn=fqdn, ip_addresses=ip_addresses) for fqdn in fqdns]
+
+    client = Client()
+
+    def _decode_names():
+        for fqdn in fqdns:
+            idn_decode(fqdn)
+
+    def _render_page():
+        response = client.get('/whois/nsset/NSSET-1/')
+        assert response.status_code == 200, response.status_code
+
+    results = OrderedDict()  # type: Dict[str, Dict[str, float]]
+    with patch.object(WHOIS, 'client', whois):
+        for name, function in (('filter', _decode_names), ('page', _render_page)):
+            with patch.object(idna_codec, 'decode', idna.decode):
+                function()
+                results['{} (idna)'.format(name)] = measure(function, args.repeat)
+
+            def _cold(function=function):
+                idna_codec.clear_cache()
+                function()
+
+            results['{} (codec, cold)'.format(name)] = measure(_cold, args.repeat)
+            results['{} (codec, warm)'.format(name)] = measure(function, args.repeat)
+
+    print('{} name servers, {} with IDN names'.format(len(fqdns), int(round(len(fqdns) * args.idn_ratio))))
+    print_results(results)
+    print('Cache: {}'.format(idna_codec.get_cache_info()['decode']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark of web whois views with a fake FRED backend.
+
+Runs a mix of requests through the Django test client and reports latency percentiles, requests per second and
+numbers of backend calls per request. Run from the repository root, e.g.::
+
+    PYTHONPATH=.:$IDL_DIR python benchmarks/run_benchmark.py --requests 2000 --latency 0.002 --output run.json
+"""
+import argparse
+import bisect
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import django
+from django.conf import settings
+
+DEFAULT_MIX = 'object=40,domain=25,contact=10,object_not_found=5,registrars=15,send_password=5'
+DJANGO_SETTINGS = {
+    'ALLOWED_HOSTS': ['testserver'],
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    'INSTALLED_APPS': ('django.contrib.contenttypes', 'django.contrib.auth', 'webwhois.apps.WebwhoisAppConfig'),
+    'LOGGING': {'version': 1, 'disable_existing_loggers': False,
+                'loggers': {'django.request': {'level': 'CRITICAL'}}},
+    'MIDDLEWARE': [],
+    'ROOT_URLCONF': 'webwhois.tests.urls',
+    'SECRET_KEY': 'benchmark',
+    'STATIC_URL': '/static/',
+    'TEMPLATES': [{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'APP_DIRS': True,
+        'OPTIONS': {'context_processors': ['django.template.context_processors.i18n',
+                                           'django.template.context_processors.static',
+                                           'django.template.context_processors.tz']},
+    }],
+    'USE_TZ': True,
+    'WEBWHOIS_LOGGER': None,
+}
+
+
+def _get(path: str) -> Callable:
+    def _request(client):
+        return client.get(path)
+    return _request
+
+
+def _send_password(client):
+    data = {'object_type': 'domain', 'handle': 'fred.cz', 'confirmation_method': 'signed_email',
+            'send_to_0': 'email_in_registry'}
+    return client.post('/whois/send-password/', data, follow=True)
+
+
+# Scenarios by their names.
+SCENARIOS = OrderedDict((
+    ('object', _get('/whois/object/fred.cz/')),
+    ('object_not_found', _get('/whois/object/missing.cz/')),
+    ('domain', _get('/whois/domain/fred.cz/')),
+    ('contact', _get('/whois/contact/KONTAKT/')),
+    ('nsset', _get('/whois/nsset/NSSET-1/')),
+    ('keyset', _get('/whois/keyset/KEYSID-1/')),
+    ('registrar', _get('/whois/registrar/REG-FRED_A/')),
+    ('registrars', _get('/whois/registrars/')),
+    ('api_domain', _get('/whois/api/domain/fred.cz/')),
+    ('send_password', _send_password),
+))
+
+
+def parse_mix(value: str) -> List[Tuple[str, int]]:
+    """Parse the mix of scenarios in the form ``name=weight,...``."""
+    mix = []
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError('Unknown scenario {!r}, choose from: {}.'.format(
+                name, ', '.join(SCENARIOS)))
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+def parse_setting(value: str) -> Tuple[str, Any]:
+    """Parse the Django setting in the form ``NAME=JSON``. Values which are not valid JSON are used as strings."""
+    name, _, raw_value = value.partition('=')
+    try:
+        return name, json.loads(raw_value)
+    except ValueError:
+        return name, raw_value
+
+
+def get_plan(mix: Sequence[Tuple[str, int]], requests: int, seed: Optional[int]) -> List[str]:
+    """Return names of scenarios in the order in which they are run."""
+    rand = random.Random(seed)
+    names = [name for name, _ in mix]
+    cumulative = []  # type: List[int]
+    for _, weight in mix:
+        cumulative.append((cumulative[-1] if cumulative else 0) + weight)
+    return [names[bisect.bisect_right(cumulative, rand.random() * cumulative[-1])] for _ in range(requests)]
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Return the percentile of the sorted values using the nearest rank method."""
+    if not values:
+        return 0.0
+    return values[max(int(math.ceil(percent / 100 * len(values))) - 1, 0)]
+
+
+def summarize(latencies: List[float], errors: int, statuses: Counter, elapsed: Optional[float],
+              backend_calls: Optional[int]) -> Dict[str, Any]:
+    """Return statistics of a set of requests.
+
+    Requests per second are only computed for the total, since requests of different scenarios are interleaved.
+    """
+    latencies = sorted(latencies)
+    count = len(latencies)
+    summary = OrderedDict((
+        ('requests', count),
+        ('errors', errors),
+        ('statuses', {str(status): number for status, number in sorted(statuses.items(), key=str)}),
+        ('mean_ms', round(sum(latencies) / count * 1000, 3) if count else 0.0),
+        ('p50_ms', round(percentile(latencies, 50) * 1000, 3)),
+        ('p95_ms', round(percentile(latencies, 95) * 1000, 3)),
+        ('p99_ms', round(percentile(latencies, 99) * 1000, 3)),
+        ('max_ms', round(latencies[-1] * 1000, 3) if count else 0.0),
+    ))  # type: Dict[str, Any]
+    if elapsed is not None:
+        summary['rps'] = round(count / elapsed, 1) if elapsed else 0.0
+    if backend_calls is not None:
+        summary['backend_calls_per_request'] = round(backend_calls / count, 3) if count else 0.0
+    return summary
+
+
+def run(plan: List[str], concurrency: int, backends: Sequence[Any]) -> Dict[str, Any]:
+    """Run the planned requests and return their statistics.
+
+    Backend calls of scenarios are only accounted if requests are not concurrent.
+    """
+    from django.test import Client
+
+    def _count_calls():
+        return sum(backend.total_calls for backend in backends)
+
+    results = {name: {'latencies': [], 'errors': 0, 'statuses': Counter(), 'calls': 0}
+               for name in set(plan)}  # type: Dict[str, Dict[str, Any]]
+    lock = threading.Lock()
+    queue = iter(plan)
+
+    def _worker():
+        client = Client()
+        while True:
+            with lock:
+                name = next(queue, None)
+            if name is None:
+                return
+            calls_before = _count_calls()
+            start = time.perf_counter()
+            try:
+                status = SCENARIOS[name](client).status_code
+            except Exception:
+                status = 'exception'
+            latency = time.perf_counter() - start
+            calls = _count_calls() - calls_before
+            with lock:
+                result = results[name]
+                result['latencies'].append(latency)
+                result['statuses'][status] += 1
+                result['calls'] += calls
+                if status == 'exception' or status >= 500:
+                    result['errors'] += 1
+
+    calls_start = _count_calls()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=_worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total_calls = _count_calls() - calls_start
+
+    scenarios = OrderedDict()
+    for name in sorted(results):
+        result = results[name]
+        scenarios[name] = summarize(result['latencies'], result['errors'], result['statuses'], None,
+                                    result['calls'] if concurrency == 1 else None)
+    total = summarize([latency for result in results.values() for latency in result['latencies']],
+                      sum(result['errors'] for result in results.values()),
+                      sum((result['statuses'] for result in results.values()), Counter()), elapsed, total_calls)
+    return OrderedDict((('scenarios', scenarios), ('total', total)))
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return descriptions of regressions against the baseline results."""
+    regressions = []
+    current = dict(results['scenarios'], total=results['total'])
+    previous = dict(baseline['scenarios'], total=baseline['total'])
+    for name, stats in current.items():
+        if name not in previous:
+            continue
+        base = previous[name]
+        if base['p95_ms'] and stats['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append('{}: p95 {} ms > {} ms'.format(name, stats['p95_ms'], base['p95_ms']))
+        if name == 'total' and stats['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append('{}: {} requests/s < {} requests/s'.format(name, stats['rps'], base['rps']))
+        if stats.get('backend_calls_per_request', 0) > base.get('backend_calls_per_request', math.inf):
+            regressions.append('{}: {} backend calls per request > {}'.format(
+                name, stats['backend_calls_per_request'], base['backend_calls_per_request']))
+    return regressions
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print a table with the results."""
+    header = '{:<18} {:>8} {:>7} {:>9} {:>9} {:>9} {:>10} {:>8}'
+    print(header.format('scenario', 'requests', 'errors', 'p50 ms', 'p95 ms', 'p99 ms', 'req/s', 'calls'))
+    rows = list(results['scenarios'].items()) + [('total', results['total'])]
+    for name, stats in rows:
+        print(header.format(name, stats['requests'], stats['errors'], stats['p50_ms'], stats['p95_ms'],
+                            stats['p99_ms'], stats.get('rps', '-'), stats.get('backend_calls_per_request', '-')))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000, help='number of measured requests')
+    parser.add_argument('--warmup', type=int, default=5, help='number of unmeasured requests of each scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='number of concurrent clients')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help='weights of scenarios, default: {}'.format(DEFAULT_MIX))
+    parser.add_argument('--latency', type=float, default=0.0, help='mean latency of backend calls in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='maximal deviation of the latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='probability of a backend call failure')
+    parser.add_argument('--seed', type=int, default=None, help='seed of random generators')
+    parser.add_argument('--setting', type=parse_setting, action='append', default=[], metavar='NAME=JSON',
+                        help='Django setting, e.g. WEBWHOIS_REQUEST_MEMO=true')
+    parser.add_argument('--output', help='path of a JSON file to store the results')
+    parser.add_argument('--baseline', help='path of a JSON file with results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='tolerated relative slowdown, default 0.1')
+    args = parser.parse_args(argv)
+
+    settings.configure(**dict(DJANGO_SETTINGS, **dict(args.setting)))
+    django.setup()
+
+    from unittest.mock import patch
+
+    from fake_backend import FakePublicRequest, FakeWhois
+
+    from webwhois.utils import PUBLIC_REQUEST, WHOIS
+
+    backend_options = {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                       'seed': args.seed}
+    whois = FakeWhois(**backend_options)
+    public_request = FakePublicRequest(**backend_options)
+    with patch.object(WHOIS, 'client', whois), patch.object(PUBLIC_REQUEST, 'client', public_request):
+        run([name for name, _ in args.mix for _ in range(args.warmup)], 1, [])
+        for backend in (whois, public_request):
+            backend.calls.clear()
+        results = run(get_plan(args.mix, args.requests, args.seed), args.concurrency, [whois, public_request])
+
+    results['meta'] = OrderedDict((
+        ('time', time.strftime('%Y-%m-%dT%H:%M:%S%z')),
+        ('python', platform.python_version()),
+        ('django', django.get_version()),
+        ('arguments', {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}),
+        ('backend_calls', dict(whois.calls + public_request.calls)),
+    ))
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print('Regression: {}'.format(regression))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
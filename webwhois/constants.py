@@ -28,3 +28,6 @@ STATUS_VALIDATED = 'validatedContact'
 
 SEND_TO_IN_REGISTRY = 'email_in_registry'
 SEND_TO_CUSTOM = 'custom_email'
+
+# Types of registry objects, which can be looked up by their handles.
+OBJECT_TYPES = frozenset(('contact', 'domain', 'keyset', 'nsset', 'registrar'))
@@ -16,6 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 from .public_request import BlockObjectForm, PersonalInfoForm, SendPasswordForm, UnblockObjectForm
-from .whois import WhoisForm
+from .whois import BulkLookupForm, WhoisForm
 
-__all__ = ['WhoisForm', 'SendPasswordForm', 'PersonalInfoForm', 'BlockObjectForm', 'UnblockObjectForm']
+__all__ = ['WhoisForm', 'BulkLookupForm', 'SendPasswordForm', 'PersonalInfoForm', 'BlockObjectForm',
+           'UnblockObjectForm']
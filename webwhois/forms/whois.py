@@ -15,12 +15,17 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+from collections import OrderedDict
+
 from django import forms
+from django.core.exceptions import ValidationError
 from django.core.validators import MaxLengthValidator
 from django.utils.functional import lazy
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
 
+from webwhois.settings import WEBWHOIS_SETTINGS
+
 
 class WhoisForm(forms.Form):
     """Whois form to enter HANDLE."""
@@ -29,3 +34,42 @@ class WhoisForm(forms.Form):
         label=lazy(lambda: mark_safe(_("Domain (without <em>www.</em> prefix) / Handle")), str)(),
         required=True, validators=[MaxLengthValidator(255)],
     )
+
+
+class BulkLookupForm(forms.Form):
+    """Form to enter handles to be looked up at once."""
+
+    FORMAT_NDJSON = 'ndjson'
+    FORMAT_CSV = 'csv'
+    FORMAT_CHOICES = ((FORMAT_NDJSON, 'NDJSON'), (FORMAT_CSV, 'CSV'))
+
+    handles = forms.CharField(label=_("Handles"), required=False, widget=forms.Textarea)
+    handles_file = forms.FileField(label=_("File with handles"), required=False)
+    format = forms.ChoiceField(label=_("Format"), choices=FORMAT_CHOICES, required=False)
+
+    def clean_handles_file(self):
+        handles_file = self.cleaned_data.get('handles_file')
+        if handles_file is None:
+            return ''
+        try:
+            return handles_file.read().decode('utf-8')
+        except UnicodeDecodeError:
+            raise ValidationError(_("File with handles must be encoded in UTF-8."), code='encoding')
+
+    def clean_format(self):
+        return self.cleaned_data.get('format') or self.FORMAT_NDJSON
+
+    def clean(self):
+        cleaned_data = super(BulkLookupForm, self).clean()
+        if self.errors:
+            return cleaned_data
+        # Handles are separated by whitespaces, duplicates are removed.
+        text = '{} {}'.format(cleaned_data.get('handles', ''), cleaned_data.get('handles_file', ''))
+        handles = list(OrderedDict.fromkeys(text.split()))
+        if not handles:
+            raise ValidationError(_("Enter handles or upload a file with handles."), code='required')
+        if len(handles) > WEBWHOIS_SETTINGS.BULK_LOOKUP_LIMIT:
+            raise ValidationError(_("At most %(limit)d handles can be looked up at once."), code='limit',
+                                  params={'limit': WEBWHOIS_SETTINGS.BULK_LOOKUP_LIMIT})
+        cleaned_data['handles'] = handles
+        return cleaned_data
@@ -0,0 +1,37 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Purge cached pages of registry objects."""
+from django.core.management.base import BaseCommand
+
+from webwhois.utils.page_cache import purge_page_cache
+
+
+class Command(BaseCommand):
+    """Purge cached pages of registry objects."""
+
+    help = 'Purge cached pages of registry objects with the handles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('handles', nargs='+', metavar='handle', help='Handle of the registry object')
+
+    def handle(self, *args, **options):
+        for handle in options['handles']:
+            purge_page_cache(handle)
+            if options['verbosity'] > 1:
+                self.stdout.write('Purged cached pages of {}.'.format(handle))
@@ -16,24 +16,87 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 import os
+import re
 from functools import partial
 
-from appsettings import AppSettings, Setting, StringSetting
+from appsettings import AppSettings, BooleanSetting, DictSetting, FloatSetting, IntegerSetting, ListSetting, \
+    PositiveIntegerSetting, Setting, StringSetting
+
+from .constants import OBJECT_TYPES
 
 
 def _get_logger_defalt(setting_name):
     return getattr(WEBWHOIS_SETTINGS, setting_name)
 
 
+def _check_handle_type_rules(name, value):
+    """Check rules of the handle type classifier, see `webwhois.utils.handle_types`."""
+    if not isinstance(value, list):
+        raise ValueError('{} must be a list, not {}.'.format(name, type(value).__name__))
+    for rule in value:
+        if not isinstance(rule, dict) or 'pattern' not in rule or 'types' not in rule:
+            raise ValueError("Rules of {} must be dictionaries with 'pattern' and 'types' keys.".format(name))
+        unknown = set(rule) - {'pattern', 'types', 'in_managed_zone'}
+        if unknown:
+            raise ValueError('Unknown keys {} in a rule of {}.'.format(sorted(unknown), name))
+        try:
+            re.compile(rule['pattern'])
+        except re.error as error:
+            raise ValueError('Invalid pattern {!r} in {}: {}.'.format(rule['pattern'], name, error))
+        unknown = set(rule['types']) - OBJECT_TYPES
+        if unknown:
+            raise ValueError('Unknown object types {} in {}.'.format(sorted(unknown), name))
+        if rule.get('in_managed_zone') not in (None, True, False):
+            raise ValueError("Key 'in_managed_zone' in {} must be a boolean.".format(name))
+
+
 class WebwhoisAppSettings(AppSettings):
     """Web whois settings."""
 
     CORBA_NETLOC = StringSetting(default=partial(os.environ.get, 'FRED_WEBWHOIS_NETLOC', 'localhost'))
+    CORBA_NETLOCS = ListSetting(default=list)
     CORBA_CONTEXT = StringSetting(default='fred')
+    CORBA_DEADLINES = DictSetting(default=dict)
+    CIRCUIT_BREAKER_THRESHOLD = IntegerSetting(default=0)
+    CIRCUIT_BREAKER_RESET_TIMEOUT = FloatSetting(default=30.0)
     LOGGER = Setting(default='pylogger.corbalogger.Logger')
     LOGGER_CORBA_NETLOC = StringSetting(default=partial(_get_logger_defalt, 'CORBA_NETLOC'))
     LOGGER_CORBA_CONTEXT = StringSetting(default=partial(_get_logger_defalt, 'CORBA_CONTEXT'))
     LOGGER_CORBA_OBJECT = StringSetting(default='Logger')
+    LOGGER_ASYNC = BooleanSetting(default=False)
+    LOGGER_QUEUE_SIZE = PositiveIntegerSetting(default=1000)
+    LOGGER_OVERFLOW = StringSetting(default='block')
+    LOGGER_JOURNAL = StringSetting(default='')
+    CONCURRENT_LOOKUP = BooleanSetting(default=False)
+    CONCURRENT_LOOKUP_WORKERS = PositiveIntegerSetting(default=10)
+    HANDLE_TYPE_RULES = Setting(default=list, checker=_check_handle_type_rules)
+    REQUEST_MEMO = BooleanSetting(default=False)
+    OBJECT_CACHE_ALIAS = StringSetting(default='default')
+    OBJECT_CACHE_TIMEOUTS = DictSetting(default=dict)
+    OBJECT_CACHE_NOT_FOUND_TIMEOUT = IntegerSetting(default=0)
+    OBJECT_CACHE_STALE_TIMEOUT = IntegerSetting(default=0)
+    OBJECT_CACHE_LOCK_TIMEOUT = PositiveIntegerSetting(default=10)
+    OBJECT_CACHE_LOCK_WAIT = FloatSetting(default=1.0)
+    KNOWN_HANDLES_FILE = StringSetting(default='')
+    KNOWN_HANDLES_REFRESH = IntegerSetting(default=300)
+    KNOWN_HANDLES_MAX_AGE = IntegerSetting(default=0)
+    STATUS_DESCRIPTIONS_REFRESH = IntegerSetting(default=0)
+    REGISTRAR_CATALOGUE_REFRESH = IntegerSetting(default=0)
+    MANAGED_ZONES_REFRESH = IntegerSetting(default=0)
+    PAGE_CACHE_ALIAS = StringSetting(default='default')
+    PAGE_CACHE_TIMEOUTS = DictSetting(default=dict)
+    PAGE_CACHE_SHORT_TIMEOUT = IntegerSetting(default=0)
+    CONDITIONAL_GET = BooleanSetting(default=False)
+    API_BULK_LIMIT = PositiveIntegerSetting(default=20)
+    BULK_LOOKUP_LIMIT = PositiveIntegerSetting(default=500)
+    BULK_LOOKUP_WORKERS = PositiveIntegerSetting(default=4)
+    BULK_LOOKUP_QUOTA = IntegerSetting(default=0)
+    BULK_LOOKUP_QUOTA_PERIOD = PositiveIntegerSetting(default=3600)
+    FILE_CACHE_DIR = StringSetting(default='')
+    FILE_CACHE_MAX_SIZE = PositiveIntegerSetting(default=100 * 1024 ** 2)
+    FILE_CACHE_ACCEL_REDIRECT = StringSetting(default='')
+    PROFILING = BooleanSetting(default=False)
+    METRICS_ALLOWED_IPS = ListSetting(default=list)
 
     class Meta:
         setting_prefix = 'WEBWHOIS_'
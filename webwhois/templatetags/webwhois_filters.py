@@ -23,6 +23,8 @@ from django import template
 from django.template.defaultfilters import stringfilter
 from django.utils.translation import ugettext_lazy as _
 
+from webwhois.utils import idna_codec
+
 register = template.Library()
 
 
@@ -54,7 +56,7 @@ def contact_ssn_type_label(value):
 def idn_decode(value):
     """Decode handle into IDN."""
     try:
-        return idna.decode(value)
+        return idna_codec.decode(value)
     except idna.IDNAError:
         pass
     return value
@@ -16,20 +16,24 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+import threading
 from datetime import datetime
-from unittest.mock import call, patch, sentinel
+from unittest.mock import Mock, call, patch, sentinel
 
 import omniORB
 from django.test import SimpleTestCase, override_settings
 from django.utils import timezone
 from fred_idl.ccReg import FileManager, Logger, _objref_FileDownload
 from fred_idl.Registry import Buffer, IsoDateTime
-from fred_idl.Registry.Whois import WhoisIntf
+from fred_idl.Registry.PublicRequest import PublicRequestIntf
+from fred_idl.Registry.RecordStatement import Server
+from fred_idl.Registry.Whois import OBJECT_NOT_FOUND, WhoisIntf
 
-from webwhois.utils.corba_wrapper import WebwhoisCorbaRecoder, load_filemanager_from_idl, load_logger_from_idl, \
-    load_whois_from_idl
-
-from .utils import apply_patch
+from webwhois.utils.corba_pool import PoolMember
+from webwhois.utils.corba_wrapper import _FILE_MANAGER, _PUBLIC_REQUEST, _RECORD_STATEMENT, _WHOIS, \
+    WebwhoisCorbaRecoder, load_logger_from_idl
+from webwhois.utils.layers import CallDeadline, CircuitBreaker, CircuitOpen, CorbaClientLayer, LayeredClientProxy, \
+    RequestMemo
 
 
 class TestWebwhoisCorbaRecoder(SimpleTestCase):
@@ -70,22 +74,15 @@ class TestWebwhoisCorbaRecoder(SimpleTestCase):
 
 class TestLoadIdl(SimpleTestCase):
 
-    def setUp(self):
-        patcher = patch('webwhois.utils.corba_wrapper._CLIENT')
-        self.corba_mock = apply_patch(self, patcher)
-        self.corba_mock.get_object.return_value = sentinel.corba_object
-
-    def test_load_whois_from_idl(self):
-        result = load_whois_from_idl()
-
-        self.assertEqual(result, sentinel.corba_object)
-        self.assertEqual(self.corba_mock.mock_calls, [call.get_object('Whois2', WhoisIntf)])
-
-    def test_load_filemanager_from_idl(self):
-        result = load_filemanager_from_idl()
-
-        self.assertEqual(result, sentinel.corba_object)
-        self.assertEqual(self.corba_mock.mock_calls, [call.get_object('FileManager', FileManager)])
+    def test_pools(self):
+        pools = ((_WHOIS, 'Whois2', WhoisIntf), (_PUBLIC_REQUEST, 'PublicRequest', PublicRequestIntf),
+                 (_FILE_MANAGER, 'FileManager', FileManager), (_RECORD_STATEMENT, 'RecordStatement', Server))
+        for pool, object_name, idl_class in pools:
+            with self.subTest(object_name=object_name):
+                member = PoolMember('localhost', Mock())
+                member.client.get_object.return_value = sentinel.corba_object
+                self.assertEqual(pool.get_reference(member), sentinel.corba_object)
+                self.assertEqual(member.client.mock_calls, [call.get_object(object_name, idl_class)])
 
     @override_settings(WEBWHOIS_LOGGER_CORBA_NETLOC='example.cz', WEBWHOIS_LOGGER_CORBA_CONTEXT='custom',
                        WEBWHOIS_LOGGER_CORBA_OBJECT=sentinel.object)
@@ -97,3 +94,237 @@ class TestLoadIdl(SimpleTestCase):
             call().get_object(sentinel.object, Logger),
         ])
         self.assertEqual(result.corba_object, mock_client().get_object())
+
+
+class RecordingLayer(CorbaClientLayer):
+    """Layer which records the calls."""
+
+    def __init__(self, name, log, methods=None):
+        self.name = name
+        self.log = log
+        self.methods = methods
+
+    def handles(self, method_name):
+        return self.methods is None or method_name in self.methods
+
+    def call(self, method_name, function, *args, **kwargs):
+        self.log.append((self.name, method_name, args))
+        return function(*args, **kwargs)
+
+
+class TestLayeredClientProxy(SimpleTestCase):
+    """Test `LayeredClientProxy` class."""
+
+    def test_no_layers(self):
+        client = Mock()
+        proxy = LayeredClientProxy(client)
+        self.assertEqual(proxy.get_foo, client.get_foo)
+
+    def test_layers_order(self):
+        client = Mock()
+        client.get_foo.return_value = sentinel.result
+        log = []
+        proxy = LayeredClientProxy(client, [RecordingLayer('outer', log), RecordingLayer('inner', log)])
+        self.assertEqual(proxy.get_foo(sentinel.arg), sentinel.result)
+        self.assertEqual(log, [('outer', 'get_foo', (sentinel.arg, )), ('inner', 'get_foo', (sentinel.arg, ))])
+        self.assertEqual(client.mock_calls, [call.get_foo(sentinel.arg)])
+
+    def test_layer_not_handled(self):
+        client = Mock()
+        log = []
+        proxy = LayeredClientProxy(client, [RecordingLayer('layer', log, methods=['get_bar'])])
+        self.assertEqual(proxy.get_foo, client.get_foo)
+        proxy.get_foo()
+        self.assertEqual(log, [])
+
+    def test_patch_client(self):
+        proxy = LayeredClientProxy(Mock(), [RecordingLayer('layer', [])])
+        with patch.object(proxy, 'client') as client_mock:
+            proxy.get_foo()
+        self.assertEqual(client_mock.mock_calls, [call.get_foo()])
+
+
+class TestRequestMemo(SimpleTestCase):
+    """Test `RequestMemo` class."""
+
+    def setUp(self):
+        self.client_mock = Mock()
+        self.client_mock.get_foo.side_effect = lambda *args: list(args)
+        self.memo = RequestMemo(['get_foo'])
+        self.proxy = LayeredClientProxy(self.client_mock, [self.memo])
+
+    def test_disabled(self):
+        with self.memo.scope():
+            self.proxy.get_foo('a')
+            self.proxy.get_foo('a')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_foo('a'), call.get_foo('a')])
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_no_scope(self):
+        self.proxy.get_foo('a')
+        self.proxy.get_foo('a')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_foo('a'), call.get_foo('a')])
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_memo(self):
+        with self.memo.scope() as scope:
+            first = self.proxy.get_foo('a')
+            self.assertIs(self.proxy.get_foo('a'), first)
+            self.proxy.get_foo('b')
+            self.proxy.get_bar('a')
+            self.proxy.get_bar('a')
+        self.assertEqual(self.client_mock.mock_calls, [
+            call.get_foo('a'), call.get_foo('b'), call.get_bar('a'), call.get_bar('a')])
+        self.assertEqual((scope.hits, scope.misses), (1, 2))
+        self.assertEqual((self.memo.hits, self.memo.misses), (1, 2))
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_separate_scopes(self):
+        with self.memo.scope():
+            self.proxy.get_foo('a')
+        with self.memo.scope():
+            self.proxy.get_foo('a')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_foo('a'), call.get_foo('a')])
+        self.assertEqual((self.memo.hits, self.memo.misses), (0, 2))
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_unhashable(self):
+        with self.memo.scope():
+            self.proxy.get_foo(['a'])
+            self.proxy.get_foo(['a'])
+        self.assertEqual(self.client_mock.mock_calls, [call.get_foo(['a']), call.get_foo(['a'])])
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_exception_not_memoized(self):
+        self.client_mock.get_foo.side_effect = [ValueError, sentinel.result]
+        with self.memo.scope():
+            with self.assertRaises(ValueError):
+                self.proxy.get_foo('a')
+            self.assertEqual(self.proxy.get_foo('a'), sentinel.result)
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_registry_exception_memoized(self):
+        self.client_mock.get_foo.side_effect = OBJECT_NOT_FOUND
+        with self.memo.scope() as scope:
+            for _ in range(2):
+                with self.assertRaises(OBJECT_NOT_FOUND):
+                    self.proxy.get_foo('a')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_foo('a')])
+        self.assertEqual((scope.hits, scope.misses), (1, 1))
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_concurrent(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def _get_foo(*args):
+            started.set()
+            release.wait(5)
+            return list(args)
+
+        self.client_mock.get_foo.side_effect = _get_foo
+        results = []
+        with self.memo.scope() as scope:
+            def _worker():
+                with self.memo.activate(scope):
+                    results.append(self.proxy.get_foo('a'))
+
+            first = threading.Thread(target=_worker)
+            first.start()
+            started.wait(5)
+            second = threading.Thread(target=_worker)
+            second.start()
+            release.set()
+            first.join()
+            second.join()
+        self.assertEqual(self.client_mock.mock_calls, [call.get_foo('a')])
+        self.assertEqual(results, [['a'], ['a']])
+        self.assertIs(results[0], results[1])
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_propagate(self):
+        with self.memo.scope() as scope:
+            propagated = self.memo.propagate()
+        with propagated as active:
+            self.assertIs(self.memo.current_scope, scope)
+            self.assertIs(active, scope)
+        self.assertIsNone(self.memo.current_scope)
+
+
+class TestCallDeadline(SimpleTestCase):
+    """Test `CallDeadline` class."""
+
+    def test_not_defined(self):
+        self.assertFalse(CallDeadline('WHOIS').handles('get_contact_by_handle'))
+
+    @override_settings(WEBWHOIS_CORBA_DEADLINES={'WHOIS': 5, 'WHOIS.get_contact_by_handle': 0.5, 'LOGGER': 1})
+    def test_get_deadline(self):
+        self.assertEqual(CallDeadline('WHOIS').get_deadline('get_contact_by_handle'), 0.5)
+        self.assertEqual(CallDeadline('WHOIS').get_deadline('get_nsset_by_handle'), 5)
+        self.assertIsNone(CallDeadline('FILE_MANAGER').get_deadline('load'))
+
+    @override_settings(WEBWHOIS_CORBA_DEADLINES={'WHOIS': 0.5})
+    def test_call(self):
+        log = []
+        client = Mock(spec=('get_contact_by_handle', ))
+        client.get_contact_by_handle.side_effect = lambda handle: log.append(handle)
+        proxy = LayeredClientProxy(client, [CallDeadline('WHOIS')])
+        with patch('webwhois.utils.layers.omniORB.setClientThreadCallTimeout', side_effect=log.append):
+            proxy.get_contact_by_handle('KONTAKT')
+        self.assertEqual(log, [500, 'KONTAKT', 0])
+
+
+@override_settings(WEBWHOIS_CIRCUIT_BREAKER_THRESHOLD=2, WEBWHOIS_CIRCUIT_BREAKER_RESET_TIMEOUT=30)
+class TestCircuitBreaker(SimpleTestCase):
+    """Test `CircuitBreaker` class."""
+
+    def setUp(self):
+        self.client = Mock(spec=('get_contact_by_handle', ))
+        self.breaker = CircuitBreaker('WHOIS')
+        self.proxy = LayeredClientProxy(self.client, [self.breaker])
+
+    def _fail(self, count):
+        self.client.get_contact_by_handle.side_effect = omniORB.CORBA.TRANSIENT()
+        for _ in range(count):
+            with self.assertRaises(omniORB.CORBA.TRANSIENT):
+                self.proxy.get_contact_by_handle('KONTAKT')
+
+    @override_settings(WEBWHOIS_CIRCUIT_BREAKER_THRESHOLD=0)
+    def test_disabled(self):
+        self.assertFalse(self.breaker.handles('get_contact_by_handle'))
+
+    def test_closed(self):
+        self._fail(1)
+        self.client.get_contact_by_handle.side_effect = None
+        self.proxy.get_contact_by_handle('KONTAKT')
+        # Success resets the failures.
+        self._fail(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open(self):
+        self._fail(2)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpen):
+            self.proxy.get_contact_by_handle('KONTAKT')
+        self.assertEqual(len(self.client.mock_calls), 2)
+
+    def test_user_exception(self):
+        self.client.get_contact_by_handle.side_effect = ValueError
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.proxy.get_contact_by_handle('KONTAKT')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_success(self):
+        self._fail(2)
+        with override_settings(WEBWHOIS_CIRCUIT_BREAKER_RESET_TIMEOUT=0):
+            self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+            self.client.get_contact_by_handle.side_effect = None
+            self.proxy.get_contact_by_handle('KONTAKT')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_failure(self):
+        self._fail(2)
+        with override_settings(WEBWHOIS_CIRCUIT_BREAKER_RESET_TIMEOUT=0):
+            self._fail(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
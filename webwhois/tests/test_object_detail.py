@@ -16,9 +16,13 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+import os
 from datetime import date
+from tempfile import TemporaryDirectory
 from unittest.mock import call, patch, sentinel
 
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -31,6 +35,9 @@ from webwhois.constants import STATUS_DELETE_CANDIDATE, STATUS_LINKED, STATUS_VA
     STATUS_VERIFICATION_IN_PROCESS
 from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
 from webwhois.utils import WHOIS
+from webwhois.utils.layers import CircuitOpen
+from webwhois.utils.managed_zones import MANAGED_ZONES
+from webwhois.utils.not_found import KNOWN_HANDLES
 from webwhois.views.base import RegistryObjectMixin
 from webwhois.views.detail_keyset import KeysetDetailMixin
 from webwhois.views.detail_nsset import NssetDetailMixin
@@ -123,6 +130,18 @@ class TestResolveHandleType(ObjectDetailMixin):
         self.assertEqual(self.LOGGER.create_request().result, 'NotFound')
         self.assertEqual(WHOIS.mock_calls, [call.get_contact_by_handle('testhandle')])
 
+    def test_contact_circuit_open(self):
+        WHOIS.get_contact_by_handle.side_effect = CircuitOpen
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "testhandle"}))
+        self.assertContains(response, 'Service unavailable')
+        self.assertEqual(self.LOGGER.mock_calls, [
+            CALL_BOOL,
+            call.create_request('127.0.0.1', 'Web whois', 'Info', properties=(
+                ('handle', 'testhandle'), ('handleType', 'contact'))),
+            call.create_request().close(properties=[('exception', 'CircuitOpen')])
+        ])
+        self.assertEqual(self.LOGGER.create_request().result, 'Error')
+
     def test_contact_invalid_handle(self):
         WHOIS.get_contact_by_handle.side_effect = INVALID_HANDLE
         response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "testhandle"}))
@@ -196,6 +215,90 @@ class TestResolveHandleType(ObjectDetailMixin):
         WHOIS.get_registrar_by_handle.side_effect = None
         self.assertRedirects(response, reverse("webwhois:detail_contact", kwargs={"handle": "testhandle"}))
 
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_multiple_entries_concurrent(self):
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_keyset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_registrar_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        response = self.client.get(reverse("webwhois:registry_object_type", kwargs={"handle": "testhandle.cz"}))
+        self.assertContains(response, "Multiple entries found")
+        self.assertEqual(self.LOGGER.create_request().close.mock_calls, [
+            call(properties=[('foundType', 'contact'), ('foundType', 'domain'), ('foundType', 'nsset')]),
+        ])
+        self.assertCountEqual(WHOIS.mock_calls, [
+            call.get_contact_by_handle('testhandle.cz'),
+            call.get_nsset_by_handle('testhandle.cz'),
+            call.get_keyset_by_handle('testhandle.cz'),
+            call.get_registrar_by_handle('testhandle.cz'),
+            call.get_domain_by_handle('testhandle.cz')
+        ])
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=[{'pattern': r'\.', 'types': ['domain']}])
+    def test_handle_type_rules(self):
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_managed_zone_list.return_value = []
+        response = self.client.get(reverse("webwhois:registry_object_type", kwargs={"handle": "testhandle.cz"}))
+        self.assertRedirects(response, reverse("webwhois:detail_domain", kwargs={"handle": "testhandle.cz"}),
+                             fetch_redirect_response=False)
+        self.assertEqual(WHOIS.mock_calls, [call.get_domain_by_handle('testhandle.cz')])
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=[{'pattern': r'\.', 'types': ['domain']}])
+    def test_handle_type_rules_fallback(self):
+        # Other object types are looked up, if the predicted one isn't found.
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_nsset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_keyset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_registrar_by_handle.side_effect = OBJECT_NOT_FOUND
+        response = self.client.get(reverse("webwhois:registry_object_type", kwargs={"handle": "testhandle.cz"}))
+        self.assertRedirects(response, reverse("webwhois:detail_contact", kwargs={"handle": "testhandle.cz"}),
+                             fetch_redirect_response=False)
+        self.assertEqual(WHOIS.mock_calls, [
+            call.get_domain_by_handle('testhandle.cz'),
+            call.get_contact_by_handle('testhandle.cz'),
+            call.get_nsset_by_handle('testhandle.cz'),
+            call.get_keyset_by_handle('testhandle.cz'),
+            call.get_registrar_by_handle('testhandle.cz'),
+        ])
+
+    def test_handle_not_found_known_handles(self):
+        tmp_dir = TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = os.path.join(tmp_dir.name, 'handles.txt')
+        with open(path, 'w') as export:
+            export.write('domain example.cz\ncontact KONTAKT\n')
+        KNOWN_HANDLES.clear()
+        self.addCleanup(KNOWN_HANDLES.clear)
+        WHOIS.get_nsset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_keyset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_registrar_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_managed_zone_list.return_value = []
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=path, WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60):
+            response = self.client.get(reverse("webwhois:registry_object_type", kwargs={"handle": "testhandle.cz"}))
+        self.assertContains(response, "Record not found")
+        # Contact and domain are answered without the backend.
+        self.assertEqual(WHOIS.mock_calls, [
+            call.get_nsset_by_handle('testhandle.cz'),
+            call.get_keyset_by_handle('testhandle.cz'),
+            call.get_registrar_by_handle('testhandle.cz'),
+            call.get_managed_zone_list(),
+        ])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_handle_not_found_concurrent(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_nsset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_keyset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_registrar_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_domain_by_handle.side_effect = UNMANAGED_ZONE
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        response = self.client.get(reverse("webwhois:registry_object_type", kwargs={"handle": "testhandle"}))
+        self.assertContains(response, "Record not found")
+        self.assertEqual(response.context['server_exception']['code'], 'OBJECT_NOT_FOUND')
+        self.assertEqual(self.LOGGER.create_request().result, 'NotFound')
+
 
 @override_settings(TEMPLATES=TEMPLATES)
 class TestDetailContact(ObjectDetailMixin):
@@ -480,6 +583,21 @@ class TestDetailNsset(ObjectDetailMixin):
             "status_descriptions": ['Has relation to other records in the registry'],
         })
 
+    def test_append_nsset_related_loaded(self):
+        nsset = self._get_nsset()
+        admin = self._get_contact()
+        registrar = self._get_registrar()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        data = {"detail": nsset}
+        NssetDetailMixin.append_nsset_related(data, {'KONTAKT': admin}, {'REG-FRED_A': registrar})
+        self.assertEqual(data, {
+            "detail": nsset,
+            "admins": [admin],
+            "registrar": registrar,
+            "status_descriptions": ['Has relation to other records in the registry'],
+        })
+        self.assertEqual(WHOIS.mock_calls, [call.get_nsset_status_descriptions('en')])
+
     def test_nsset_fqds_idna(self):
         WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
         WHOIS.get_contact_by_handle.return_value = self._get_contact()
@@ -672,6 +790,64 @@ class TestDetailDomain(ObjectDetailMixin):
             call.get_registrar_by_handle('REG-FRED_A')
         ])
 
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_domain_request_memo(self):
+        self._mocks_for_domain_detail()
+        response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "fred.cz"}))
+        self.assertContains(response, "Domain name details")
+        self.assertEqual(WHOIS.mock_calls, [
+            call.get_domain_by_handle('fred.cz'),
+            call.get_domain_status_descriptions('en'),
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+            call.get_nsset_by_handle('NSSET-1'),
+            call.get_nsset_status_descriptions('en'),
+            call.get_keyset_by_handle('KEYSID-1'),
+            call.get_keyset_status_descriptions('en'),
+        ])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_domain_concurrent(self):
+        self._mocks_for_domain_detail()
+        contact = WHOIS.get_contact_by_handle.return_value
+        registrar = WHOIS.get_registrar_by_handle.return_value
+        response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "fred.cz"}))
+        self.assertContains(response, "Domain name details")
+        self.assertContains(response, "Search results for handle <strong>fred.cz</strong>:")
+        self.assertEqual(self.LOGGER.create_request().result, 'Ok')
+        # Each related object is loaded only once.
+        self.assertCountEqual(WHOIS.mock_calls, [
+            call.get_domain_by_handle('fred.cz'),
+            call.get_domain_status_descriptions('en'),
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+            call.get_nsset_by_handle('NSSET-1'),
+            call.get_keyset_by_handle('KEYSID-1'),
+            call.get_nsset_status_descriptions('en'),
+            call.get_keyset_status_descriptions('en'),
+        ])
+        domain = response.context['registry_objects']['domain']
+        self.assertIs(domain['registrant'], contact)
+        self.assertEqual(domain['admins'], [contact])
+        self.assertEqual(domain['nsset']['admins'], [contact])
+        self.assertIs(domain['keyset']['registrar'], registrar)
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_domain_concurrent_without_nsset_and_keyset(self):
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_domain_by_handle.return_value = self._get_domain(nsset_handle=None, keyset_handle=None)
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "fred.cz"}))
+        self.assertContains(response, "Domain name details")
+        self.assertCountEqual(WHOIS.mock_calls, [
+            call.get_domain_by_handle('fred.cz'),
+            call.get_domain_status_descriptions('en'),
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+        ])
+        self.assertNotIn('nsset', response.context['registry_objects']['domain'])
+
     def test_domain_without_nsset_and_keyset(self):
         WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
         WHOIS.get_contact_by_handle.return_value = self._get_contact()
@@ -714,6 +890,18 @@ class TestDetailDomain(ObjectDetailMixin):
         self.assertEqual(self.LOGGER.create_request().result, 'NotFound')
         self.assertEqual(WHOIS.mock_calls, [call.get_domain_by_handle('fred.com'), call.get_managed_zone_list()])
 
+    @override_settings(WEBWHOIS_MANAGED_ZONES_REFRESH=3600)
+    def test_domain_unmanaged_zone_local(self):
+        MANAGED_ZONES.clear()
+        self.addCleanup(MANAGED_ZONES.clear)
+        WHOIS.get_managed_zone_list.return_value = ['cz', '0.2.4.e164.arpa']
+        response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "fred.com"}))
+        self.assertContains(response, 'Unmanaged zone')
+        self.assertEqual(response.context['managed_zone_list'], ('cz', '0.2.4.e164.arpa'))
+        self.assertEqual(self.LOGGER.create_request().close.mock_calls,
+                         [call(properties=[('reason', 'UNMANAGED_ZONE')])])
+        self.assertEqual(WHOIS.mock_calls, [call.get_managed_zone_list()])
+
     def test_domain_idna_invalid_codepoint(self):
         response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "fr:ed.com"}))
         self.assertContains(response, 'Invalid handle')
@@ -765,6 +953,28 @@ class TestDetailDomain(ObjectDetailMixin):
         self.assertEqual(self.LOGGER.create_request().result, 'NotFound')
         self.assertEqual(WHOIS.mock_calls, [call.get_domain_by_handle('www.fred.cz')])
 
+    @override_settings(WEBWHOIS_MANAGED_ZONES_REFRESH=3600)
+    def test_domain_too_many_labels_local(self):
+        MANAGED_ZONES.clear()
+        self.addCleanup(MANAGED_ZONES.clear)
+        WHOIS.get_managed_zone_list.return_value = ['cz', 'co.cz']
+        response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "www.fred.co.cz"}))
+        self.assertContains(response, "Too many parts in the domain name <strong>www.fred.co.cz</strong>.")
+        self.assertEqual(response.context['example_domain_name'], 'fred.co.cz')
+        self.assertEqual(self.LOGGER.create_request().close.mock_calls,
+                         [call(properties=[('reason', 'TOO_MANY_LABELS')])])
+        self.assertEqual(WHOIS.mock_calls, [call.get_managed_zone_list()])
+
+    @override_settings(WEBWHOIS_MANAGED_ZONES_REFRESH=3600)
+    def test_domain_managed_zone_local(self):
+        MANAGED_ZONES.clear()
+        self.addCleanup(MANAGED_ZONES.clear)
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+        response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "fred.cz"}))
+        self.assertContains(response, "Domain not found")
+        self.assertEqual(WHOIS.mock_calls, [call.get_managed_zone_list(), call.get_domain_by_handle('fred.cz')])
+
     def test_domain_too_many_labels_with_dot_at_the_end(self):
         WHOIS.get_domain_by_handle.side_effect = TOO_MANY_LABELS
         response = self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "www.fred.cz."}))
@@ -850,6 +1060,204 @@ class TestDetailDomain(ObjectDetailMixin):
         self.assertEqual(self.LOGGER.create_request().result, 'Error')
 
 
+@override_settings(TEMPLATES=TEMPLATES, WEBWHOIS_PAGE_CACHE_TIMEOUTS={'contact': 60, 'domain': 60},
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestPageCache(ObjectDetailMixin):
+    """Test cache of rendered pages."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_cached(self):
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        WHOIS.reset_mock()
+        self.LOGGER.reset_mock()
+
+        cached = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(WHOIS.mock_calls, [])
+        # Request is logged anyway.
+        self.assertEqual(self.LOGGER.mock_calls, [
+            CALL_BOOL,
+            call.create_request('127.0.0.1', 'Web whois', 'Info', properties=(
+                ('handle', 'mycontact'), ('handleType', 'contact'))),
+            call.create_request().close(properties=[('foundType', 'contact')])
+        ])
+
+    def test_purge(self):
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        WHOIS.reset_mock()
+
+        call_command('purge_webwhois_page_cache', 'MyContact')
+        self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+
+        self.assertIn(call.get_contact_by_handle('mycontact'), WHOIS.mock_calls)
+
+    @override_settings(WEBWHOIS_PAGE_CACHE_SHORT_TIMEOUT=10)
+    def test_purge_idn(self):
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        for handle in ('háčkyčárky.cz', 'xn--hkyrky-ptac70bc.cz'):
+            self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": handle}))
+        WHOIS.reset_mock()
+
+        call_command('purge_webwhois_page_cache', 'XN--HKYRKY-PTAC70BC.CZ')
+        for handle in ('háčkyčárky.cz', 'xn--hkyrky-ptac70bc.cz'):
+            self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": handle}))
+
+        self.assertEqual(WHOIS.get_domain_by_handle.mock_calls, [call('xn--hkyrky-ptac70bc.cz')] * 2)
+
+    @override_settings(WEBWHOIS_PAGE_CACHE_SHORT_TIMEOUT=10)
+    def test_service_unavailable_not_cached(self):
+        WHOIS.get_contact_by_handle.side_effect = CircuitOpen
+        for _ in range(2):
+            response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "testhandle"}))
+            self.assertContains(response, 'Service unavailable')
+        self.assertEqual(WHOIS.mock_calls, [call.get_contact_by_handle('testhandle')] * 2)
+
+    @override_settings(DEBUG=True, WEBWHOIS_PROFILING=True)
+    def test_profile_not_cached(self):
+        # Methods are wrapped by the profiling layers.
+        WHOIS.client.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.client.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.client.get_registrar_by_handle.return_value = self._get_registrar()
+        for _ in range(2):
+            self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        self.assertEqual(WHOIS.client.get_contact_by_handle.mock_calls, [call('mycontact')] * 2)
+
+    def test_server_exception_not_cached(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        for _ in range(2):
+            self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "testhandle"}))
+        self.assertEqual(WHOIS.mock_calls, [call.get_contact_by_handle('testhandle')] * 2)
+
+    @override_settings(WEBWHOIS_PAGE_CACHE_SHORT_TIMEOUT=10)
+    def test_server_exception_short_timeout(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        for _ in range(2):
+            response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "testhandle"}))
+            self.assertContains(response, 'Contact not found')
+        self.assertEqual(WHOIS.mock_calls, [call.get_contact_by_handle('testhandle')])
+        self.assertEqual(self.LOGGER.create_request().result, 'NotFound')
+
+    def test_delete_candidate_not_cached(self):
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_DELETE_CANDIDATE
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        for _ in range(2):
+            self.client.get(reverse("webwhois:detail_domain", kwargs={"handle": "fred.cz"}))
+        self.assertEqual(WHOIS.mock_calls.count(call.get_domain_by_handle('fred.cz')), 2)
+
+    def test_not_configured_type(self):
+        WHOIS.get_nsset_by_handle.side_effect = OBJECT_NOT_FOUND
+        for _ in range(2):
+            self.client.get(reverse("webwhois:detail_nsset", kwargs={"handle": "mynssid"}))
+        self.assertEqual(WHOIS.mock_calls, [call.get_nsset_by_handle('mynssid')] * 2)
+
+
+@override_settings(TEMPLATES=TEMPLATES, WEBWHOIS_CONDITIONAL_GET=True)
+class TestConditionalGet(ObjectDetailMixin):
+    """Test conditional requests of pages of registry objects."""
+
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+    def test_validators(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['ETag'], r'^"[0-9a-f]{40}"$')
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    @override_settings(WEBWHOIS_CONDITIONAL_GET=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_etag_stable(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        other = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        self.assertEqual(other['ETag'], response['ETag'])
+
+    def test_if_none_match(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        with patch("django.template.response.SimpleTemplateResponse.render") as render_mock:
+            not_modified = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}),
+                                           HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        self.assertEqual(render_mock.mock_calls, [])
+
+    def test_if_none_match_modified(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}),
+                                   HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        # Status changes don't change times of changes of the registry object, so `If-Modified-Since` is ignored.
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}),
+                                   HTTP_IF_MODIFIED_SINCE='Thu, 17 Dec 2015 09:48:25 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_found(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}),
+                                   HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                       WEBWHOIS_PAGE_CACHE_TIMEOUTS={'contact': 60})
+    def test_page_cache(self):
+        cache.clear()
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        cached = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}),
+                                 HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('mycontact')])
+
+
+@override_settings(TEMPLATES=TEMPLATES, WEBWHOIS_PROFILING=True)
+class TestProfiling(ObjectDetailMixin):
+    """Test profiling of pages of registry objects."""
+
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+    def test_server_timing(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'],
+                         r'^backend;dur=\d+\.\d{3};desc="\d+ calls", cache;desc="\d+ hits", template;dur=\d+\.\d{3}$')
+        self.assertNotContains(response, 'webwhois-profile')
+
+    @override_settings(WEBWHOIS_PROFILING=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(DEBUG=True)
+    def test_footer(self):
+        response = self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"}))
+        self.assertContains(response, 'webwhois-profile')
+        self.assertContains(response, '<tr><td>WHOIS</td><td>get_contact_by_handle</td><td>1</td><td>1</td></tr>',
+                            html=True)
+
+
 class FakeRegistryObjectView(RegistryObjectMixin, View):
     """Test view for RegistryObjectMixin."""
 
@@ -31,7 +31,8 @@ from webwhois.forms.public_request import ConfirmationMethod
 from webwhois.forms.widgets import DeliveryType
 from webwhois.tests.utils import TEMPLATES, apply_patch
 from webwhois.utils import PUBLIC_REQUEST
-from webwhois.utils.public_response import BlockResponse, PersonalInfoResponse, PublicResponse, SendPasswordResponse
+from webwhois.utils.public_response import BlockResponse, PersonalInfoResponse, PublicResponse, SendPasswordResponse, \
+    decode_public_response
 
 
 @override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
@@ -422,7 +423,7 @@ class TestSendPasswodForm(SubmittedFormTestCase):
         public_response = SendPasswordResponse(object_name, 24, 'AuthInfo', 'FOO', 'foo@foo.off',
                                                ConfirmationMethod.NOTARIZED_LETTER)
         public_response.create_date = date(2017, 3, 8)
-        self.assertEqual(cache.get(self.public_key), public_response)
+        self.assertEqual(decode_public_response(cache.get(self.public_key)), public_response)
 
     def test_send_password_notarized_letter_domain(self):
         title = "Request to send a password (authinfo) for transfer domain name FOO"
@@ -459,7 +460,7 @@ class TestPersonalInfoFormView(SubmittedFormTestCase):
         self.assertRedirects(response, path)
         public_response = PersonalInfoResponse('contact', 24, 'PersonalInfo', 'CONTACT', None, None)
         public_response.create_date = date(2017, 3, 8)
-        self.assertEqual(cache.get(self.public_key), public_response)
+        self.assertEqual(decode_public_response(cache.get(self.public_key)), public_response)
         self.assertEqual(PUBLIC_REQUEST.mock_calls,
                          [call.create_personal_info_request_registry_email(post['handle'], 42)])
         properties = [('handle', 'CONTACT'), ('handleType', 'contact'), ('sendTo', 'email_in_registry')]
@@ -481,7 +482,7 @@ class TestPersonalInfoFormView(SubmittedFormTestCase):
         public_response = PersonalInfoResponse('contact', 24, 'PersonalInfo', 'CONTACT', 'kryten@example.cz',
                                                ConfirmationMethod.SIGNED_EMAIL)
         public_response.create_date = date(2017, 3, 8)
-        self.assertEqual(cache.get(self.public_key), public_response)
+        self.assertEqual(decode_public_response(cache.get(self.public_key)), public_response)
         calls = [call.create_personal_info_request_non_registry_email(post['handle'], 42, ConfirmedBy.signed_email,
                                                                       'kryten@example.cz')]
         self.assertEqual(PUBLIC_REQUEST.mock_calls, calls)
@@ -505,7 +506,7 @@ class TestPersonalInfoFormView(SubmittedFormTestCase):
         public_response = PersonalInfoResponse('contact', 24, 'PersonalInfo', 'CONTACT', 'kryten@example.cz',
                                                ConfirmationMethod.NOTARIZED_LETTER)
         public_response.create_date = date(2017, 3, 8)
-        self.assertEqual(cache.get(self.public_key), public_response)
+        self.assertEqual(decode_public_response(cache.get(self.public_key)), public_response)
 
         calls = [call.create_personal_info_request_non_registry_email(post['handle'], 42, ConfirmedBy.notarized_letter,
                                                                       'kryten@example.cz')]
@@ -583,7 +584,7 @@ class TestBlockUnblockForm(SubmittedFormTestCase):
         self.assertEqual(self.LOGGER.create_request.return_value.result, 'Ok')
         public_response = BlockResponse(object_name, 24, action_name, 'FOO', block_action, lock_type,
                                         confirmation_method)
-        self.assertEqual(cache.get(self.public_key), public_response)
+        self.assertEqual(decode_public_response(cache.get(self.public_key)), public_response)
 
     def _block_transfer_signed_email(self, object_name, object_type, title, message):
         lock_type = "transfer"
@@ -1030,7 +1031,7 @@ class TestNotarizedLetterPdf(SimpleTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['content-type'], 'application/pdf')
         self.assertEqual(response['content-disposition'], 'attachment; filename="notarized-letter-en.pdf"')
-        self.assertEqual(response.content, "PDF content...".encode())
+        self.assertEqual(response.getvalue(), "PDF content...".encode())
         self.assertEqual(PUBLIC_REQUEST.mock_calls, [
             call.create_public_request_pdf(42, Language.en)
         ])
@@ -1060,7 +1061,7 @@ class TestNotarizedLetterPdf(SimpleTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['content-type'], 'application/pdf')
         self.assertEqual(response['content-disposition'], 'attachment; filename="notarized-letter-en.pdf"')
-        self.assertEqual(response.content, "PDF content...".encode())
+        self.assertEqual(response.getvalue(), "PDF content...".encode())
         self.assertEqual(PUBLIC_REQUEST.mock_calls, [
             call.create_public_request_pdf(42, Language.en)
         ])
@@ -1085,7 +1086,7 @@ class TestNotarizedLetterPdf(SimpleTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['content-type'], 'application/pdf')
         self.assertEqual(response['content-disposition'], 'attachment; filename="notarized-letter-en.pdf"')
-        self.assertEqual(response.content, "PDF content...".encode())
+        self.assertEqual(response.getvalue(), "PDF content...".encode())
         self.assertEqual(PUBLIC_REQUEST.mock_calls, [
             call.create_public_request_pdf(42, Language.en)
         ])
@@ -15,13 +15,18 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+import tempfile
 from unittest.mock import call, patch
 
 from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
+from django.utils import translation
+from fred_idl.Registry import IsoDate, IsoDateTime, Whois
 from fred_idl.Registry.RecordStatement import INTERNAL_SERVER_ERROR, OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND
 
-from webwhois.utils import RECORD_STATEMENT
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+from webwhois.utils import RECORD_STATEMENT, WHOIS
+from webwhois.utils.layers import CircuitOpen
 
 from .utils import CALL_BOOL, TEMPLATES, apply_patch
 
@@ -43,7 +48,7 @@ class TestRecordStatementPdf(SimpleTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['content-type'], 'application/pdf')
         self.assertEqual(response['content-disposition'], 'attachment; filename="record-statement-domain-foo.cz.pdf"')
-        self.assertEqual(response.content, "PDF content...".encode())
+        self.assertEqual(response.getvalue(), "PDF content...".encode())
         self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('foo.cz', False)])
         self.assertEqual(self.LOGGER.create_request.mock_calls, [
             call('127.0.0.1', 'Web whois', 'RecordStatement', properties=[
@@ -55,6 +60,15 @@ class TestRecordStatementPdf(SimpleTestCase):
         ])
         self.assertEqual(self.LOGGER.create_request.return_value.result, 'Ok')
 
+    def test_download_domain_range(self):
+        RECORD_STATEMENT.domain_printout.return_value = b"PDF content..."
+        response = self.client.get(reverse("webwhois:record_statement_pdf", kwargs={
+            "object_type": "domain", "handle": "foo.cz"}), HTTP_RANGE='bytes=4-10')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['content-range'], 'bytes 4-10/14')
+        self.assertEqual(response['content-length'], '7')
+        self.assertEqual(response.getvalue(), b"content")
+
     def _assert_download(self, object_name, call_record_statement):
         response = self.client.get(reverse("webwhois:record_statement_pdf", kwargs={
             "object_type": object_name, "handle": "FOO"}))
@@ -62,7 +76,7 @@ class TestRecordStatementPdf(SimpleTestCase):
         self.assertEqual(response['content-type'], 'application/pdf')
         self.assertEqual(response['content-disposition'],
                          'attachment; filename="record-statement-%s-FOO.pdf"' % object_name)
-        self.assertEqual(response.content, "PDF content...".encode())
+        self.assertEqual(response.getvalue(), "PDF content...".encode())
         self.assertEqual(RECORD_STATEMENT.mock_calls, [call_record_statement])
         self.assertEqual(self.LOGGER.create_request.mock_calls, [
             call('127.0.0.1', 'Web whois', 'RecordStatement', properties=[
@@ -148,5 +162,113 @@ class TestRecordStatementNoLogger(SimpleTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['content-type'], 'application/pdf')
         self.assertEqual(response['content-disposition'], 'attachment; filename="record-statement-domain-foo.cz.pdf"')
-        self.assertEqual(response.content, "PDF content...".encode())
+        self.assertEqual(response.getvalue(), "PDF content...".encode())
         self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('foo.cz', False)])
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES,
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class TestRecordStatementFileCache(GetRegistryObjectMixin, SimpleTestCase):
+    """Test record statements stored in the file cache."""
+
+    def setUp(self):
+        spec = ('contact_printout', 'domain_printout', 'keyset_printout', 'nsset_printout')
+        apply_patch(self, patch.object(RECORD_STATEMENT, 'client', spec=spec))
+        spec = ('get_contact_by_handle', 'get_contact_status_descriptions',
+                'get_domain_by_handle', 'get_domain_status_descriptions',
+                'get_keyset_by_handle', 'get_keyset_status_descriptions', 'get_managed_zone_list',
+                'get_nsset_by_handle', 'get_nsset_status_descriptions', 'get_registrar_by_handle')
+        apply_patch(self, patch.object(WHOIS, 'client', spec=spec))
+        apply_patch(self, patch("webwhois.views.record_statement.LOGGER", None))
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        settings_override = override_settings(WEBWHOIS_FILE_CACHE_DIR=temp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        RECORD_STATEMENT.domain_printout.return_value = b'PDF content...'
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+    def _download(self, handle='fred.cz', **extra):
+        response = self.client.get(reverse("webwhois:record_statement_pdf", kwargs={
+            "object_type": "domain", "handle": handle}), **extra)
+        self.addCleanup(response.close)
+        self.assertEqual(response['content-type'], 'application/pdf')
+        self.assertEqual(response['content-disposition'],
+                         'attachment; filename="record-statement-domain-{}.pdf"'.format(handle))
+        return response
+
+    def test_cached(self):
+        for _ in range(2):
+            response = self._download()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.getvalue(), b'PDF content...')
+        self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('fred.cz', False)])
+
+    def test_cached_range(self):
+        self._download()
+        response = self._download(HTTP_RANGE='bytes=0-2')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 0-2/14')
+        self.assertEqual(response.getvalue(), b'PDF')
+        self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('fred.cz', False)])
+
+    def test_changed(self):
+        self._download()
+        WHOIS.get_domain_by_handle.return_value = self._get_domain(expire=IsoDate('2019-12-09'))
+        self._download()
+        self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('fred.cz', False)] * 2)
+
+    def test_changed_time(self):
+        self._download()
+        WHOIS.get_domain_by_handle.return_value = self._get_domain(changed=IsoDateTime('2015-12-11T10:00:00Z'))
+        self._download()
+        self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('fred.cz', False)] * 2)
+
+    def test_whois_calls(self):
+        # Only the registry object itself is loaded, its related objects are not.
+        for _ in range(2):
+            self._download()
+        self.assertEqual(WHOIS.client.mock_calls, [call.get_domain_by_handle('fred.cz')] * 2)
+
+    def test_language(self):
+        # Record statements don't depend on the language of the request.
+        self._download()
+        with translation.override('cs'):
+            self._download()
+        self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('fred.cz', False)])
+
+    def test_idn(self):
+        self._download(handle='fréd.cz')
+        self.assertIn(call.get_domain_by_handle('xn--frd-cma.cz'), WHOIS.client.mock_calls)
+
+    def test_not_found(self):
+        WHOIS.get_domain_by_handle.side_effect = Whois.OBJECT_NOT_FOUND
+        RECORD_STATEMENT.domain_printout.side_effect = OBJECT_NOT_FOUND
+        response = self.client.get(reverse("webwhois:record_statement_pdf", kwargs={
+            "object_type": "domain", "handle": "fred.cz"}))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('fred.cz', False)])
+
+    def test_whois_unavailable(self):
+        # Record statement is downloaded even if the WHOIS is unavailable, it's not cached.
+        WHOIS.get_domain_by_handle.side_effect = CircuitOpen
+        for _ in range(2):
+            with self.assertLogs('webwhois.views.record_statement', 'WARNING'):
+                response = self._download()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.getvalue(), b'PDF content...')
+        self.assertEqual(RECORD_STATEMENT.mock_calls, [call.domain_printout('fred.cz', False)] * 2)
+
+    def test_whois_error(self):
+        WHOIS.get_domain_by_handle.side_effect = Whois.INTERNAL_SERVER_ERROR
+        with self.assertLogs('webwhois.views.record_statement', 'WARNING'):
+            response = self._download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), b'PDF content...')
@@ -17,6 +17,7 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 import os
+import tempfile
 import warnings
 from unittest.mock import call, patch, sentinel
 
@@ -32,6 +33,7 @@ from testfixtures import ShouldWarn
 from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
 from webwhois.tests.utils import CALL_BOOL, TEMPLATES, apply_patch, make_registrar
 from webwhois.utils import FILE_MANAGER, WHOIS
+from webwhois.utils.registrar_catalogue import REGISTRAR_CATALOGUE
 from webwhois.views.registrar import _deprecate_variable
 
 
@@ -170,6 +172,7 @@ class TestRegistrarListView(SimpleTestCase):
         self.assertIsNone(response.context['is_retail'])
         self.assertEqual(len(response.context['registrars']), 1)
         self.assertEqual(response.context['registrars'][0]['registrar'].handle, 'HOLLY')
+        self.assertEqual(response.context['group_members'], {'red_dwarf': frozenset(['HOLLY'])})
         self.assertEqual(WHOIS.mock_calls,
                          [call.get_registrars(), call.get_registrar_groups(), call.get_registrar_certification_list()])
 
@@ -240,6 +243,67 @@ class TestRegistrarListView(SimpleTestCase):
                          [call.get_registrars(), call.get_registrar_certification_list(), call.get_registrar_groups()])
 
 
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES, WEBWHOIS_REGISTRAR_CATALOGUE_REFRESH=60)
+class TestRegistrarCatalogue(GetRegistryObjectMixin, SimpleTestCase):
+    """Test registrar views with the registrar catalogue."""
+
+    def setUp(self):
+        spec = ('get_registrar_by_handle', 'get_registrar_certification_list', 'get_registrar_groups', 'get_registrars')
+        apply_patch(self, patch.object(WHOIS, 'client', spec=spec))
+        apply_patch(self, patch.object(FILE_MANAGER, 'client', spec=('info', 'load')))
+        apply_patch(self, patch("webwhois.views.base.LOGGER"))
+        REGISTRAR_CATALOGUE.clear()
+        self.addCleanup(REGISTRAR_CATALOGUE.clear)
+        self.holly = make_registrar(handle='HOLLY')
+        self.gordon = make_registrar(handle='GORDON')
+        WHOIS.get_registrars.return_value = [self.holly, self.gordon]
+        WHOIS.get_registrar_groups.return_value = [RegistrarGroup(name='red_dwarf', members=['HOLLY'])]
+        WHOIS.get_registrar_certification_list.return_value = [RegistrarCertification('HOLLY', 3, 42)]
+
+    def test_registrars(self):
+        for _ in range(2):
+            response = self.client.get(reverse('webwhois:registrars'))
+            self.assertEqual([r['registrar'] for r in response.context['registrars']], [self.holly, self.gordon])
+            self.assertEqual(response.context['registrars'][0]['score'], 3)
+        self.assertEqual(WHOIS.mock_calls,
+                         [call.get_registrars(), call.get_registrar_groups(), call.get_registrar_certification_list()])
+
+    def test_registrars_group(self):
+        response = self.client.get(reverse('registrars_red_dwarf'))
+        self.assertEqual([r['registrar'] for r in response.context['registrars']], [self.holly])
+        self.assertEqual(response.context['group_members'], {'red_dwarf': frozenset(['HOLLY'])})
+
+    def test_registrars_group_unknown(self):
+        WHOIS.get_registrar_groups.return_value = []
+        response = self.client.get(reverse('registrars_red_dwarf'))
+        self.assertContains(response, "Not Found", status_code=404)
+
+    def test_registrar(self):
+        response = self.client.get(reverse("webwhois:detail_registrar", kwargs={"handle": "HOLLY"}))
+        self.assertContains(response, "Registrar details")
+        self.assertNotIn(call.get_registrar_by_handle('HOLLY'), WHOIS.mock_calls)
+
+    def test_registrar_missing(self):
+        # Registrars missing in the catalogue are loaded from the backend.
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:detail_registrar", kwargs={"handle": "REG_FRED_A"}))
+        self.assertContains(response, "Registrar details")
+        self.assertIn(call.get_registrar_by_handle('REG_FRED_A'), WHOIS.mock_calls)
+
+    def test_download_eval_file(self):
+        FILE_MANAGER.info.return_value = FileInfo(id=42, name='test.html', path='2015/12/9/1', mimetype='text/html',
+                                                  filetype=6, crdate='2015-12-09 16:16:28.598757', size=5)
+        FILE_MANAGER.load.return_value.download.return_value = 'Content'
+        response = self.client.get(reverse("webwhois:download_evaluation_file", kwargs={"handle": "HOLLY"}))
+        self.assertEqual(response.getvalue(), b'Content')
+        self.assertEqual(FILE_MANAGER.mock_calls[:2], [call.info(42), call.load(42)])
+
+    def test_download_not_found(self):
+        response = self.client.get(reverse("webwhois:download_evaluation_file", kwargs={"handle": "GORDON"}))
+        self.assertIsInstance(response, HttpResponseNotFound)
+        self.assertEqual(FILE_MANAGER.mock_calls, [])
+
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -255,6 +319,30 @@ class TestDownloadView(GetRegistryObjectMixin, SimpleTestCase):
         apply_patch(self, patch.object(WHOIS, 'client', spec=('get_registrar_certification_list', )))
         apply_patch(self, patch.object(FILE_MANAGER, 'client', spec=('info', 'load')))
 
+    def test_download_eval_file_cached(self):
+        WHOIS.get_registrar_certification_list.return_value = self._get_registrar_certs()
+        FILE_MANAGER.info.return_value = FileInfo(id=2, name='test.html', path='2015/12/9/1', mimetype='text/html',
+                                                  filetype=6, crdate='2015-12-09 16:16:28.598757', size=7)
+        FILE_MANAGER.load.return_value.download.return_value = b'Content'
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        with override_settings(WEBWHOIS_FILE_CACHE_DIR=temp_dir.name):
+            for _ in range(2):
+                response = self.client.get(reverse("webwhois:download_evaluation_file",
+                                                   kwargs={"handle": "REG-MOJEID"}))
+                self.addCleanup(response.close)
+                self.assertEqual(response.getvalue(), b'Content')
+                self.assertEqual(response['Content-Type'], 'text/html')
+                self.assertEqual(response['Content-Length'], '7')
+                self.assertEqual(response['Content-Disposition'], 'attachment; filename="test.html"')
+        self.assertEqual(FILE_MANAGER.mock_calls, [
+            call.info(2),
+            call.load(2),
+            call.load().download(7),
+            call.load().finalize_download(),
+            call.info(2),
+        ])
+
     def test_download_not_found(self):
         WHOIS.get_registrar_certification_list.return_value = self._get_registrar_certs()
         response = self.client.get(reverse("webwhois:download_evaluation_file", kwargs={"handle": "REG-MISSING"}))
@@ -276,8 +364,9 @@ class TestDownloadView(GetRegistryObjectMixin, SimpleTestCase):
         content = "<html><body>The content.</body></html>"
         FILE_MANAGER.load.return_value.download.return_value = content
         response = self.client.get(reverse("webwhois:download_evaluation_file", kwargs={"handle": "REG-MOJEID"}))
-        self.assertEqual(response.content, content.encode())
+        self.assertEqual(response.getvalue(), content.encode())
         self.assertEqual(response['Content-Type'], 'text/html')
+        self.assertEqual(response['Content-Length'], '5')
         self.assertEqual(response['Content-Disposition'], 'attachment; filename="test.html"')
         self.assertEqual(WHOIS.mock_calls, [call.get_registrar_certification_list()])
         self.assertEqual(FILE_MANAGER.mock_calls, [
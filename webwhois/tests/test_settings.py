@@ -20,9 +20,10 @@
 from unittest.mock import patch, sentinel
 
 from django.conf import settings
-from django.test import SimpleTestCase
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
 
-from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.settings import WEBWHOIS_SETTINGS, WebwhoisAppSettings
 
 
 class TestSettings(SimpleTestCase):
@@ -69,3 +70,23 @@ class TestSettings(SimpleTestCase):
             del settings.WEBWHOIS_LOGGER_CORBA_CONTEXT
 
             self.assertEqual(WEBWHOIS_SETTINGS.LOGGER_CORBA_CONTEXT, sentinel.context)
+
+    def test_handle_type_rules(self):
+        rules = [{'pattern': r'^REG-', 'types': ['registrar']},
+                 {'pattern': r'\.', 'types': ['domain'], 'in_managed_zone': True}]
+        with override_settings(WEBWHOIS_HANDLE_TYPE_RULES=rules):
+            WebwhoisAppSettings.check()
+
+    def test_handle_type_rules_invalid(self):
+        invalid = (
+            ({'pattern': r'^REG-'}, "'pattern' and 'types' keys"),
+            ({'pattern': r'^REG-', 'types': ['registrar'], 'certain': True}, 'Unknown keys'),
+            ({'pattern': r'(', 'types': ['registrar']}, 'Invalid pattern'),
+            ({'pattern': r'^REG-', 'types': ['person']}, 'Unknown object types'),
+            ({'pattern': r'\.', 'types': ['domain'], 'in_managed_zone': 'yes'}, 'must be a boolean'),
+        )
+        for rule, message in invalid:
+            with self.subTest(rule=rule):
+                with override_settings(WEBWHOIS_HANDLE_TYPE_RULES=[rule]):
+                    with self.assertRaisesRegex(ImproperlyConfigured, message):
+                        WebwhoisAppSettings.check()
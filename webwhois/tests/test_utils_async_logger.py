@@ -0,0 +1,169 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.async_logger` module."""
+import json
+import os
+import tempfile
+from unittest.mock import Mock, call, patch, sentinel
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from webwhois.utils.async_logger import AsyncLogger
+
+
+class TestAsyncLogger(SimpleTestCase):
+    """Test `AsyncLogger` class."""
+
+    def setUp(self):
+        self.backend = Mock(spec=('create_request', ))
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.journal = os.path.join(tmp_dir.name, 'journal')
+
+    def _read_journal(self):
+        with open(self.journal) as journal:
+            return [json.loads(line) for line in journal]
+
+    def test_invalid_overflow(self):
+        with self.assertRaisesRegex(ImproperlyConfigured, 'Unknown logger overflow policy'):
+            AsyncLogger(self.backend, 10, overflow='invalid')
+
+    def test_create_close(self):
+        logger = AsyncLogger(self.backend, 10)
+        log_request = logger.create_request('127.0.0.1', 'Web whois', 'Info', properties=[('handle', 'KONTAKT')])
+        log_request.result = 'Ok'
+        log_request.close(properties=[('foundType', 'contact')])
+        logger.flush(5)
+
+        self.assertEqual(self.backend.mock_calls, [
+            call.create_request('127.0.0.1', 'Web whois', 'Info', properties=[('handle', 'KONTAKT')]),
+            call.create_request().close(properties=[('foundType', 'contact')]),
+        ])
+        self.assertEqual(self.backend.create_request.return_value.result, 'Ok')
+
+    def test_request_id(self):
+        self.backend.create_request.return_value.request_id = sentinel.request_id
+        logger = AsyncLogger(self.backend, 10)
+        with patch.object(logger, '_put', return_value=True):
+            log_request = logger.create_request('127.0.0.1', 'Public Request', 'AuthInfo')
+            # Request is created synchronously.
+            self.assertEqual(log_request.request_id, sentinel.request_id)
+        logger.send([('create', log_request, None)])
+        self.assertEqual(self.backend.mock_calls, [call.create_request('127.0.0.1', 'Public Request', 'AuthInfo')])
+
+    def test_overflow_drop(self):
+        logger = AsyncLogger(self.backend, 10, overflow='drop')
+        with patch.object(logger, '_put', return_value=False):
+            log_request = logger.create_request('127.0.0.1', 'Web whois', 'Info')
+            log_request.close()
+        self.assertEqual(logger.dropped, 1)
+        self.assertEqual(self.backend.mock_calls, [])
+
+    def test_overflow_journal(self):
+        logger = AsyncLogger(self.backend, 10, overflow='journal', journal=self.journal)
+        with patch.object(logger, '_put', return_value=False):
+            log_request = logger.create_request('127.0.0.1', 'Web whois', 'Info')
+            log_request.result = 'NotFound'
+            log_request.close(properties=[])
+        self.assertEqual(self._read_journal(), [
+            {'args': ['127.0.0.1', 'Web whois', 'Info'], 'kwargs': {}, 'result': 'NotFound',
+             'close': {'properties': []}}])
+        self.assertEqual(self.backend.mock_calls, [])
+
+    def test_send_failure_journal(self):
+        logger = AsyncLogger(self.backend, 10, journal=self.journal)
+        self.backend.create_request.side_effect = ValueError('Logger is down')
+        with patch.object(logger, '_put', return_value=True):
+            log_request = logger.create_request('127.0.0.1', 'Web whois', 'Info')
+        with self.assertLogs('webwhois.utils.async_logger', 'WARNING'):
+            logger.send([('create', log_request, None), ('close', log_request, {'properties': []})])
+        self.assertEqual(len(self._read_journal()), 1)
+        self.assertEqual(logger.journaled, 1)
+
+    def test_send_failure_no_journal(self):
+        logger = AsyncLogger(self.backend, 10)
+        self.backend.create_request.side_effect = ValueError('Logger is down')
+        with patch.object(logger, '_put', return_value=True):
+            log_request = logger.create_request('127.0.0.1', 'Web whois', 'Info')
+        with self.assertLogs('webwhois.utils.async_logger', 'WARNING'):
+            logger.send([('create', log_request, None), ('close', log_request, {})])
+        self.assertEqual(logger.dropped, 1)
+
+    def test_replay_journal(self):
+        with open(self.journal, 'w') as journal:
+            journal.write(json.dumps({'args': ['127.0.0.1', 'Web whois', 'Info'], 'kwargs': {}, 'result': 'Ok',
+                                      'close': {'properties': []}}) + '\n')
+        logger = AsyncLogger(self.backend, 10, journal=self.journal)
+        logger.replay_journal()
+        self.assertEqual(self.backend.mock_calls, [call.create_request('127.0.0.1', 'Web whois', 'Info'),
+                                                   call.create_request().close(properties=[])])
+        self.assertFalse(os.path.exists(self.journal))
+
+    def test_replay_journal_failure(self):
+        record = {'args': ['127.0.0.1', 'Web whois', 'Info'], 'kwargs': {}, 'result': None, 'close': {}}
+        with open(self.journal, 'w') as journal:
+            journal.write(json.dumps(record) + '\n')
+        self.backend.create_request.side_effect = ValueError('Logger is down')
+        logger = AsyncLogger(self.backend, 10, journal=self.journal)
+        with self.assertLogs('webwhois.utils.async_logger', 'WARNING'):
+            logger.replay_journal()
+        self.assertEqual(self._read_journal(), [record])
+
+    def test_replay_journal_invalid_line(self):
+        record = {'args': ['127.0.0.1', 'Web whois', 'Info'], 'kwargs': {}, 'result': None, 'close': {}}
+        with open(self.journal, 'w') as journal:
+            journal.write('{"args": ["127.0.0.1", "Web\n')
+            journal.write(json.dumps(record) + '\n')
+        logger = AsyncLogger(self.backend, 10, journal=self.journal)
+        with self.assertLogs('webwhois.utils.async_logger', 'WARNING'):
+            logger.replay_journal()
+        self.assertEqual(self.backend.mock_calls, [call.create_request('127.0.0.1', 'Web whois', 'Info'),
+                                                   call.create_request().close()])
+        self.assertEqual(logger.dropped, 1)
+        self.assertEqual(os.listdir(os.path.dirname(self.journal)), [])
+
+    def test_replay_journal_leftover(self):
+        record = {'args': ['127.0.0.1', 'Web whois', 'Info'], 'kwargs': {}, 'result': None, 'close': {}}
+        other = dict(record, args=['127.0.0.2', 'Web whois', 'Info'])
+        replay_path = '{}.replay.{}'.format(self.journal, os.getpid())
+        with open(replay_path, 'w') as replay:
+            replay.write(json.dumps(record) + '\n')
+        with open(self.journal, 'w') as journal:
+            journal.write(json.dumps(other) + '\n')
+        logger = AsyncLogger(self.backend, 10, journal=self.journal)
+        logger.replay_journal()
+        self.assertEqual(self.backend.create_request.mock_calls,
+                         [call('127.0.0.1', 'Web whois', 'Info'), call().close()])
+        # Journal is left for the next replay.
+        self.assertEqual(self._read_journal(), [other])
+        self.assertFalse(os.path.exists(replay_path))
+
+    def test_sender_survives_failure(self):
+        logger = AsyncLogger(self.backend, 10, journal=self.journal)
+        with patch.object(logger, 'send', side_effect=[OSError('Disk full'), None]) as send_mock:
+            with self.assertLogs('webwhois.utils.async_logger', 'ERROR'):
+                logger.create_request('127.0.0.1', 'Web whois', 'Info')
+                logger.flush(5)
+            sender = logger._sender
+            logger.create_request('127.0.0.1', 'Web whois', 'Info')
+            logger.flush(5)
+        self.assertEqual(len(send_mock.mock_calls), 2)
+        self.assertIs(logger._sender, sender)
+        self.assertTrue(sender.is_alive())
@@ -0,0 +1,135 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.concurrency` module."""
+import threading
+from unittest.mock import sentinel
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import translation
+
+from webwhois.utils.concurrency import call_all, call_as_completed
+
+
+class TestCallAll(SimpleTestCase):
+    """Test `call_all` function."""
+
+    def _get_thread(self, value):
+        return threading.current_thread(), value
+
+    def test_sequential(self):
+        results = call_all([(self._get_thread, (sentinel.first, )), (self._get_thread, (sentinel.second, ))])
+        self.assertEqual(results, [(threading.current_thread(), sentinel.first),
+                                   (threading.current_thread(), sentinel.second)])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent(self):
+        results = call_all([(self._get_thread, (sentinel.first, )), (self._get_thread, (sentinel.second, ))])
+        self.assertEqual([value for thread, value in results], [sentinel.first, sentinel.second])
+        self.assertNotIn(threading.current_thread(), [thread for thread, value in results])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent_single_call(self):
+        self.assertEqual(call_all([(self._get_thread, (sentinel.value, ))]),
+                         [(threading.current_thread(), sentinel.value)])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent_language(self):
+        with translation.override('cs'):
+            results = call_all([(translation.get_language, ()), (translation.get_language, ())])
+        self.assertEqual(results, ['cs', 'cs'])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent_nested(self):
+        def _nested(value):
+            return call_all([(self._get_thread, (value, )), (self._get_thread, (value, ))])
+
+        results = call_all([(_nested, (sentinel.first, )), (_nested, (sentinel.second, ))])
+        # Nested calls are executed in the thread of the outer call.
+        for nested in results:
+            self.assertEqual(nested[0][0], nested[1][0])
+
+    def _fail(self, error):
+        raise error
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent_error_order(self):
+        done = []
+        with self.assertRaisesRegex(ValueError, 'first'):
+            call_all([(done.append, (sentinel.first, )), (self._fail, (ValueError('first'), )),
+                      (self._fail, (KeyError('second'), )), (done.append, (sentinel.last, ))])
+        # All calls are finished before the error is raised.
+        self.assertCountEqual(done, [sentinel.first, sentinel.last])
+
+    def test_sequential_error(self):
+        done = []
+        with self.assertRaisesRegex(ValueError, 'first'):
+            call_all([(self._fail, (ValueError('first'), )), (done.append, (sentinel.last, ))])
+        self.assertEqual(done, [])
+
+
+class TestCallAsCompleted(SimpleTestCase):
+    """Test `call_as_completed` function."""
+
+    def _get_thread(self, value):
+        return threading.current_thread(), value
+
+    def test_sequential(self):
+        results = list(call_as_completed([(self._get_thread, (sentinel.first, )),
+                                          (self._get_thread, (sentinel.second, ))], 1))
+        self.assertEqual(results, [(0, (threading.current_thread(), sentinel.first)),
+                                   (1, (threading.current_thread(), sentinel.second))])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent(self):
+        results = list(call_as_completed([(self._get_thread, (value, )) for value in range(5)], 2))
+        self.assertCountEqual([(index, value) for index, (thread, value) in results], [(i, i) for i in range(5)])
+        self.assertNotIn(threading.current_thread(), [thread for index, (thread, value) in results])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent_max_pending(self):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def _call(value):
+            with lock:
+                running.append(value)
+                max_running.append(len(running))
+            threading.Event().wait(0.01)
+            with lock:
+                running.remove(value)
+            return value
+
+        results = list(call_as_completed(((_call, (value, )) for value in range(6)), 2))
+        self.assertCountEqual([value for index, value in results], range(6))
+        self.assertLessEqual(max(max_running), 2)
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent_language(self):
+        with translation.override('cs'):
+            results = list(call_as_completed([(translation.get_language, ()), (translation.get_language, ())], 2))
+        self.assertEqual([language for index, language in results], ['cs', 'cs'])
+
+    def _fail(self, error):
+        raise error
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent_error(self):
+        with self.assertRaisesRegex(ValueError, 'first'):
+            list(call_as_completed([(self._fail, (ValueError('first'), ))], 2))
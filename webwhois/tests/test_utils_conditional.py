@@ -0,0 +1,39 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.conditional` module."""
+from django.test import SimpleTestCase
+
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+from webwhois.utils.conditional import get_etag
+
+
+class TestGetEtag(GetRegistryObjectMixin, SimpleTestCase):
+    """Test `get_etag` function."""
+
+    def test_equal(self):
+        self.assertEqual(get_etag({'nsset': {'detail': self._get_nsset()}}, 'en'),
+                         get_etag({'nsset': {'detail': self._get_nsset()}}, 'en'))
+
+    def test_object_changed(self):
+        self.assertNotEqual(get_etag({'nsset': {'detail': self._get_nsset()}}, 'en'),
+                            get_etag({'nsset': {'detail': self._get_nsset(fqdn1='c.ns.nic.cz')}}, 'en'))
+
+    def test_variant(self):
+        self.assertNotEqual(get_etag({'nsset': {'detail': self._get_nsset()}}, 'en'),
+                            get_etag({'nsset': {'detail': self._get_nsset()}}, 'cs'))
@@ -0,0 +1,135 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.corba_pool` module."""
+from collections import OrderedDict
+from unittest.mock import Mock, call, patch, sentinel
+
+import omniORB
+from django.test import SimpleTestCase
+from fred_idl.Registry.Whois import INVALID_HANDLE
+
+from webwhois.utils.corba_pool import ObjectReferencePool
+
+
+class TestObjectReferencePool(SimpleTestCase):
+    """Test `ObjectReferencePool` class."""
+
+    def setUp(self):
+        self.first = Mock(name='first')
+        self.second = Mock(name='second')
+        self.pool = ObjectReferencePool('Whois2', sentinel.idl_class,
+                                        OrderedDict([('first:2809', self.first), ('second:2809', self.second)]))
+
+    def _select_first(self, low, high):
+        return 0
+
+    def test_call(self):
+        self.first.get_object.return_value.get_contact.return_value = sentinel.contact
+        with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+            self.assertEqual(self.pool.get_contact('KONTAKT'), sentinel.contact)
+            self.assertEqual(self.pool.get_contact('KONTAKT'), sentinel.contact)
+        # Object reference is resolved once.
+        self.assertEqual(self.first.mock_calls, [call.get_object('Whois2', sentinel.idl_class),
+                                                 call.get_object().get_contact('KONTAKT'),
+                                                 call.get_object().get_contact('KONTAKT')])
+        self.assertEqual(self.second.mock_calls, [])
+
+    def test_call_failure(self):
+        self.first.get_object.return_value.get_contact.side_effect = omniORB.CORBA.TRANSIENT()
+        self.second.get_object.return_value.get_contact.return_value = sentinel.contact
+        with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+            self.assertEqual(self.pool.get_contact('KONTAKT'), sentinel.contact)
+            self.assertEqual(self.pool.get_contact('KONTAKT'), sentinel.contact)
+        self.assertEqual(self.second.mock_calls, [call.get_object('Whois2', sentinel.idl_class),
+                                                  call.get_object().get_contact('KONTAKT'),
+                                                  call.get_object().get_contact('KONTAKT')])
+        metrics = self.pool.get_metrics()
+        # Object reference is resolved again after the failure.
+        self.assertEqual(metrics[0]['resolutions'], 2)
+        self.assertEqual(metrics[0]['failures'], 2)
+        self.assertFalse(metrics[0]['resolved'])
+        self.assertLess(metrics[0]['score'], 1)
+        self.assertEqual((metrics[1]['calls'], metrics[1]['failures']), (2, 0))
+
+    def test_call_failure_all(self):
+        self.first.get_object.return_value.get_contact.side_effect = omniORB.CORBA.COMM_FAILURE()
+        self.second.get_object.return_value.get_contact.side_effect = omniORB.CORBA.TRANSIENT()
+        with self.assertRaises(omniORB.CORBA.TRANSIENT):
+            with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+                self.pool.get_contact('KONTAKT')
+        self.assertEqual([m['failures'] for m in self.pool.get_metrics()], [1, 1])
+
+    def test_call_failure_completed_maybe(self):
+        self.first.get_object.return_value.create_request.side_effect = omniORB.CORBA.COMM_FAILURE(
+            0, omniORB.CORBA.COMPLETED_MAYBE)
+        with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+            with self.assertRaises(omniORB.CORBA.COMM_FAILURE):
+                self.pool.create_request('KONTAKT')
+        # The call might have been processed, it's not repeated.
+        self.assertEqual(self.second.mock_calls, [])
+        metrics = self.pool.get_metrics()
+        self.assertEqual(metrics[0]['failures'], 1)
+        self.assertFalse(metrics[0]['resolved'])
+
+    def test_call_deadline(self):
+        # omniORB reports exceeded call timeouts as `TRANSIENT` with `COMPLETED_MAYBE` status.
+        self.first.get_object.return_value.get_contact.side_effect = omniORB.CORBA.TRANSIENT(
+            0, omniORB.CORBA.COMPLETED_MAYBE)
+        with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+            with self.assertRaises(omniORB.CORBA.TRANSIENT):
+                self.pool.get_contact('KONTAKT')
+        self.assertEqual(self.second.mock_calls, [])
+
+    def test_call_other_exception(self):
+        self.first.get_object.return_value.get_contact.side_effect = ValueError
+        with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+            with self.assertRaises(ValueError):
+                self.pool.get_contact('KONTAKT')
+        self.assertEqual(self.second.mock_calls, [])
+
+    def test_call_user_exception(self):
+        self.first.get_object.return_value.get_contact.side_effect = INVALID_HANDLE
+        with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+            with self.assertRaises(INVALID_HANDLE):
+                self.pool.get_contact('KONTAKT')
+        self.assertEqual(self.pool.get_metrics()[0], {'netloc': 'first:2809', 'score': 1.0, 'resolved': True,
+                                                      'calls': 1, 'failures': 0, 'resolutions': 1})
+
+    def test_resolve_failure(self):
+        self.first.get_object.side_effect = omniORB.CORBA.TRANSIENT()
+        self.second.get_object.return_value.get_contact.return_value = sentinel.contact
+        with patch('webwhois.utils.corba_pool.random.uniform', side_effect=self._select_first):
+            self.assertEqual(self.pool.get_contact('KONTAKT'), sentinel.contact)
+        self.assertEqual([m['failures'] for m in self.pool.get_metrics()], [1, 0])
+
+    def test_resolve_failure_all(self):
+        self.first.get_object.side_effect = omniORB.CORBA.TRANSIENT()
+        self.second.get_object.side_effect = omniORB.CORBA.TRANSIENT()
+        with self.assertRaises(omniORB.CORBA.TRANSIENT):
+            self.pool.get_contact('KONTAKT')
+
+    def test_select_health(self):
+        self.pool.members[0].score = 0.1
+        # The point falls past the weight of the unhealthy member.
+        with patch('webwhois.utils.corba_pool.random.uniform', return_value=0.5):
+            self.assertEqual(self.pool.select(), self.pool.members[1])
+
+    def test_private_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.pool._private
@@ -0,0 +1,179 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.file_cache` module."""
+import os
+import tempfile
+from unittest.mock import Mock, patch
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from webwhois.utils.file_cache import FileCache, get_file_cache, get_file_response
+
+
+class TestFileCache(SimpleTestCase):
+    """Test `FileCache` class."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.directory = temp_dir.name
+        self.file_cache = FileCache(self.directory, 10)
+
+    def _set(self, key, content):
+        with self.file_cache.set(key, content) as file:
+            return file.read()
+
+    def _get(self, key):
+        file = self.file_cache.get(key)
+        if file is None:
+            return None
+        with file:
+            return file.read()
+
+    def _set_used(self, key, timestamp):
+        os.utime(self.file_cache.get_path(key), (timestamp, timestamp))
+
+    def test_get_empty(self):
+        self.assertIsNone(self.file_cache.get('key'))
+
+    def test_set(self):
+        self.assertEqual(self._set('key', [b'abc', b'def']), b'abcdef')
+        self.assertTrue(self.file_cache.get_path('key').startswith(self.directory))
+        self.assertEqual(self._get('key'), b'abcdef')
+        self.assertIsNone(self.file_cache.get('other'))
+
+    def test_set_error(self):
+        def _content():
+            yield b'abc'
+            raise ValueError('Download failed')
+
+        with self.assertRaises(ValueError):
+            self.file_cache.set('key', _content())
+        self.assertIsNone(self.file_cache.get('key'))
+        # No temporary files are left.
+        self.assertEqual([files for _, _, files in os.walk(self.directory)], [[], []])
+
+    def test_set_closed(self):
+        content = Mock(__iter__=Mock(return_value=iter([b'abc'])))
+        self._set('key', content)
+        self.assertEqual(content.close.call_count, 1)
+
+    def test_set_write_error_closed(self):
+        content = Mock(__iter__=Mock(return_value=iter([b'abc'])))
+        with patch('webwhois.utils.file_cache.os.replace', side_effect=OSError('No space left on device')):
+            with self.assertRaises(OSError):
+                self.file_cache.set('key', content)
+        self.assertEqual(content.close.call_count, 1)
+        self.assertEqual([files for _, _, files in os.walk(self.directory)], [[], []])
+
+    def test_get_used(self):
+        self._set('key', [b'abc'])
+        self._set_used('key', 1000)
+        self._get('key')
+        self.assertGreater(os.stat(self.file_cache.get_path('key')).st_mtime, 1000)
+
+    def test_get_removed(self):
+        # Opened file can be read even if it's removed by another process.
+        self._set('key', [b'abc'])
+        with self.file_cache.get('key') as file:
+            os.unlink(self.file_cache.get_path('key'))
+            self.assertEqual(file.read(), b'abc')
+        self.assertIsNone(self.file_cache.get('key'))
+
+    def test_evict(self):
+        self._set('old', [b'abcd'])
+        self._set_used('old', 1000)
+        self._set('used', [b'abcd'])
+        self._set_used('used', 2000)
+        self._set('new', [b'abcd'])
+        self.assertIsNone(self.file_cache.get('old'))
+        self.assertEqual(self._get('used'), b'abcd')
+        self.assertEqual(self._get('new'), b'abcd')
+
+    def test_evict_keep(self):
+        self._set('old', [b'abcd'])
+        self._set_used('old', 1000)
+        self.assertEqual(self._set('big', [b'0123456789abc']), b'0123456789abc')
+        self.assertEqual(self._get('big'), b'0123456789abc')
+        self.assertIsNone(self.file_cache.get('old'))
+
+
+class TestGetFileCache(SimpleTestCase):
+    """Test `get_file_cache` function."""
+
+    def test_disabled(self):
+        self.assertIsNone(get_file_cache())
+
+    @override_settings(WEBWHOIS_FILE_CACHE_DIR='/tmp/files', WEBWHOIS_FILE_CACHE_MAX_SIZE=42)
+    def test_enabled(self):
+        file_cache = get_file_cache()
+        self.assertEqual(file_cache.directory, '/tmp/files')
+        self.assertEqual(file_cache.max_size, 42)
+
+
+class TestGetFileResponse(SimpleTestCase):
+    """Test `get_file_response` function."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.directory = temp_dir.name
+        self.file_cache = FileCache(self.directory, 100)
+        self.file_cache.set('key', [b'content']).close()
+        self.file = self.file_cache.get('key')
+        self.addCleanup(self.file.close)
+        self.name = self.file_cache.get_name('key')
+
+    def test_file(self):
+        response = get_file_response(RequestFactory().get('/'), self.file, self.name, 'text/plain')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(response['Content-Length'], '7')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), b'content')
+        self.assertTrue(self.file.closed)
+
+    def test_range(self):
+        response = get_file_response(RequestFactory().get('/', HTTP_RANGE='bytes=2-4'), self.file, self.name,
+                                     'text/plain')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Length'], '3')
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/7')
+        self.assertEqual(b''.join(response.streaming_content), b'nte')
+
+    def test_range_not_satisfiable(self):
+        response = get_file_response(RequestFactory().get('/', HTTP_RANGE='bytes=10-'), self.file, self.name,
+                                     'text/plain')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */7')
+        self.assertTrue(self.file.closed)
+
+    def test_closed(self):
+        # File is closed with the response, even if the response isn't read.
+        response = get_file_response(RequestFactory().get('/'), self.file, self.name, 'text/plain')
+        response.close()
+        self.assertTrue(self.file.closed)
+
+    def test_accel_redirect(self):
+        with override_settings(WEBWHOIS_FILE_CACHE_ACCEL_REDIRECT='/files/'):
+            response = get_file_response(RequestFactory().get('/'), self.file, self.name, 'text/plain')
+        self.assertEqual(response['X-Accel-Redirect'], '/files/' + self.name)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(response.content, b'')
+        self.assertTrue(self.file.closed)
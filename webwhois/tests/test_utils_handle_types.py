@@ -0,0 +1,156 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.handle_types` module."""
+from unittest.mock import call, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.utils import WHOIS
+from webwhois.utils.handle_types import HandleTypeClassifier, HandleTypeRule, is_in_zones
+from webwhois.utils.managed_zones import MANAGED_ZONES
+
+OBJECT_TYPES = ['contact', 'nsset', 'keyset', 'registrar', 'domain']
+RULES = [
+    {'pattern': r'^REG-', 'types': ['registrar']},
+    {'pattern': r'\.', 'types': ['domain']},
+]
+
+
+class TestHandleTypeRule(SimpleTestCase):
+    """Test `HandleTypeRule` class."""
+
+    def test_matches(self):
+        rule = HandleTypeRule(r'^reg-', ['registrar'])
+        self.assertTrue(rule.matches('REG-FRED_A', ()))
+        self.assertFalse(rule.matches('CONTACT', ()))
+
+    def test_in_managed_zone(self):
+        rule = HandleTypeRule(r'\.', ['domain'], in_managed_zone=True)
+        self.assertTrue(rule.matches('example.cz', ['cz']))
+        self.assertFalse(rule.matches('example.org', ['cz']))
+
+    def test_not_in_managed_zone(self):
+        rule = HandleTypeRule(r'\.', ['domain'], in_managed_zone=False)
+        self.assertFalse(rule.matches('example.cz', ['cz']))
+        self.assertTrue(rule.matches('example.org', ['cz']))
+
+    def test_unknown_type(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown object types'):
+            HandleTypeRule(r'.', ['domain', 'person'])
+
+
+class TestIsInZones(SimpleTestCase):
+    """Test `is_in_zones` function."""
+
+    def test_in_zones(self):
+        self.assertTrue(is_in_zones('example.cz', ['cz']))
+        self.assertTrue(is_in_zones('EXAMPLE.CZ.', ['cz']))
+        self.assertTrue(is_in_zones('1.2.e164.arpa', ['cz', '0.2.4.e164.arpa', 'e164.arpa']))
+
+    def test_not_in_zones(self):
+        self.assertFalse(is_in_zones('cz', ['cz']))
+        self.assertFalse(is_in_zones('examplecz', ['cz']))
+        self.assertFalse(is_in_zones('example.org', ['cz']))
+        self.assertFalse(is_in_zones('example.cz', []))
+
+
+class TestHandleTypeClassifier(SimpleTestCase):
+    """Test `HandleTypeClassifier` class."""
+
+    def setUp(self):
+        self.classifier = HandleTypeClassifier()
+
+    def test_no_rules(self):
+        self.assertEqual(self.classifier.classify('example.cz', OBJECT_TYPES), OBJECT_TYPES)
+        self.assertEqual(self.classifier.get_stats(),
+                         {'lookups': 0, 'matched': 0, 'candidates': 0, 'pruned': 0, 'fallbacks': 0,
+                          'pruning_ratio': 0.0})
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=RULES)
+    def test_classify(self):
+        self.assertEqual(self.classifier.classify('REG-FRED_A', OBJECT_TYPES), ['registrar'])
+        self.assertEqual(self.classifier.classify('example.cz', OBJECT_TYPES), ['domain'])
+        self.assertEqual(self.classifier.classify('CONTACT', OBJECT_TYPES), OBJECT_TYPES)
+        self.assertEqual(self.classifier.get_stats(),
+                         {'lookups': 3, 'matched': 2, 'candidates': 15, 'pruned': 8, 'fallbacks': 0,
+                          'pruning_ratio': 8 / 15})
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=RULES)
+    def test_classify_order(self):
+        self.assertEqual(self.classifier.classify('REG-example.cz', OBJECT_TYPES), ['registrar'])
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=[{'pattern': r'\.', 'types': ['domain', 'contact']}])
+    def test_classify_types_order(self):
+        self.assertEqual(self.classifier.classify('example.cz', OBJECT_TYPES), ['contact', 'domain'])
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=[{'pattern': r'\.', 'types': ['domain'], 'in_managed_zone': True}],
+                       WEBWHOIS_MANAGED_ZONES_REFRESH=3600)
+    def test_classify_managed_zone(self):
+        MANAGED_ZONES.clear()
+        self.addCleanup(MANAGED_ZONES.clear)
+        with patch.object(WHOIS, 'client', spec=('get_managed_zone_list', )):
+            WHOIS.get_managed_zone_list.return_value = ['cz']
+            self.assertEqual(self.classifier.classify('example.cz', OBJECT_TYPES), ['domain'])
+            self.assertEqual(self.classifier.classify('example.org', OBJECT_TYPES), OBJECT_TYPES)
+            # Zones are loaded once into the snapshot.
+            self.assertEqual(WHOIS.mock_calls, [call.get_managed_zone_list()])
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=[{'pattern': r'\.', 'types': ['domain'], 'in_managed_zone': True},
+                                                   {'pattern': r'\.', 'types': ['contact']}])
+    def test_classify_managed_zone_disabled(self):
+        with patch.object(WHOIS, 'client', spec=('get_managed_zone_list', )):
+            # Rule in managed zones is skipped without the snapshot of managed zones.
+            self.assertEqual(self.classifier.classify('example.cz', OBJECT_TYPES), ['contact'])
+            self.assertEqual(WHOIS.mock_calls, [])
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=RULES)
+    def test_rules_compiled_once(self):
+        rules = self.classifier.get_rules()
+        self.assertIs(self.classifier.get_rules(), rules)
+        with override_settings(WEBWHOIS_HANDLE_TYPE_RULES=RULES[:1]):
+            self.assertEqual(len(self.classifier.get_rules()), 1)
+
+    def test_fallback(self):
+        self.classifier.record_fallback()
+        self.assertEqual(self.classifier.get_stats()['fallbacks'], 1)
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=RULES)
+    def test_metrics(self):
+        self.classifier.classify('example.cz', OBJECT_TYPES)
+        self.classifier.record_fallback()
+        self.assertEqual(self.classifier.get_metrics(), '\n'.join([
+            '# TYPE webwhois_handle_type_candidates_total counter',
+            'webwhois_handle_type_candidates_total 5',
+            '# TYPE webwhois_handle_type_fallbacks_total counter',
+            'webwhois_handle_type_fallbacks_total 1',
+            '# TYPE webwhois_handle_type_lookups_total counter',
+            'webwhois_handle_type_lookups_total 1',
+            '# TYPE webwhois_handle_type_matched_total counter',
+            'webwhois_handle_type_matched_total 1',
+            '# TYPE webwhois_handle_type_pruned_total counter',
+            'webwhois_handle_type_pruned_total 4',
+        ]) + '\n')
+
+    @override_settings(WEBWHOIS_HANDLE_TYPE_RULES=RULES)
+    def test_clear(self):
+        self.classifier.classify('example.cz', OBJECT_TYPES)
+        self.classifier.clear()
+        self.assertEqual(self.classifier.get_stats(),
+                         {'lookups': 0, 'matched': 0, 'candidates': 0, 'pruned': 0, 'fallbacks': 0,
+                          'pruning_ratio': 0.0})
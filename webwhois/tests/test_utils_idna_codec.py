@@ -0,0 +1,107 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.idna_codec` module."""
+from unittest.mock import patch
+
+import idna
+from django.test import SimpleTestCase
+
+from webwhois.utils import idna_codec
+
+NAMES = ('example.cz', 'Example.CZ', 'example.cz.', 'cz', '123.cz', 'a-b.cz', 'a_b.cz', '-a.cz', 'a-.cz', 'ab--c.cz',
+         'xn--hkyrky-ptac70bc.cz', 'XN--HKYRKY-PTAC70BC.CZ', 'xn--invalid.cz', 'háčkyčárky.cz', 'a..cz', '.', '',
+         'a' * 64 + '.cz', '.'.join(['a' * 63] * 4), 'example.cz\n')
+
+
+class TestIsPlainAscii(SimpleTestCase):
+    """Test `is_plain_ascii` function."""
+
+    def test_plain(self):
+        for name in ('example.cz', 'Example.CZ', 'example.cz.', 'cz', '123.cz', 'a-b.cz', 'a' * 63 + '.cz'):
+            with self.subTest(name=name):
+                self.assertTrue(idna_codec.is_plain_ascii(name))
+
+    def test_not_plain(self):
+        for name in ('xn--hkyrky-ptac70bc.cz', 'XN--HKYRKY-PTAC70BC.CZ', 'ab--c.cz', 'háčkyčárky.cz', 'a_b.cz',
+                     '-a.cz', 'a-.cz', 'a..cz', '.', '', 'a' * 64 + '.cz', '.'.join(['a' * 63] * 4), 'example.cz\n'):
+            with self.subTest(name=name):
+                self.assertFalse(idna_codec.is_plain_ascii(name))
+
+
+class TestCodec(SimpleTestCase):
+    """Test `encode` and `decode` functions."""
+
+    def setUp(self):
+        idna_codec.clear_cache()
+        self.addCleanup(idna_codec.clear_cache)
+
+    def _assert_same(self, codec_function, idna_function, name):
+        try:
+            expected = idna_function(name)
+        except idna.IDNAError:
+            with self.assertRaises(idna.IDNAError):
+                codec_function(name)
+        else:
+            self.assertEqual(codec_function(name), expected)
+
+    def test_encode(self):
+        for name in NAMES:
+            with self.subTest(name=name):
+                self._assert_same(idna_codec.encode, lambda value: idna.encode(value).decode(), name)
+
+    def test_decode(self):
+        for name in NAMES:
+            with self.subTest(name=name):
+                self._assert_same(idna_codec.decode, idna.decode, name)
+
+    def test_fast_path(self):
+        with patch('webwhois.utils.idna_codec.idna.encode') as encode_mock, \
+                patch('webwhois.utils.idna_codec.idna.decode') as decode_mock:
+            self.assertEqual(idna_codec.encode('Example.CZ'), 'Example.CZ')
+            self.assertEqual(idna_codec.decode('Example.CZ'), 'example.cz')
+        self.assertEqual(encode_mock.mock_calls, [])
+        self.assertEqual(decode_mock.mock_calls, [])
+
+    def test_cache(self):
+        with patch('webwhois.utils.idna_codec.idna.decode', wraps=idna.decode) as decode_mock:
+            self.assertEqual(idna_codec.decode('xn--hkyrky-ptac70bc.cz'), 'háčkyčárky.cz')
+            self.assertEqual(idna_codec.decode('xn--hkyrky-ptac70bc.cz'), 'háčkyčárky.cz')
+        self.assertEqual(len(decode_mock.mock_calls), 1)
+        self.assertEqual(idna_codec.get_cache_info()['decode'], (1, 1, idna_codec.CACHE_SIZE, 1))
+
+    def test_cache_error(self):
+        with patch('webwhois.utils.idna_codec.idna.encode', wraps=idna.encode) as encode_mock:
+            for _ in range(2):
+                with self.assertRaisesRegex(idna.IDNAError, 'Codepoint'):
+                    idna_codec.encode('a_b.cz')
+        self.assertEqual(len(encode_mock.mock_calls), 1)
+
+    def test_cache_error_type(self):
+        with self.assertRaises(idna.InvalidCodepoint) as expected:
+            idna.encode('a_b.cz')
+        for _ in range(2):
+            with self.assertRaises(idna.InvalidCodepoint) as context:
+                idna_codec.encode('a_b.cz')
+            self.assertEqual(str(context.exception), str(expected.exception))
+            self.assertIsNone(context.exception.__context__)
+
+    def test_clear_cache(self):
+        idna_codec.encode('háčkyčárky.cz')
+        idna_codec.clear_cache()
+        self.assertEqual(idna_codec.get_cache_info()['encode'], (0, 0, idna_codec.CACHE_SIZE, 0))
@@ -0,0 +1,59 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.json_encoder` module."""
+from datetime import date, datetime, timezone
+
+from django.test import SimpleTestCase
+from django.utils.translation import ugettext_lazy as _
+from fred_idl.Registry.Whois import DisclosableString, IPAddress, IPv4
+
+from webwhois.utils.json_encoder import encode
+
+
+class TestEncode(SimpleTestCase):
+    """Test `encode` function."""
+
+    def test_primitives(self):
+        for value in (None, True, 42, 4.2, 'text'):
+            self.assertEqual(encode(value), value)
+
+    def test_containers(self):
+        self.assertEqual(encode({'a': ('b', ['c'])}), {'a': ['b', ['c']]})
+
+    def test_dates(self):
+        self.assertEqual(encode(date(2001, 2, 3)), '2001-02-03')
+        self.assertEqual(encode(datetime(2001, 2, 3, 4, 5, 6, tzinfo=timezone.utc)), '2001-02-03T04:05:06+00:00')
+
+    def test_bytes(self):
+        self.assertEqual(encode(b'bytes'), 'Ynl0ZXM=')
+
+    def test_lazy(self):
+        self.assertEqual(encode(_('Contact')), 'Contact')
+
+    def test_struct(self):
+        self.assertEqual(encode(IPAddress(address='194.0.12.1', version=IPv4)),
+                         {'address': '194.0.12.1', 'version': 'IPv4'})
+
+    def test_disclosable(self):
+        self.assertEqual(encode(DisclosableString(value='rimmer@foo.foo', disclose=True)), 'rimmer@foo.foo')
+        self.assertIsNone(encode(DisclosableString(value='rimmer@foo.foo', disclose=False)))
+
+    def test_unknown(self):
+        with self.assertRaisesRegex(TypeError, "can't be encoded"):
+            encode(object())
@@ -0,0 +1,136 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.managed_zones` module."""
+from unittest.mock import call, patch
+
+from django.test import SimpleTestCase, override_settings
+from fred_idl.Registry.Whois import TOO_MANY_LABELS, UNMANAGED_ZONE
+
+from webwhois.utils.corba_wrapper import WHOIS
+from webwhois.utils.managed_zones import MANAGED_ZONES, ManagedZones, ZoneTrie, get_managed_zone_list, \
+    get_managed_zones, is_valid_name
+
+ZONES = ['cz', '0.2.4.e164.arpa', 'co.cz']
+
+
+class TestIsValidName(SimpleTestCase):
+    """Test `is_valid_name` function."""
+
+    def test_valid(self):
+        for name in ('example.cz', 'EXAMPLE.cz', 'a-b.cz', 'xn--hkyrky-ptac70bc.cz', '1.0.2.4.e164.arpa', 'www.a.cz'):
+            with self.subTest(name=name):
+                self.assertTrue(is_valid_name(name))
+
+    def test_invalid(self):
+        for name in ('cz', 'example.cz.', '-a.cz', 'a-.cz', 'ab--c.cz', 'a_b.cz', '.cz', 'a..cz', 'a' * 64 + '.cz',
+                     ('a' * 63 + '.') * 4 + 'cz'):
+            with self.subTest(name=name):
+                self.assertFalse(is_valid_name(name))
+
+
+class TestZoneTrie(SimpleTestCase):
+    """Test `ZoneTrie` class."""
+
+    def test_find(self):
+        trie = ZoneTrie(ZONES)
+        self.assertEqual(trie.find(['example', 'cz']), ('cz', 1))
+        self.assertEqual(trie.find(['www', 'example', 'cz']), ('cz', 1))
+        self.assertEqual(trie.find(['example', 'co', 'cz']), ('co.cz', 2))
+        self.assertEqual(trie.find(['1', '0', '2', '4', 'e164', 'arpa']), ('0.2.4.e164.arpa', 5))
+
+    def test_find_not_found(self):
+        trie = ZoneTrie(ZONES)
+        self.assertIsNone(trie.find(['cz']))
+        self.assertIsNone(trie.find(['example', 'org']))
+        self.assertIsNone(trie.find(['4', 'e164', 'arpa']))
+        self.assertIsNone(trie.find([]))
+
+    def test_zone_case(self):
+        trie = ZoneTrie(['CZ.'])
+        self.assertEqual(trie.find(['example', 'cz']), ('CZ.', 1))
+
+
+class TestManagedZones(SimpleTestCase):
+    """Test `ManagedZones` class."""
+
+    def setUp(self):
+        self.zones = ManagedZones(ZONES)
+
+    def test_zones(self):
+        self.assertEqual(self.zones.zones, tuple(ZONES))
+
+    def test_find_zone(self):
+        self.assertEqual(self.zones.find_zone('example.co.cz'), 'co.cz')
+        self.assertIsNone(self.zones.find_zone('example.org'))
+
+    def test_check_domain(self):
+        for name in ('example.cz', 'example.co.cz', '1.0.2.4.e164.arpa', '5.4.3.1.0.2.4.e164.arpa',
+                     # Invalid names are left to the backend.
+                     'a_b.org', 'org', 'example.org.'):
+            with self.subTest(name=name):
+                self.assertIsNone(self.zones.check_domain(name))
+
+    def test_check_domain_unmanaged_zone(self):
+        for name in ('example.org', 'e164.arpa.example', '4.e164.arpa'):
+            with self.subTest(name=name):
+                with self.assertRaises(UNMANAGED_ZONE):
+                    self.zones.check_domain(name)
+
+    def test_check_domain_too_many_labels(self):
+        for name in ('www.example.cz', 'a.b.example.co.cz'):
+            with self.subTest(name=name):
+                with self.assertRaises(TOO_MANY_LABELS):
+                    self.zones.check_domain(name)
+
+    def test_is_enum(self):
+        self.assertTrue(ManagedZones.is_enum('0.2.4.e164.arpa'))
+        self.assertTrue(ManagedZones.is_enum('E164.ARPA.'))
+        self.assertFalse(ManagedZones.is_enum('cz'))
+        self.assertFalse(ManagedZones.is_enum('xe164.arpa'))
+
+    def test_get_registrable_name(self):
+        self.assertEqual(self.zones.get_registrable_name('www.example.cz', 'www.example.cz'), 'example.cz')
+        self.assertEqual(self.zones.get_registrable_name('a.b.example.co.cz', 'a.b.example.co.cz'), 'example.co.cz')
+        self.assertEqual(self.zones.get_registrable_name('www.háčkyčárky.cz', 'www.xn--hkyrky-ptac70bc.cz'),
+                         'háčkyčárky.cz')
+        self.assertIsNone(self.zones.get_registrable_name('www.example.org', 'www.example.org'))
+
+
+class TestGetManagedZones(SimpleTestCase):
+    """Test `get_managed_zones` and `get_managed_zone_list` functions."""
+
+    def setUp(self):
+        patcher = patch.object(WHOIS, 'client', spec=('get_managed_zone_list', ))
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        WHOIS.get_managed_zone_list.return_value = ZONES
+        MANAGED_ZONES.clear()
+        self.addCleanup(MANAGED_ZONES.clear)
+
+    def test_disabled(self):
+        self.assertIsNone(get_managed_zones())
+        self.assertEqual(get_managed_zone_list(), ZONES)
+        self.assertEqual(get_managed_zone_list(), ZONES)
+        self.assertEqual(WHOIS.mock_calls, [call.get_managed_zone_list(), call.get_managed_zone_list()])
+
+    @override_settings(WEBWHOIS_MANAGED_ZONES_REFRESH=3600)
+    def test_enabled(self):
+        self.assertEqual(get_managed_zones().zones, tuple(ZONES))
+        self.assertEqual(get_managed_zone_list(), tuple(ZONES))
+        self.assertEqual(WHOIS.mock_calls, [call.get_managed_zone_list()])
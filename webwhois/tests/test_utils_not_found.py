@@ -0,0 +1,244 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.not_found` module."""
+import os
+import time
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock, call, sentinel
+
+from django.test import SimpleTestCase, override_settings
+from fred_idl.Registry.Whois import OBJECT_NOT_FOUND
+from testfixtures import LogCapture
+
+from webwhois.utils.layers import LayeredClientProxy
+from webwhois.utils.not_found import KNOWN_HANDLES, BloomFilter, KnownHandles, KnownHandlesSnapshot, NotFoundFilter, \
+    get_known_handles
+
+EXPORT = 'domain example.cz\ndomain háčkyčárky.cz\ncontact KONTAKT\n\ninvalid line here\n'
+
+
+class ExportMixin(object):
+    """Mixin which creates an export file."""
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'handles.txt')
+        self.write_export(EXPORT)
+
+    def write_export(self, content: str, mtime: float = None) -> None:
+        with open(self.path, 'w', encoding='utf-8') as export:
+            export.write(content)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+
+class TestBloomFilter(SimpleTestCase):
+    """Test `BloomFilter` class."""
+
+    def test_contains(self):
+        bloom = BloomFilter(1000, 0.001)
+        for index in range(1000):
+            bloom.add('handle-{}'.format(index))
+        self.assertTrue(all('handle-{}'.format(index) in bloom for index in range(1000)))
+        false_positives = sum('other-{}'.format(index) in bloom for index in range(10000))
+        self.assertLess(false_positives, 50)
+
+    def test_empty(self):
+        bloom = BloomFilter(0, 0.001)
+        self.assertNotIn('handle', bloom)
+
+
+class TestKnownHandles(ExportMixin, SimpleTestCase):
+    """Test `KnownHandles` class."""
+
+    def test_from_file(self):
+        known_handles = KnownHandles.from_file(self.path)
+        self.assertEqual(known_handles.exported, os.stat(self.path).st_mtime)
+        self.assertEqual(set(known_handles.filters), {'domain', 'contact'})
+
+    def test_is_unknown(self):
+        known_handles = KnownHandles.from_file(self.path)
+        self.assertFalse(known_handles.is_unknown('domain', 'example.cz'))
+        self.assertFalse(known_handles.is_unknown('domain', 'EXAMPLE.CZ'))
+        self.assertFalse(known_handles.is_unknown('domain', 'háčkyčárky.cz'))
+        # Domains are looked up in ASCII.
+        self.assertFalse(known_handles.is_unknown('domain', 'xn--hkyrky-ptac70bc.cz'))
+        self.assertFalse(known_handles.is_unknown('domain', 'XN--HKYRKY-PTAC70BC.CZ.'))
+        self.assertFalse(known_handles.is_unknown('contact', 'kontakt'))
+        self.assertFalse(known_handles.is_unknown('domain', 'example.cz.'))
+        self.assertFalse(known_handles.is_unknown('domain', ' example.cz '))
+        self.assertTrue(known_handles.is_unknown('domain', 'other.cz'))
+        self.assertTrue(known_handles.is_unknown('contact', 'example.cz'))
+        # Types missing in the export are not filtered.
+        self.assertFalse(known_handles.is_unknown('nsset', 'NSSET'))
+
+    def test_is_unknown_ascii_export(self):
+        self.write_export('domain xn--hkyrky-ptac70bc.cz\n')
+        known_handles = KnownHandles.from_file(self.path)
+        self.assertFalse(known_handles.is_unknown('domain', 'xn--hkyrky-ptac70bc.cz'))
+        self.assertFalse(known_handles.is_unknown('domain', 'háčkyčárky.cz'))
+
+    def test_is_unknown_invalid_handle(self):
+        known_handles = KnownHandles.from_file(self.path)
+        # Names which can't be encoded are left to the backend.
+        self.assertFalse(known_handles.is_unknown('domain', 'a_b.cz'))
+
+    def test_from_file_invalid_domain(self):
+        self.write_export('domain example.cz\ndomain a_b.cz\ncontact KONTAKT\n')
+        with LogCapture('webwhois.utils.not_found', propagate=False) as log_handler:
+            known_handles = KnownHandles.from_file(self.path)
+        # Lookups of the invalid name couldn't be matched, so domains aren't filtered.
+        self.assertEqual(set(known_handles.filters), {'contact'})
+        self.assertFalse(known_handles.is_unknown('domain', 'other.cz'))
+        self.assertEqual(len(log_handler.records), 1)
+
+    @override_settings(WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60)
+    def test_is_fresh(self):
+        self.assertTrue(KnownHandles(time.time() - 30, {}).is_fresh())
+        self.assertFalse(KnownHandles(time.time() - 90, {}).is_fresh())
+        self.assertFalse(KnownHandles(time.time() + 30, {}).is_fresh())
+
+    def test_is_fresh_default(self):
+        self.assertFalse(KnownHandles(time.time(), {}).is_fresh())
+
+
+class TestKnownHandlesSnapshot(ExportMixin, SimpleTestCase):
+    """Test `KnownHandlesSnapshot` class and `get_known_handles` function."""
+
+    def setUp(self):
+        super().setUp()
+        KNOWN_HANDLES.clear()
+        self.addCleanup(KNOWN_HANDLES.clear)
+
+    def test_load(self):
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            known_handles = KnownHandlesSnapshot().get()
+        self.assertFalse(known_handles.is_unknown('domain', 'example.cz'))
+
+    def test_refresh_unchanged(self):
+        snapshot = KnownHandlesSnapshot()
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            known_handles = snapshot.get()
+            snapshot.refresh()
+            self.assertIs(snapshot.get(), known_handles)
+
+    def test_refresh_changed(self):
+        snapshot = KnownHandlesSnapshot()
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            known_handles = snapshot.get()
+            self.write_export('domain other.cz\n', mtime=known_handles.exported + 10)
+            snapshot.refresh()
+            self.assertFalse(snapshot.get().is_unknown('domain', 'other.cz'))
+
+    def test_load_missing(self):
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path + '.missing'):
+            with LogCapture('webwhois.utils.not_found', propagate=False) as log_handler:
+                self.assertIsNone(KnownHandlesSnapshot().get())
+        self.assertEqual(len(log_handler.records), 1)
+
+    def test_refresh_missing(self):
+        snapshot = KnownHandlesSnapshot()
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            known_handles = snapshot.get()
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path + '.missing'):
+            with LogCapture('webwhois.utils.not_found', propagate=False):
+                snapshot.refresh()
+            self.assertIs(snapshot.get(), known_handles)
+
+    def test_get_known_handles_disabled(self):
+        self.assertIsNone(get_known_handles())
+
+    def test_get_known_handles_no_max_age(self):
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            self.assertIsNone(get_known_handles())
+
+    def test_get_known_handles(self):
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path, WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60):
+            self.assertIsNotNone(get_known_handles())
+
+    def test_get_known_handles_stale(self):
+        self.write_export(EXPORT, mtime=time.time() - 120)
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path, WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60):
+            self.assertIsNone(get_known_handles())
+
+
+class TestNotFoundFilter(ExportMixin, SimpleTestCase):
+    """Test `NotFoundFilter` class."""
+
+    def setUp(self):
+        super().setUp()
+        self.client_mock = Mock()
+        self.layer = NotFoundFilter()
+        self.proxy = LayeredClientProxy(self.client_mock, [self.layer])
+        KNOWN_HANDLES.clear()
+        self.addCleanup(KNOWN_HANDLES.clear)
+
+    def test_disabled(self):
+        self.client_mock.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        for _ in range(2):
+            with self.assertRaises(OBJECT_NOT_FOUND):
+                self.proxy.get_contact_by_handle('KONTAKT')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_contact_by_handle('KONTAKT')] * 2)
+
+    def test_no_max_age(self):
+        # The export isn't used by default.
+        self.client_mock.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            with self.assertRaises(OBJECT_NOT_FOUND):
+                self.proxy.get_domain_by_handle('other.cz')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_domain_by_handle('other.cz')])
+        self.assertEqual(self.layer.filtered, 0)
+
+    @override_settings(WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60)
+    def test_known_handles(self):
+        self.client_mock.get_domain_by_handle.return_value = sentinel.domain
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            self.assertEqual(self.proxy.get_domain_by_handle('example.cz'), sentinel.domain)
+            self.assertEqual(self.proxy.get_domain_by_handle('example.cz.'), sentinel.domain)
+            with self.assertRaises(OBJECT_NOT_FOUND):
+                self.proxy.get_domain_by_handle('other.cz')
+        self.assertEqual(self.client_mock.mock_calls,
+                         [call.get_domain_by_handle('example.cz'), call.get_domain_by_handle('example.cz.')])
+        self.assertEqual(self.layer.filtered, 1)
+
+    @override_settings(WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60)
+    def test_known_handles_idn(self):
+        # Domain exported in unicode is looked up in ASCII.
+        self.client_mock.get_domain_by_handle.return_value = sentinel.domain
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            self.assertEqual(self.proxy.get_domain_by_handle('xn--hkyrky-ptac70bc.cz'), sentinel.domain)
+        self.assertEqual(self.client_mock.mock_calls, [call.get_domain_by_handle('xn--hkyrky-ptac70bc.cz')])
+        self.assertEqual(self.layer.filtered, 0)
+
+    def test_known_handles_stale(self):
+        self.write_export(EXPORT, mtime=time.time() - 120)
+        self.client_mock.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path, WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60):
+            with self.assertRaises(OBJECT_NOT_FOUND):
+                self.proxy.get_domain_by_handle('other.cz')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_domain_by_handle('other.cz')])
+        self.assertEqual(self.layer.filtered, 0)
+
+    @override_settings(WEBWHOIS_KNOWN_HANDLES_MAX_AGE=60)
+    def test_not_handled_method(self):
+        with override_settings(WEBWHOIS_KNOWN_HANDLES_FILE=self.path):
+            self.proxy.get_managed_zone_list()
+        self.assertEqual(self.client_mock.mock_calls, [call.get_managed_zone_list()])
@@ -0,0 +1,164 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.profiling` module."""
+import threading
+from unittest.mock import Mock, call, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.utils.layers import CircuitOpen, LayeredClientProxy, RequestMemo
+from webwhois.utils.profiling import Profiler, ProfilingLayer, RequestProfile
+
+
+class TestRequestProfile(SimpleTestCase):
+    """Test `RequestProfile` class."""
+
+    def test_empty(self):
+        profile = RequestProfile()
+        self.assertEqual(profile.cache_hits, 0)
+        self.assertEqual(profile.get_rows(), [])
+        self.assertEqual(profile.get_server_timing(), 'backend;dur=0.000;desc="0 calls", cache;desc="0 hits"')
+
+    def test_profile(self):
+        profile = RequestProfile()
+        profile.calls.update({('WHOIS', 'get_foo'): 3, ('WHOIS', 'get_bar'): 1})
+        profile.backend_calls.update({('WHOIS', 'get_foo'): 1, ('WHOIS', 'get_bar'): 1})
+        profile.backend_time = 0.0125
+        profile.template_time = 0.004
+        self.assertEqual(profile.cache_hits, 2)
+        self.assertEqual(profile.get_rows(), [('WHOIS', 'get_bar', 1, 1), ('WHOIS', 'get_foo', 3, 1)])
+        self.assertEqual(profile.get_server_timing(),
+                         'backend;dur=12.500;desc="2 calls", cache;desc="2 hits", template;dur=4.000')
+
+    def test_circuit_open(self):
+        profile = RequestProfile()
+        profile.calls.update({('WHOIS', 'get_foo'): 3})
+        profile.backend_calls.update({('WHOIS', 'get_foo'): 1})
+        profile.circuit_open.update({('WHOIS', 'get_foo'): 2})
+        self.assertEqual(profile.cache_hits, 0)
+        self.assertEqual(profile.circuit_open_calls, 2)
+        self.assertEqual(profile.get_server_timing(),
+                         'backend;dur=0.000;desc="1 calls", cache;desc="0 hits", circuit;desc="2 open"')
+
+
+@override_settings(WEBWHOIS_PROFILING=True)
+class TestProfilingLayer(SimpleTestCase):
+    """Test `ProfilingLayer` class and `Profiler` class."""
+
+    def setUp(self):
+        self.client_mock = Mock()
+        self.client_mock.get_foo.side_effect = lambda *args: list(args)
+        self.client_mock.get_bar.return_value = b'content'
+        self.client_mock.get_baz.side_effect = ValueError('Failed')
+        self.profiler = Profiler()
+        self.memo = RequestMemo(['get_foo'])
+        self.proxy = LayeredClientProxy(self.client_mock, [
+            ProfilingLayer(self.profiler, 'WHOIS'), self.memo, ProfilingLayer(self.profiler, 'WHOIS', backend=True)])
+
+    @override_settings(WEBWHOIS_PROFILING=False)
+    def test_disabled(self):
+        with self.profiler.scope() as profile:
+            self.proxy.get_foo('a')
+        self.assertEqual(profile.get_rows(), [])
+        self.assertNotIn('get_foo', self.profiler.get_metrics())
+
+    def test_no_scope(self):
+        self.proxy.get_foo('a')
+        self.assertIsNone(self.profiler.current_profile)
+        self.assertIn('webwhois_calls_total{service="WHOIS",method="get_foo"} 1', self.profiler.get_metrics())
+
+    @override_settings(WEBWHOIS_REQUEST_MEMO=True)
+    def test_profile(self):
+        with self.memo.scope(), self.profiler.scope() as profile:
+            self.assertEqual(self.proxy.get_foo('a'), ['a'])
+            self.proxy.get_foo('a')
+            self.proxy.get_bar()
+            with self.assertRaises(ValueError):
+                self.proxy.get_baz()
+        self.assertEqual(self.client_mock.mock_calls, [call.get_foo('a'), call.get_bar(), call.get_baz()])
+        self.assertEqual(profile.get_rows(), [('WHOIS', 'get_bar', 1, 1), ('WHOIS', 'get_baz', 1, 1),
+                                              ('WHOIS', 'get_foo', 2, 1)])
+        self.assertEqual(profile.cache_hits, 1)
+        self.assertEqual(profile.backend_bytes, 7)
+        self.assertGreater(profile.backend_time, 0)
+
+    def test_circuit_open(self):
+        # Circuit breaker rejects the call above the inner layer, so only the outer layer records it.
+        self.client_mock.get_bar.side_effect = CircuitOpen
+        proxy = LayeredClientProxy(self.client_mock, [ProfilingLayer(self.profiler, 'WHOIS')])
+        with self.profiler.scope() as profile:
+            with self.assertRaises(CircuitOpen):
+                proxy.get_bar()
+        self.assertEqual(profile.get_rows(), [('WHOIS', 'get_bar', 1, 0)])
+        self.assertEqual(profile.circuit_open_calls, 1)
+        self.assertEqual(profile.cache_hits, 0)
+        self.assertIn('webwhois_circuit_open_calls_total{service="WHOIS",method="get_bar"} 1\n',
+                      self.profiler.get_metrics())
+
+    def test_propagate(self):
+        def _call(context):
+            with context:
+                self.proxy.get_foo('a')
+
+        with self.profiler.scope() as profile:
+            thread = threading.Thread(target=_call, args=(self.profiler.propagate(), ))
+            thread.start()
+            thread.join()
+        self.assertEqual(profile.get_rows(), [('WHOIS', 'get_foo', 1, 1)])
+
+    def test_record_template(self):
+        profile = RequestProfile()
+        self.profiler.record_template(profile, 0.5)
+        self.profiler.record_template(None, 0.25)
+        self.assertEqual(profile.template_time, 0.5)
+        self.assertEqual((self.profiler.template_renders, self.profiler.template_time), (2, 0.75))
+
+    def test_metrics(self):
+        with self.profiler.scope():
+            self.proxy.get_foo('a')
+            self.proxy.get_bar()
+        self.profiler.record_template(None, 0.25)
+        with patch('webwhois.utils.profiling.time.perf_counter', side_effect=[1.0, 1.5]):
+            self.proxy.get_foo('b')
+        metrics = self.profiler.get_metrics()
+        self.assertIn('webwhois_requests_total 1\n', metrics)
+        self.assertIn('webwhois_template_renders_total 1\n', metrics)
+        self.assertIn('webwhois_template_seconds_total 0.250000\n', metrics)
+        self.assertIn('webwhois_calls_total{service="WHOIS",method="get_foo"} 2\n', metrics)
+        self.assertIn('webwhois_backend_calls_total{service="WHOIS",method="get_bar"} 1\n', metrics)
+        self.assertIn('webwhois_backend_bytes_total{service="WHOIS",method="get_bar"} 7\n', metrics)
+        self.assertRegex(metrics, r'webwhois_backend_seconds_total\{service="WHOIS",method="get_foo"\} 0\.5\d+\n')
+
+    def test_clear(self):
+        with self.profiler.scope():
+            self.proxy.get_foo('a')
+        self.profiler.clear()
+        self.assertEqual(self.profiler.get_metrics(), '\n'.join([
+            '# TYPE webwhois_requests_total counter',
+            'webwhois_requests_total 0',
+            '# TYPE webwhois_template_renders_total counter',
+            'webwhois_template_renders_total 0',
+            '# TYPE webwhois_template_seconds_total counter',
+            'webwhois_template_seconds_total 0.000000',
+            '# TYPE webwhois_calls_total counter',
+            '# TYPE webwhois_backend_calls_total counter',
+            '# TYPE webwhois_circuit_open_calls_total counter',
+            '# TYPE webwhois_backend_seconds_total counter',
+            '# TYPE webwhois_backend_bytes_total counter',
+        ]) + '\n')
@@ -17,14 +17,16 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 
 """Test `webwhois.utils.public_response` module."""
+import pickle
 import warnings
 from datetime import date
 from unittest.mock import patch, sentinel
 
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 from testfixtures import Replace, ShouldWarn, test_date
 
-from webwhois.utils.public_response import BlockResponse, PersonalInfoResponse, PublicResponse, SendPasswordResponse
+from webwhois.utils.public_response import BlockResponse, PersonalInfoResponse, PublicResponse, SendPasswordResponse, \
+    decode_public_response, encode_public_response
 
 
 class TestPublicResponse(SimpleTestCase):
@@ -125,3 +127,76 @@ class TestBlockResponse(SimpleTestCase):
         self.assertTrue(pr_rimmer == pr_rimmer)
         self.assertTrue(pr_rimmer == pr_clone)
         self.assertFalse(pr_rimmer == pr_kryten)
+
+
+class CustomResponse(PublicResponse):
+    """Custom public response with an extra attribute."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.extra = 'Extra'
+
+
+@override_settings(USE_TZ=True)
+class TestEncodePublicResponse(SimpleTestCase):
+    """Test `encode_public_response` and `decode_public_response` functions."""
+
+    def setUp(self):
+        patcher = patch('webwhois.utils.public_response.localdate', return_value=date(2017, 5, 25))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_encode(self):
+        public_response = BlockResponse('domain', 42, 'BlockTransfer', 'example.cz', 'block', 'transfer',
+                                        'signed_email')
+        self.assertEqual(encode_public_response(public_response),
+                         (1, 'block', ('domain', 42, 'BlockTransfer', 'example.cz', 'signed_email', 736474, 'block',
+                                       'transfer')))
+
+    def test_encode_decode(self):
+        responses = (
+            PublicResponse('domain', 42, 'AuthInfo', 'example.cz', 'signed_email'),
+            SendPasswordResponse('domain', 42, 'AuthInfo', 'example.cz', 'kryten@example.org', 'signed_email'),
+            PersonalInfoResponse('contact', 42, 'PersonalInfo', 'KRYTEN', None, 'notarized_letter'),
+            BlockResponse('domain', 42, 'BlockTransfer', 'example.cz', 'block', 'transfer', 'signed_email'),
+        )
+        for public_response in responses:
+            with self.subTest(public_response=public_response):
+                data = encode_public_response(public_response)
+                self.assertLess(len(pickle.dumps(data)), len(pickle.dumps(public_response)))
+                decoded = decode_public_response(pickle.loads(pickle.dumps(data)))
+                self.assertEqual(type(decoded), type(public_response))
+                self.assertEqual(decoded, public_response)
+
+    def test_encode_custom(self):
+        public_response = CustomResponse('domain', 42, 'AuthInfo', 'example.cz', 'signed_email')
+        self.assertIs(encode_public_response(public_response), public_response)
+        self.assertIs(decode_public_response(public_response), public_response)
+
+    def test_decode_none(self):
+        self.assertIsNone(decode_public_response(None))
+
+    def test_decode_unknown(self):
+        data = (
+            (2, 'block', ()),
+            (1, 'unknown', ()),
+            (1, 'block'),
+        )
+        for value in data:
+            with self.subTest(value=value):
+                self.assertIsNone(decode_public_response(value))
+
+    def test_decode_legacy(self):
+        public_response = SendPasswordResponse('domain', 42, 'AuthInfo', 'example.cz', None, 'signed_email')
+        self.assertIs(decode_public_response(public_response), public_response)
+
+    def test_unpickle_legacy(self):
+        # Responses pickled with an instance dictionary before the slots were defined.
+        public_response = SendPasswordResponse('domain', 42, 'AuthInfo', 'example.cz', None, 'signed_email')
+        state = {name: getattr(public_response, name) for name in (
+            'object_type', 'public_request_id', 'request_type', 'handle', 'confirmation_method', 'create_date',
+            'custom_email')}
+        legacy = SendPasswordResponse.__new__(SendPasswordResponse)
+        legacy.__setstate__(state)
+        self.assertEqual(legacy, public_response)
+        self.assertEqual(pickle.loads(pickle.dumps(public_response)), public_response)
@@ -0,0 +1,71 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.quota` module."""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.utils.quota import consume_quota
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestConsumeQuota(SimpleTestCase):
+    """Test `consume_quota` function."""
+
+    def setUp(self):
+        patcher = patch('webwhois.utils.quota.time.time', return_value=1000.5)
+        self.addCleanup(patcher.stop)
+        self.time_mock = patcher.start()
+        cache.clear()
+
+    def test_consume(self):
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 6, 10, 60))
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 4, 10, 60))
+        # 1000.5 is in the period 960 - 1020.
+        self.assertEqual(consume_quota('test', '127.0.0.1', 1, 10, 60), 20)
+
+    def test_exceeded_not_consumed(self):
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 6, 10, 60))
+        self.assertIsNotNone(consume_quota('test', '127.0.0.1', 6, 10, 60))
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 4, 10, 60))
+
+    def test_clients(self):
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 10, 10, 60))
+        self.assertIsNone(consume_quota('test', '127.0.0.2', 10, 10, 60))
+        self.assertIsNone(consume_quota('other', '127.0.0.1', 10, 10, 60))
+
+    def test_renewed(self):
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 10, 10, 60))
+        self.time_mock.return_value = 1020
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 10, 10, 60))
+
+    def test_expired(self):
+        # The counter expires between its creation and increment.
+        incr = cache.incr
+
+        def _incr(key, delta):
+            incr_mock.side_effect = incr
+            cache.delete(key)
+            raise ValueError
+
+        with patch('webwhois.utils.quota.cache.incr', side_effect=_incr) as incr_mock:
+            self.assertIsNone(consume_quota('test', '127.0.0.1', 6, 10, 60))
+        self.assertIsNone(consume_quota('test', '127.0.0.1', 4, 10, 60))
+        self.assertIsNotNone(consume_quota('test', '127.0.0.1', 1, 10, 60))
@@ -0,0 +1,142 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.registry_cache` module."""
+import time
+from unittest.mock import Mock, call, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_NOT_FOUND
+
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+from webwhois.utils.layers import LayeredClientProxy
+from webwhois.utils.registry_cache import RegistryObjectCache, get_cache_key
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   WEBWHOIS_OBJECT_CACHE_TIMEOUTS={'contact': 60, 'nsset': 60})
+class TestRegistryObjectCache(GetRegistryObjectMixin, SimpleTestCase):
+    """Test `RegistryObjectCache` class."""
+
+    def setUp(self):
+        self.client_mock = Mock()
+        self.proxy = LayeredClientProxy(self.client_mock, [RegistryObjectCache()])
+        cache.clear()
+
+    def test_get_cache_key(self):
+        self.assertEqual(get_cache_key('contact', 'KONTAKT'),
+                         'webwhois_object:contact:5a077c0e9f79cce66294d35a5a1feca3')
+        self.assertNotEqual(get_cache_key('contact', 'KONTAKT'), get_cache_key('nsset', 'KONTAKT'))
+        self.assertNotIn(' ', get_cache_key('contact', 'with space'))
+
+    def test_cached(self):
+        self.client_mock.get_nsset_by_handle.return_value = self._get_nsset()
+        self.assertEqual(self.proxy.get_nsset_by_handle('NSSET-1').handle, 'NSSET-1')
+        result = self.proxy.get_nsset_by_handle('NSSET-1')
+        self.assertEqual(result.handle, 'NSSET-1')
+        self.assertEqual(result.tech_contact_handles, ['KONTAKT'])
+        self.assertEqual(self.client_mock.mock_calls, [call.get_nsset_by_handle('NSSET-1')])
+
+    def test_not_configured_type(self):
+        self.client_mock.get_domain_by_handle.return_value = self._get_domain()
+        self.proxy.get_domain_by_handle('fred.cz')
+        self.proxy.get_domain_by_handle('fred.cz')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_domain_by_handle('fred.cz')] * 2)
+
+    def test_not_cached_method(self):
+        self.proxy.get_managed_zone_list()
+        self.proxy.get_managed_zone_list()
+        self.assertEqual(self.client_mock.mock_calls, [call.get_managed_zone_list()] * 2)
+
+    def test_not_found(self):
+        self.client_mock.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        for _ in range(2):
+            with self.assertRaises(OBJECT_NOT_FOUND):
+                self.proxy.get_contact_by_handle('KONTAKT')
+        # Not found results are not cached by default.
+        self.assertEqual(self.client_mock.mock_calls, [call.get_contact_by_handle('KONTAKT')] * 2)
+
+    @override_settings(WEBWHOIS_OBJECT_CACHE_NOT_FOUND_TIMEOUT=10)
+    def test_not_found_cached(self):
+        self.client_mock.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        for _ in range(2):
+            with self.assertRaises(OBJECT_NOT_FOUND):
+                self.proxy.get_contact_by_handle('KONTAKT')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_contact_by_handle('KONTAKT')])
+
+    @override_settings(WEBWHOIS_OBJECT_CACHE_NOT_FOUND_TIMEOUT=10)
+    def test_other_errors_not_cached(self):
+        self.client_mock.get_contact_by_handle.side_effect = INVALID_HANDLE
+        for _ in range(2):
+            with self.assertRaises(INVALID_HANDLE):
+                self.proxy.get_contact_by_handle('KONTAKT')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_contact_by_handle('KONTAKT')] * 2)
+
+    def _expire(self, object_type, handle):
+        # Move the freshness limit of the cached entry to the past.
+        key = get_cache_key(object_type, handle)
+        entry = cache.get(key)
+        cache.set(key, (entry[0], time.time() - 1) + entry[2:])
+
+    @override_settings(WEBWHOIS_OBJECT_CACHE_STALE_TIMEOUT=60)
+    def test_expired_refresh(self):
+        self.client_mock.get_nsset_by_handle.return_value = self._get_nsset()
+        self.proxy.get_nsset_by_handle('NSSET-1')
+        self._expire('nsset', 'NSSET-1')
+        self.assertEqual(self.proxy.get_nsset_by_handle('NSSET-1').handle, 'NSSET-1')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_nsset_by_handle('NSSET-1')] * 2)
+        # Refreshed entry is fresh again and the lock is released.
+        self.assertTrue(RegistryObjectCache.is_fresh(cache.get(get_cache_key('nsset', 'NSSET-1'))))
+        self.assertIsNone(cache.get(get_cache_key('nsset', 'NSSET-1') + ':lock'))
+
+    @override_settings(WEBWHOIS_OBJECT_CACHE_STALE_TIMEOUT=60)
+    def test_expired_locked(self):
+        self.client_mock.get_nsset_by_handle.return_value = self._get_nsset()
+        self.proxy.get_nsset_by_handle('NSSET-1')
+        self._expire('nsset', 'NSSET-1')
+        # Other thread refreshes the object - stale object is served.
+        cache.add(get_cache_key('nsset', 'NSSET-1') + ':lock', True)
+        self.assertEqual(self.proxy.get_nsset_by_handle('NSSET-1').handle, 'NSSET-1')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_nsset_by_handle('NSSET-1')])
+
+    def test_lock_released_on_error(self):
+        self.client_mock.get_contact_by_handle.side_effect = INVALID_HANDLE
+        with self.assertRaises(INVALID_HANDLE):
+            self.proxy.get_contact_by_handle('KONTAKT')
+        self.assertIsNone(cache.get(get_cache_key('contact', 'KONTAKT') + ':lock'))
+
+    def test_locked_wait(self):
+        key = get_cache_key('nsset', 'NSSET-1')
+        cache.add(key + ':lock', True)
+
+        def _sleep(interval):
+            # Other thread stores the object while this one waits.
+            self.client_mock.get_nsset_by_handle.return_value = self._get_nsset()
+            RegistryObjectCache().store(key, 'nsset', self.client_mock.get_nsset_by_handle, 'NSSET-1')
+
+        with patch('webwhois.utils.registry_cache.time.sleep', side_effect=_sleep):
+            self.assertEqual(self.proxy.get_nsset_by_handle('NSSET-1').handle, 'NSSET-1')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_nsset_by_handle('NSSET-1')])
+
+    @override_settings(WEBWHOIS_OBJECT_CACHE_LOCK_WAIT=0)
+    def test_locked_timeout(self):
+        self.client_mock.get_nsset_by_handle.return_value = self._get_nsset()
+        cache.add(get_cache_key('nsset', 'NSSET-1') + ':lock', True)
+        self.assertEqual(self.proxy.get_nsset_by_handle('NSSET-1').handle, 'NSSET-1')
+        self.assertEqual(self.client_mock.mock_calls, [call.get_nsset_by_handle('NSSET-1')])
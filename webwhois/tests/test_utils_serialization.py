@@ -0,0 +1,68 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.serialization` module."""
+import pickle
+from datetime import date
+
+from django.test import SimpleTestCase
+from fred_idl.Registry.Whois import IPv4, NSSet
+
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+from webwhois.utils.serialization import pack, unpack
+
+
+class TestSerialization(GetRegistryObjectMixin, SimpleTestCase):
+    """Test `pack` and `unpack` functions."""
+
+    def test_primitives(self):
+        for value in (None, True, 42, 4.2, 'text', b'bytes', date(2001, 2, 3)):
+            self.assertEqual(unpack(pack(value)), value)
+
+    def test_containers(self):
+        value = [('a', ['b', ('c', )]), []]
+        self.assertEqual(unpack(pack(value)), value)
+
+    def test_struct(self):
+        nsset = self._get_nsset()
+        result = unpack(pack(nsset))
+        self.assertIsInstance(result, NSSet)
+        self.assertEqual(result.handle, 'NSSET-1')
+        self.assertEqual(result.changed, nsset.changed)
+        self.assertEqual([server.fqdn for server in result.nservers], ['a.ns.nic.cz', 'b.ns.nic.cz'])
+        self.assertEqual(pack(result), pack(nsset))
+
+    def test_enum(self):
+        result = unpack(pack(self._get_nsset()))
+        self.assertIs(result.nservers[0].ip_addresses[0].version, IPv4)
+
+    def test_nested_structs(self):
+        contact = self._get_contact(disclose=False)
+        result = unpack(pack(contact))
+        self.assertEqual(result.name.value, 'Arnold Rimmer')
+        self.assertFalse(result.name.disclose)
+        self.assertEqual(result.identification.value.identification_type, 'OP')
+        self.assertEqual(pack(result), pack(contact))
+
+    def test_smaller_than_pickle(self):
+        domain = self._get_domain()
+        self.assertLess(len(pickle.dumps(pack(domain))), len(pickle.dumps(domain)))
+
+    def test_unknown_node(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown packed node'):
+            unpack(('x', ))
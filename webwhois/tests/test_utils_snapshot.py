@@ -0,0 +1,144 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.snapshot` module."""
+from threading import Event, Thread
+from unittest.mock import patch, sentinel
+
+from django.test import SimpleTestCase
+
+from webwhois.utils.snapshot import PeriodicSnapshot
+
+
+class SyncThread(object):
+    """Thread which runs its target synchronously."""
+
+    def __init__(self, target, name=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+class TestSnapshot(PeriodicSnapshot):
+    def __init__(self, values, interval=60):
+        super().__init__()
+        self.values = list(values)
+        self.interval = interval
+        self.loads = []
+
+    def get_interval(self):
+        return self.interval
+
+    def load(self, initial):
+        self.loads.append(initial)
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+@patch('webwhois.utils.snapshot.threading.Thread', SyncThread)
+class TestPeriodicSnapshot(SimpleTestCase):
+    """Test `PeriodicSnapshot` class."""
+
+    def test_get(self):
+        snapshot = TestSnapshot([sentinel.first])
+        self.assertEqual(snapshot.get(), sentinel.first)
+        self.assertEqual(snapshot.get(), sentinel.first)
+        self.assertEqual(snapshot.loads, [True])
+
+    def test_get_error(self):
+        snapshot = TestSnapshot([ValueError('Gazpacho!'), sentinel.first])
+        with self.assertRaisesRegex(ValueError, 'Gazpacho!'):
+            snapshot.get()
+        self.assertEqual(snapshot.get(), sentinel.first)
+        self.assertEqual(snapshot.loads, [True, True])
+
+    def test_get_expired(self):
+        snapshot = TestSnapshot([sentinel.first, sentinel.second])
+        with patch('webwhois.utils.snapshot.time.monotonic', return_value=100):
+            self.assertEqual(snapshot.get(), sentinel.first)
+        with patch('webwhois.utils.snapshot.time.monotonic', return_value=160):
+            # Refresh is started, current data are returned.
+            self.assertEqual(snapshot.get(), sentinel.first)
+            self.assertEqual(snapshot.get(), sentinel.second)
+        self.assertEqual(snapshot.loads, [True, False])
+
+    def test_get_never_refreshed(self):
+        snapshot = TestSnapshot([sentinel.first, sentinel.second], interval=0)
+        with patch('webwhois.utils.snapshot.time.monotonic', return_value=100):
+            self.assertEqual(snapshot.get(), sentinel.first)
+        with patch('webwhois.utils.snapshot.time.monotonic', return_value=1000):
+            self.assertEqual(snapshot.get(), sentinel.first)
+        self.assertEqual(snapshot.loads, [True])
+
+    def test_refresh_error(self):
+        snapshot = TestSnapshot([sentinel.first, ValueError('Gazpacho!')])
+        with patch('webwhois.utils.snapshot.time.monotonic', return_value=100):
+            snapshot.get()
+        with patch('webwhois.utils.snapshot.time.monotonic', return_value=160):
+            with self.assertLogs('webwhois.utils.snapshot', 'ERROR'):
+                self.assertEqual(snapshot.get(), sentinel.first)
+            # Refresh is retried after the next interval.
+            self.assertEqual(snapshot.get(), sentinel.first)
+        self.assertEqual(snapshot.loads, [True, False])
+
+    def test_get_concurrent(self):
+        started = Event()
+        release = Event()
+
+        class SlowSnapshot(TestSnapshot):
+            def load(self, initial):
+                started.set()
+                release.wait(5)
+                return super().load(initial)
+
+        snapshot = SlowSnapshot([sentinel.first])
+        results = []
+        first = Thread(target=lambda: results.append(snapshot.get()))
+        first.start()
+        started.wait(5)
+        second = Thread(target=lambda: results.append(snapshot.get()))
+        second.start()
+        release.set()
+        first.join()
+        second.join()
+        self.assertEqual(results, [sentinel.first, sentinel.first])
+        self.assertEqual(snapshot.loads, [True])
+
+    def test_get_timeout(self):
+        snapshot = TestSnapshot([sentinel.first])
+        snapshot.load_timeout = 0
+        # Another thread started the first load, which didn't finish in time.
+        snapshot._loading = Event()
+        self.assertEqual(snapshot.get(), sentinel.first)
+        self.assertEqual(snapshot.loads, [True])
+
+    def test_refresh(self):
+        snapshot = TestSnapshot([sentinel.first, sentinel.second])
+        snapshot.get()
+        snapshot.refresh()
+        self.assertEqual(snapshot.get(), sentinel.second)
+
+    def test_clear(self):
+        snapshot = TestSnapshot([sentinel.first, sentinel.second])
+        snapshot.get()
+        snapshot.clear()
+        self.assertEqual(snapshot.get(), sentinel.second)
+        self.assertEqual(snapshot.loads, [True, True])
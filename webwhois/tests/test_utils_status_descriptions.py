@@ -0,0 +1,78 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.status_descriptions` module."""
+from unittest.mock import call, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from fred_idl.Registry.Whois import ObjectStatusDesc
+
+from webwhois.utils.corba_wrapper import WHOIS
+from webwhois.utils.status_descriptions import StatusDescriptions, load_status_descriptions
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   LANGUAGES=(('en', 'English'), ('cs', 'Czech')), WEBWHOIS_STATUS_DESCRIPTIONS_REFRESH=3600)
+class TestStatusDescriptions(SimpleTestCase):
+    """Test `StatusDescriptions` class."""
+
+    def setUp(self):
+        spec = ('get_contact_status_descriptions', 'get_domain_status_descriptions', 'get_keyset_status_descriptions',
+                'get_nsset_status_descriptions')
+        patcher = patch.object(WHOIS, 'client', spec=spec)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        for method in ('contact', 'domain', 'keyset', 'nsset'):
+            getattr(WHOIS, 'get_{}_status_descriptions'.format(method)).side_effect = self._get_descriptions
+        cache.clear()
+
+    def _get_descriptions(self, lang):
+        return [ObjectStatusDesc(handle='linked', name='Linked {}'.format(lang))]
+
+    def test_load(self):
+        descriptions = StatusDescriptions()
+        self.assertEqual(descriptions.get_descriptions('contact', 'cs'), {'linked': 'Linked cs'})
+        self.assertEqual(descriptions.get_descriptions('nsset', 'en'), {'linked': 'Linked en'})
+        self.assertEqual(len(WHOIS.mock_calls), 8)
+        self.assertEqual(cache.get('webwhois_descr_cs_domain'), {'linked': 'Linked cs'})
+
+    def test_load_cached(self):
+        cache.set('webwhois_descr_cs_domain', {'cached': 'Cached'})
+        descriptions = StatusDescriptions()
+        self.assertEqual(descriptions.get_descriptions('domain', 'cs'), {'cached': 'Cached'})
+        self.assertNotIn(call.get_domain_status_descriptions('cs'), WHOIS.mock_calls)
+
+    def test_refresh(self):
+        cache.set('webwhois_descr_cs_domain', {'cached': 'Cached'})
+        descriptions = StatusDescriptions()
+        descriptions.get()
+        descriptions.refresh()
+        # Refresh skips the Django cache and updates it.
+        self.assertEqual(descriptions.get_descriptions('domain', 'cs'), {'linked': 'Linked cs'})
+        self.assertEqual(cache.get('webwhois_descr_cs_domain'), {'linked': 'Linked cs'})
+
+    def test_unknown_language(self):
+        descriptions = StatusDescriptions()
+        self.assertEqual(descriptions.get_descriptions('keyset', 'de'), {'linked': 'Linked de'})
+
+    def test_load_status_descriptions_empty(self):
+        # Empty descriptions are cached too.
+        cache.set('webwhois_descr_en_nsset', {})
+        self.assertEqual(load_status_descriptions('nsset', 'en'), {})
+        self.assertEqual(WHOIS.mock_calls, [])
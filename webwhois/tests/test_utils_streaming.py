@@ -0,0 +1,144 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.utils.streaming` module."""
+from unittest.mock import Mock, call, sentinel
+
+from django.test import RequestFactory, SimpleTestCase
+
+from webwhois.utils.streaming import FileDownloadIterator, get_buffer_response, iter_blocks, parse_range
+
+
+class TestParseRange(SimpleTestCase):
+    """Test `parse_range` function."""
+
+    def test_range(self):
+        data = (
+            ('bytes=0-9', (0, 9)),
+            ('bytes=10-', (10, 99)),
+            ('bytes=90-200', (90, 99)),
+            ('bytes=-10', (90, 99)),
+            ('bytes=-200', (0, 99)),
+            ('bytes=99-99', (99, 99)),
+        )
+        for header, result in data:
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), result)
+
+    def test_unsupported(self):
+        for header in ('bytes=0-1,5-6', 'items=0-1', 'bytes=-', 'bytes=5-1', 'invalid'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 100))
+
+    def test_unsatisfiable(self):
+        for header, size in (('bytes=100-', 100), ('bytes=-0', 100), ('bytes=-10', 0), ('bytes=0-', 0)):
+            with self.subTest(header=header, size=size):
+                with self.assertRaises(ValueError):
+                    parse_range(header, size)
+
+
+class TestIterBlocks(SimpleTestCase):
+    """Test `iter_blocks` function."""
+
+    def test_blocks(self):
+        self.assertEqual(list(iter_blocks(memoryview(b'abcdefg'), 3)), [b'abc', b'def', b'g'])
+
+    def test_empty(self):
+        self.assertEqual(list(iter_blocks(memoryview(b''), 3)), [])
+
+
+class TestFileDownloadIterator(SimpleTestCase):
+    """Test `FileDownloadIterator` class."""
+
+    def test_blocks(self):
+        file_download = Mock(spec=('download', 'finalize_download'))
+        file_download.download.side_effect = [b'abc', b'def', b'g']
+        self.assertEqual(list(FileDownloadIterator(file_download, 7, block_size=3)), [b'abc', b'def', b'g'])
+        self.assertEqual(file_download.mock_calls,
+                         [call.download(3), call.download(3), call.download(1), call.finalize_download()])
+
+    def test_short_download(self):
+        file_download = Mock(spec=('download', 'finalize_download'))
+        file_download.download.side_effect = [b'abc', b'']
+        self.assertEqual(list(FileDownloadIterator(file_download, 7, block_size=5)), [b'abc'])
+        self.assertEqual(file_download.mock_calls, [call.download(5), call.download(4), call.finalize_download()])
+
+    def test_empty(self):
+        file_download = Mock(spec=('download', 'finalize_download'))
+        self.assertEqual(list(FileDownloadIterator(file_download, 0)), [])
+        self.assertEqual(file_download.mock_calls, [call.finalize_download()])
+
+    def test_close(self):
+        file_download = Mock(spec=('download', 'finalize_download'))
+        file_download.download.return_value = b'abc'
+        iterator = FileDownloadIterator(file_download, 7, block_size=3)
+        self.assertEqual(next(iterator), b'abc')
+        iterator.close()
+        iterator.close()
+        self.assertEqual(list(iterator), [])
+        self.assertEqual(file_download.mock_calls, [call.download(3), call.finalize_download()])
+
+    def test_download_error(self):
+        file_download = Mock(spec=('download', 'finalize_download'))
+        file_download.download.side_effect = ValueError(sentinel.error)
+        iterator = FileDownloadIterator(file_download, 7)
+        with self.assertRaises(ValueError):
+            next(iterator)
+        self.assertEqual(file_download.mock_calls, [call.download(7), call.finalize_download()])
+
+
+class TestGetBufferResponse(SimpleTestCase):
+    """Test `get_buffer_response` function."""
+
+    def test_whole(self):
+        response = get_buffer_response(RequestFactory().get('/'), b'content', 'application/pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], '7')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response.getvalue(), b'content')
+
+    def test_text(self):
+        response = get_buffer_response(RequestFactory().get('/'), 'obsah č', 'text/plain')
+        self.assertEqual(response['Content-Length'], '8')
+        self.assertEqual(response.getvalue(), 'obsah č'.encode())
+
+    def test_range(self):
+        response = get_buffer_response(RequestFactory().get('/', HTTP_RANGE='bytes=2-4'), b'content', 'text/plain')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Length'], '3')
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/7')
+        self.assertEqual(response.getvalue(), b'nte')
+
+    def test_range_unsupported(self):
+        response = get_buffer_response(RequestFactory().get('/', HTTP_RANGE='bytes=0-1,3-4'), b'content',
+                                       'text/plain')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), b'content')
+
+    def test_range_unsatisfiable(self):
+        response = get_buffer_response(RequestFactory().get('/', HTTP_RANGE='bytes=7-'), b'content', 'text/plain')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */7')
+
+    def test_if_range(self):
+        request = RequestFactory().get('/', HTTP_RANGE='bytes=2-4', HTTP_IF_RANGE='"etag"')
+        response = get_buffer_response(request, b'content', 'text/plain')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), b'content')
@@ -0,0 +1,172 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.views.api` module."""
+import gzip
+import json
+from unittest.mock import call
+
+from django.test import override_settings
+from django.urls import reverse
+from fred_idl.Registry.Whois import INTERNAL_SERVER_ERROR, INVALID_HANDLE, OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND
+
+from webwhois.tests.test_object_detail import ObjectDetailMixin
+from webwhois.utils import WHOIS
+from webwhois.utils.layers import CircuitOpen
+
+
+class TestRegistryObjectJson(ObjectDetailMixin):
+    """Test JSON views of registry objects."""
+
+    def test_contact(self):
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:api_contact", kwargs={"handle": "mycontact"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()
+        self.assertEqual(data['type'], 'contact')
+        self.assertEqual(data['handle'], 'mycontact')
+        self.assertEqual(data['data']['detail']['handle'], 'KONTAKT')
+        self.assertEqual(data['data']['detail']['name'], 'Arnold Rimmer')
+        self.assertEqual(data['data']['detail']['changed'], '2015-12-16T08:32:12+00:00')
+        self.assertEqual(data['data']['sponsoring_registrar']['handle'], 'REG-FRED_A')
+        self.assertNotIn('label', data['data'])
+        self.assertEqual(WHOIS.mock_calls, [
+            call.get_contact_by_handle('mycontact'),
+            call.get_contact_status_descriptions('en'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+        ])
+
+    def test_contact_not_disclosed(self):
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact(disclose=False)
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:api_contact", kwargs={"handle": "mycontact"}))
+        detail = response.json()['data']['detail']
+        self.assertIsNone(detail['name'])
+        self.assertIsNone(detail['email'])
+        self.assertIsNone(detail['identification'])
+        self.assertNotIn('birthday', response.json()['data'])
+        self.assertNotIn(b'Arnold Rimmer', response.content)
+
+    def test_domain(self):
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:api_domain", kwargs={"handle": "fred.cz"}))
+        data = response.json()['data']
+        self.assertEqual(data['detail']['handle'], 'fred.cz')
+        self.assertEqual(data['detail']['expire'], '2018-12-09')
+        self.assertEqual(data['registrant']['handle'], 'KONTAKT')
+        self.assertEqual(data['nsset']['detail']['nservers'][0]['ip_addresses'][0],
+                         {'address': '194.0.12.1', 'version': 'IPv4'})
+        self.assertEqual(data['keyset']['detail']['handle'], 'KEYSID-1')
+
+    def test_not_found(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        response = self.client.get(reverse("webwhois:api_contact", kwargs={"handle": "mycontact"}))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'type': 'contact', 'handle': 'mycontact', 'error': 'OBJECT_NOT_FOUND'})
+        self.assertEqual(self.LOGGER.create_request().result, 'NotFound')
+
+    def test_invalid_handle(self):
+        WHOIS.get_contact_by_handle.side_effect = INVALID_HANDLE
+        response = self.client.get(reverse("webwhois:api_contact", kwargs={"handle": "mycontact"}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'INVALID_HANDLE')
+
+    def test_delete_candidate(self):
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_DELETE_CANDIDATE
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        response = self.client.get(reverse("webwhois:api_domain", kwargs={"handle": "fred.cz"}))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['error'], 'OBJECT_DELETE_CANDIDATE')
+
+    def test_circuit_open(self):
+        WHOIS.get_registrar_by_handle.side_effect = CircuitOpen
+        response = self.client.get(reverse("webwhois:api_registrar", kwargs={"handle": "REG-FRED_A"}))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['error'], 'SERVICE_UNAVAILABLE')
+
+    def test_gzip(self):
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:api_registrar", kwargs={"handle": "REG-FRED_A"}),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content).decode())['data']['detail']['handle'],
+                         'REG-FRED_A')
+
+    def test_conditional(self):
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:api_registrar", kwargs={"handle": "REG-FRED_A"}))
+        self.assertTrue(response.has_header('ETag'))
+        not_modified = self.client.get(reverse("webwhois:api_registrar", kwargs={"handle": "REG-FRED_A"}),
+                                       HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+
+class TestBulkJson(ObjectDetailMixin):
+    """Test `BulkJsonView` view."""
+
+    def test_bulk(self):
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        response = self.client.get(reverse("webwhois:api_bulk"), {'registrar': 'REG-FRED_A', 'contact': 'mycontact'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([(result['type'], result['handle']) for result in results],
+                         [('contact', 'mycontact'), ('registrar', 'REG-FRED_A')])
+        self.assertEqual(results[0]['error'], 'OBJECT_NOT_FOUND')
+        self.assertEqual(results[1]['data']['detail']['name'], 'Company A L.t.d.')
+
+    def test_bulk_error(self):
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        WHOIS.get_contact_by_handle.side_effect = INTERNAL_SERVER_ERROR
+        with self.assertLogs('webwhois.views.api', 'ERROR'):
+            response = self.client.get(reverse("webwhois:api_bulk"),
+                                       {'registrar': 'REG-FRED_A', 'contact': 'mycontact'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(results[0], {'type': 'contact', 'handle': 'mycontact', 'error': 'INTERNAL_SERVER_ERROR'})
+        self.assertEqual(results[1]['data']['detail']['name'], 'Company A L.t.d.')
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_bulk_concurrent(self):
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        response = self.client.get(reverse("webwhois:api_bulk"), {'registrar': ['REG-FRED_A', 'REG-FRED_B']})
+        self.assertEqual([result['handle'] for result in response.json()['results']], ['REG-FRED_A', 'REG-FRED_B'])
+
+    def test_empty(self):
+        response = self.client.get(reverse("webwhois:api_bulk"))
+        self.assertEqual(response.json(), {'results': []})
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    @override_settings(WEBWHOIS_API_BULK_LIMIT=1)
+    def test_limit(self):
+        response = self.client.get(reverse("webwhois:api_bulk"), {'registrar': ['REG-FRED_A', 'REG-FRED_B']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'TOO_MANY_HANDLES', 'limit': 1})
+        self.assertEqual(WHOIS.mock_calls, [])
@@ -0,0 +1,148 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.views.bulk_lookup` module."""
+import json
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import translation
+from fred_idl.Registry.Whois import OBJECT_NOT_FOUND, UNMANAGED_ZONE
+
+from webwhois.tests.test_object_detail import ObjectDetailMixin
+from webwhois.utils import WHOIS
+from webwhois.utils.corba_wrapper import WHOIS_MEMO
+from webwhois.utils.layers import CircuitOpen
+
+
+class TestBulkLookupView(ObjectDetailMixin):
+    """Test `BulkLookupView` view."""
+
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_contact_by_handle.side_effect = self._get_contact_by_handle
+        WHOIS.get_nsset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_keyset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_registrar_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_domain_by_handle.side_effect = UNMANAGED_ZONE
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+
+    def _get_contact_by_handle(self, handle):
+        if handle != 'KONTAKT':
+            raise OBJECT_NOT_FOUND
+        return self._get_contact()
+
+    def _get_results(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_ndjson(self):
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT\nunknown'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(self._get_results(response), [
+            {'handle': 'KONTAKT', 'types': ['contact']},
+            {'handle': 'unknown', 'types': [], 'error': 'OBJECT_NOT_FOUND'},
+        ])
+        # Each lookup is logged.
+        self.assertEqual(self.LOGGER.create_request.call_count, 2)
+
+    def test_csv(self):
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT unknown', 'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(),
+                         ['handle,types,error', 'KONTAKT,contact,', 'unknown,,OBJECT_NOT_FOUND'])
+
+    def test_file(self):
+        handles_file = SimpleUploadedFile('handles.txt', b'KONTAKT\nKONTAKT\n')
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles_file': handles_file})
+        self.assertEqual(self._get_results(response), [{'handle': 'KONTAKT', 'types': ['contact']}])
+
+    def test_file_encoding(self):
+        handles_file = SimpleUploadedFile('handles.txt', b'\xff')
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles_file': handles_file})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('handles_file', response.json()['errors'])
+
+    def test_no_handles(self):
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': ' '})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'errors': {'__all__': ['Enter handles or upload a file with handles.']}})
+
+    @override_settings(WEBWHOIS_BULK_LOOKUP_LIMIT=1)
+    def test_limit(self):
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT unknown'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'errors': {'__all__': ['At most 1 handles can be looked up at once.']}})
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_get(self):
+        response = self.client.get(reverse("webwhois:bulk_lookup"))
+        self.assertEqual(response.status_code, 405)
+
+    def test_circuit_open(self):
+        WHOIS.get_contact_by_handle.side_effect = CircuitOpen
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT'})
+        self.assertEqual(self._get_results(response),
+                         [{'handle': 'KONTAKT', 'types': [], 'error': 'SERVICE_UNAVAILABLE'}])
+
+    def test_internal_error(self):
+        WHOIS.get_contact_by_handle.side_effect = ValueError
+        with self.assertLogs('webwhois.views.bulk_lookup', 'ERROR'):
+            response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT'})
+            results = self._get_results(response)
+        self.assertEqual(results, [{'handle': 'KONTAKT', 'types': [], 'error': 'INTERNAL_SERVER_ERROR'}])
+
+    @override_settings(WEBWHOIS_CONCURRENT_LOOKUP=True)
+    def test_concurrent(self):
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT unknown other'})
+        results = self._get_results(response)
+        self.assertCountEqual([result['handle'] for result in results], ['KONTAKT', 'unknown', 'other'])
+
+    def test_request_state(self):
+        # Results are streamed after the view returned, the lookups still run in the state of the request.
+        states = []
+
+        def _get_contact_by_handle(handle):
+            states.append((WHOIS_MEMO.current_scope is not None, translation.get_language()))
+            raise OBJECT_NOT_FOUND
+
+        WHOIS.client.get_contact_by_handle.side_effect = _get_contact_by_handle
+        WHOIS.get_contact_by_handle.side_effect = _get_contact_by_handle
+        with translation.override('cs'):
+            response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT'})
+        with translation.override('en'):
+            self._get_results(response)
+        self.assertEqual(states, [(True, 'cs')])
+        self.assertIsNone(WHOIS_MEMO.current_scope)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                       WEBWHOIS_BULK_LOOKUP_QUOTA=2)
+    def test_quota(self):
+        cache.clear()
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT unknown'})
+        self.assertEqual(response.status_code, 200)
+        b''.join(response.streaming_content)
+        WHOIS.reset_mock()
+
+        response = self.client.post(reverse("webwhois:bulk_lookup"), {'handles': 'KONTAKT'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response.has_header('Retry-After'))
+        self.assertEqual(response.json(), {'errors': {'__all__': ['QUOTA_EXCEEDED']}})
+        self.assertEqual(WHOIS.mock_calls, [])
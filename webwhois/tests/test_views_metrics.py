@@ -0,0 +1,65 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests of `webwhois.views.metrics` module."""
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from webwhois.utils.profiling import PROFILER
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls')
+class TestMetricsView(SimpleTestCase):
+    """Test `MetricsView` class."""
+
+    def setUp(self):
+        PROFILER.clear()
+        self.addCleanup(PROFILER.clear)
+
+    def test_disabled(self):
+        response = self.client.get(reverse('webwhois:metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(WEBWHOIS_PROFILING=True)
+    def test_not_allowed(self):
+        response = self.client.get(reverse('webwhois:metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(WEBWHOIS_PROFILING=True, WEBWHOIS_METRICS_ALLOWED_IPS=['10.0.0.0/8', '192.0.2.1'])
+    def test_other_client(self):
+        response = self.client.get(reverse('webwhois:metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(WEBWHOIS_PROFILING=True, WEBWHOIS_METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_allowed_network(self):
+        response = self.client.get(reverse('webwhois:metrics'), REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(WEBWHOIS_PROFILING=False, WEBWHOIS_METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_disabled_allowed(self):
+        response = self.client.get(reverse('webwhois:metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(WEBWHOIS_PROFILING=True, WEBWHOIS_METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_metrics(self):
+        PROFILER.record_call('WHOIS', 'get_domain_by_handle')
+        response = self.client.get(reverse('webwhois:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertContains(response, 'webwhois_calls_total{service="WHOIS",method="get_domain_by_handle"} 1\n')
+        self.assertContains(response, 'webwhois_handle_type_lookups_total ')
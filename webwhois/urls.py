@@ -18,9 +18,10 @@
 from django.conf.urls import url
 from django.views.i18n import JavaScriptCatalog
 
-from webwhois.views import BlockObjectFormView, ContactDetailView, CustomEmailView, DomainDetailView, \
-    DownloadEvalFileView, EmailInRegistryView, KeysetDetailView, NotarizedLetterView, NssetDetailView, \
-    PersonalInfoFormView, PublicResponseNotFoundView, RegistrarDetailView, RegistrarListView, ResolveHandleTypeView, \
+from webwhois.views import BlockObjectFormView, BulkJsonView, BulkLookupView, ContactDetailView, ContactJsonView, \
+    CustomEmailView, DomainDetailView, DomainJsonView, DownloadEvalFileView, EmailInRegistryView, KeysetDetailView, \
+    KeysetJsonView, MetricsView, NotarizedLetterView, NssetDetailView, NssetJsonView, PersonalInfoFormView, \
+    PublicResponseNotFoundView, RegistrarDetailView, RegistrarJsonView, RegistrarListView, ResolveHandleTypeView, \
     SendPasswordFormView, ServeNotarizedLetterView, ServeRecordStatementView, UnblockObjectFormView, WhoisFormView
 
 app_name = 'webwhois'
@@ -50,4 +51,12 @@ urlpatterns = [
         name='notarized_letter_serve_pdf'),
     url(r'^verified-record-statement-pdf/(?P<object_type>(contact|domain|nsset|keyset))/(?P<handle>.{1,255})/$',
         ServeRecordStatementView.as_view(), name='record_statement_pdf'),
+    url(r'^api/contact/(?P<handle>.{1,255})/$', ContactJsonView.as_view(), name='api_contact'),
+    url(r'^api/nsset/(?P<handle>.{1,255})/$', NssetJsonView.as_view(), name='api_nsset'),
+    url(r'^api/keyset/(?P<handle>.{1,255})/$', KeysetJsonView.as_view(), name='api_keyset'),
+    url(r'^api/domain/(?P<handle>.{1,255})/$', DomainJsonView.as_view(), name='api_domain'),
+    url(r'^api/registrar/(?P<handle>.{1,255})/$', RegistrarJsonView.as_view(), name='api_registrar'),
+    url(r'^api/bulk/$', BulkJsonView.as_view(), name='api_bulk'),
+    url(r'^bulk-lookup/$', BulkLookupView.as_view(), name='bulk_lookup'),
+    url(r'^metrics/$', MetricsView.as_view(), name='metrics'),
 ]
@@ -0,0 +1,270 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Asynchronous logging of requests to the FRED logger."""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_DROP = 'drop'
+OVERFLOW_JOURNAL = 'journal'
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP, OVERFLOW_JOURNAL)
+
+# Maximal number of operations processed by the sender at once.
+BATCH_SIZE = 100
+
+_CREATE = 'create'
+_CLOSE = 'close'
+
+
+class AsyncLogRequest(object):
+    """Log request which is created and closed by the background sender of `AsyncLogger`.
+
+    @ivar result: Result of the request, passed to the logger when the request is closed.
+    """
+
+    def __init__(self, logger: 'AsyncLogger', args: tuple, kwargs: Dict[str, Any]):
+        self.logger = logger
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None  # type: Optional[str]
+        self.log_request = None  # type: Any
+        # Request is not sent to the logger, but written to the journal when closed.
+        self.spilled = False
+        self.dropped = False
+        self.lock = threading.Lock()
+
+    @property
+    def request_id(self):
+        """Return ID of the log request. The request is created synchronously, if it wasn't created yet."""
+        return self.create().request_id
+
+    def create(self) -> Any:
+        """Create the log request in the logger, if it wasn't created yet, and return it."""
+        with self.lock:
+            if self.log_request is None:
+                self.log_request = self.logger.logger.create_request(*self.args, **self.kwargs)
+                self.spilled = self.dropped = False
+            return self.log_request
+
+    def close(self, **kwargs: Any) -> None:
+        """Close the log request."""
+        self.logger.close_request(self, kwargs)
+
+    def send_close(self, kwargs: Dict[str, Any]) -> None:
+        """Close the log request in the logger."""
+        log_request = self.create()
+        if self.result is not None:
+            log_request.result = self.result
+        log_request.close(**kwargs)
+
+    def get_record(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return journal record of the closed request."""
+        return {'args': self.args, 'kwargs': self.kwargs, 'result': self.result, 'close': kwargs}
+
+
+class AsyncLogger(object):
+    """Logger which creates and closes log requests in a background thread.
+
+    Operations are passed to the sender through a bounded queue. If the queue is full, `overflow` policy is applied:
+
+     * ``block`` - wait for a free place in the queue,
+     * ``drop`` - drop the request,
+     * ``journal`` - write the request to the journal.
+
+    Requests which fail to be sent to the logger are written to the journal and sent again later.
+    If the journal is not defined, such requests are dropped.
+
+    @ivar dropped: Number of dropped requests.
+    @ivar journaled: Number of requests written to the journal.
+    """
+
+    def __init__(self, logger: Any, queue_size: int, overflow: str = OVERFLOW_BLOCK, journal: Optional[str] = None):
+        """Initialize the logger.
+
+        @param logger: Logger which is used to send the requests, usually `pylogger.corbalogger.Logger`.
+        @param queue_size: Size of the operation queue.
+        @param overflow: Policy applied when the queue is full.
+        @param journal: Path to the journal file.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ImproperlyConfigured('Unknown logger overflow policy {!r}.'.format(overflow))
+        self.logger = logger
+        self.overflow = overflow
+        self.journal = journal
+        self.dropped = 0
+        self.journaled = 0
+        self._queue = queue.Queue(maxsize=queue_size)  # type: queue.Queue
+        self._lock = threading.Lock()
+        self._sender = None  # type: Optional[threading.Thread]
+
+    def create_request(self, *args: Any, **kwargs: Any) -> AsyncLogRequest:
+        """Return log request, which is created in the logger asynchronously."""
+        log_request = AsyncLogRequest(self, args, kwargs)
+        if not self._put((_CREATE, log_request, None), block=self.overflow == OVERFLOW_BLOCK):
+            if self.overflow == OVERFLOW_JOURNAL and self.journal:
+                log_request.spilled = True
+            else:
+                log_request.dropped = True
+        return log_request
+
+    def close_request(self, log_request: AsyncLogRequest, kwargs: Dict[str, Any]) -> None:
+        """Close the log request asynchronously."""
+        with log_request.lock:
+            spilled, dropped = log_request.spilled, log_request.dropped
+        if dropped:
+            self._count('dropped')
+        elif spilled:
+            self.write_journal([log_request.get_record(kwargs)])
+        else:
+            # Request is already queued, so its close is always queued to keep the order.
+            self._put((_CLOSE, log_request, kwargs), block=True)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until all queued operations are processed.
+
+        @param timeout: Maximal time to wait in seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._queue.all_tasks_done.wait(remaining)
+
+    def _put(self, item, block: bool) -> bool:
+        self._ensure_sender()
+        try:
+            self._queue.put(item, block=block)
+        except queue.Full:
+            return False
+        return True
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def _ensure_sender(self) -> None:
+        with self._lock:
+            if self._sender is None or not self._sender.is_alive():
+                self._sender = threading.Thread(target=self._run, name='AsyncLogger-sender')
+                self._sender.daemon = True
+                self._sender.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.send(batch)
+            except Exception:
+                # Keep the sender alive, otherwise the queue fills up.
+                WEBWHOIS_LOGGING.exception('Sending of the log requests failed.')
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def send(self, batch: List) -> None:
+        """Send the batch of operations to the logger."""
+        failed = []
+        sent = False
+        for operation, log_request, kwargs in batch:
+            try:
+                if operation == _CREATE:
+                    log_request.create()
+                else:
+                    log_request.send_close(kwargs)
+                sent = True
+            except Exception:
+                WEBWHOIS_LOGGING.warning('Sending of the log request failed.', exc_info=True)
+                if operation == _CLOSE:
+                    with log_request.lock:
+                        created = log_request.log_request is not None
+                    if created or not self.journal:
+                        # Closing of the created request can't be retried.
+                        self._count('dropped')
+                    else:
+                        failed.append(log_request.get_record(kwargs))
+        if failed:
+            self.write_journal(failed)
+        elif sent and self.journal:
+            self.replay_journal()
+
+    def write_journal(self, records: List[Dict[str, Any]]) -> None:
+        """Append the records to the journal."""
+        if not self.journal:
+            self._count('dropped', len(records))
+            return
+        with self._lock:
+            with open(self.journal, 'a') as journal:
+                for record in records:
+                    journal.write(json.dumps(record, default=str) + '\n')
+            self.journaled += len(records)
+
+    def replay_journal(self) -> None:
+        """Send the requests from the journal to the logger."""
+        # The journal may be shared by several processes, each of them replays its own copy.
+        replay_path = '{}.replay.{}'.format(self.journal, os.getpid())
+        with self._lock:
+            # Copy left by a crashed process with the same PID is replayed first.
+            if not os.path.exists(replay_path):
+                try:
+                    os.replace(self.journal, replay_path)
+                except FileNotFoundError:
+                    return
+        records = []
+        with open(replay_path) as replay:
+            for line in replay:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # E.g. a line truncated by a crash.
+                    WEBWHOIS_LOGGING.warning('Invalid record in the log journal %s skipped: %r', replay_path, line)
+                    self._count('dropped')
+        os.remove(replay_path)
+
+        for index, record in enumerate(records):
+            try:
+                log_request = self.logger.create_request(*record['args'], **record['kwargs'])
+            except Exception:
+                WEBWHOIS_LOGGING.warning('Replay of the log journal failed.', exc_info=True)
+                self.write_journal(records[index:])
+                return
+            if record['result'] is not None:
+                log_request.result = record['result']
+            try:
+                log_request.close(**record['close'])
+            except Exception:
+                WEBWHOIS_LOGGING.warning('Replay of the log journal failed.', exc_info=True)
+                self._count('dropped')
@@ -0,0 +1,127 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Concurrent execution of backend calls."""
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from itertools import islice
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.utils import translation
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+_EXECUTOR = None  # type: Optional[ThreadPoolExecutor]
+_EXECUTOR_LOCK = threading.Lock()
+# Marks threads of the pool, nested calls are executed sequentially to prevent a deadlock of the bounded pool.
+_WORKER = threading.local()
+# Callables which capture a thread-bound state of the calling thread and return a context manager to enter it.
+_PROPAGATORS = []  # type: List[Callable[[], ContextManager]]
+
+
+def register_propagator(propagator: Callable[[], ContextManager]) -> None:
+    """Register a propagator of a thread-bound state into the threads of the pool.
+
+    The propagator is called in the calling thread and returns a context manager which is entered in the pool thread.
+    """
+    _PROPAGATORS.append(propagator)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool for backend calls."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=WEBWHOIS_SETTINGS.CONCURRENT_LOOKUP_WORKERS)
+        return _EXECUTOR
+
+
+def _run_in_worker(language: Optional[str], contexts: Sequence[ContextManager], function: Callable,
+                   args: Sequence) -> Any:
+    """Run the function in a pool thread with the language and the state of the calling thread."""
+    _WORKER.active = True
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(translation.override(language, deactivate=True))
+            for context in contexts:
+                stack.enter_context(context)
+            return function(*args)
+    finally:
+        _WORKER.active = False
+
+
+def call_all(calls: Iterable[Tuple[Callable, Sequence]]) -> List[Any]:
+    """Call all functions and return their results in the order of the calls.
+
+    Calls are executed concurrently in a shared thread pool, if `WEBWHOIS_CONCURRENT_LOOKUP` is enabled.
+    Otherwise they are executed sequentially in the current thread.
+    If any call fails, the exception of the first failed call (in the order of the calls) is raised.
+
+    @param calls: Pairs of callable and its positional arguments.
+    """
+    calls = list(calls)
+    if not WEBWHOIS_SETTINGS.CONCURRENT_LOOKUP or len(calls) < 2 or getattr(_WORKER, 'active', False):
+        return [function(*args) for function, args in calls]
+
+    language = translation.get_language()
+    executor = get_executor()
+    futures = [executor.submit(_run_in_worker, language, [propagator() for propagator in _PROPAGATORS], function, args)
+               for function, args in calls]
+    # Wait for all calls, so none of them is left running after the exception is raised.
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
+
+
+def call_as_completed(calls: Iterable[Tuple[Callable, Sequence]], max_pending: int) -> Iterator[Tuple[int, Any]]:
+    """Call all functions and yield pairs of the index of the call and its result as the calls finish.
+
+    Calls are executed concurrently in a shared thread pool, if `WEBWHOIS_CONCURRENT_LOOKUP` is enabled.
+    At most `max_pending` calls are submitted to the pool at once, so a long sequence of calls doesn't block it.
+    Otherwise calls are executed sequentially in the current thread.
+    If a call fails, its exception is raised and the calls not started yet are cancelled.
+
+    @param calls: Pairs of callable and its positional arguments.
+    @param max_pending: Maximal number of calls submitted to the pool at once.
+    """
+    indexed_calls = enumerate(calls)
+    if not WEBWHOIS_SETTINGS.CONCURRENT_LOOKUP or getattr(_WORKER, 'active', False):
+        for index, (function, args) in indexed_calls:
+            yield index, function(*args)
+        return
+
+    language = translation.get_language()
+    executor = get_executor()
+    pending = {}  # type: Dict[Future, int]
+    try:
+        while True:
+            for index, (function, args) in islice(indexed_calls, max_pending - len(pending)):
+                future = executor.submit(_run_in_worker, language, [propagator() for propagator in _PROPAGATORS],
+                                         function, args)
+                pending[future] = index
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,65 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Validators of pages of registry objects for conditional requests."""
+import hashlib
+import json
+from typing import Any
+
+from django.utils.cache import get_conditional_response
+from django.utils.functional import Promise
+from django.utils.http import quote_etag
+
+from .serialization import pack
+
+
+def _pack_objects(value: Any) -> Any:
+    """Pack the registry objects including the dictionaries they are stored in."""
+    if isinstance(value, dict):
+        return {key: _pack_objects(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_pack_objects(item) for item in value]
+    return pack(value)
+
+
+def _encode_value(value: Any) -> Any:
+    """Encode values not supported by JSON."""
+    if not isinstance(value, Promise) and hasattr(value, '__dict__'):
+        return vars(value)
+    return str(value)
+
+
+def get_etag(objects: Any, *variants: str) -> str:
+    """Return a strong ETag of the page with the registry objects.
+
+    @param objects: Registry objects displayed on the page.
+    @param variants: Other values which change the page, e.g. the language.
+    """
+    data = json.dumps([variants, _pack_objects(objects)], sort_keys=True, default=_encode_value)
+    return quote_etag(hashlib.sha1(data.encode()).hexdigest())
+
+
+def get_validated_response(request, response, etag: str):
+    """Add the ETag to the response and return the response or a response to the conditional request.
+
+    Returns `304 Not Modified` response, if the page wasn't modified, which replaces the original response.
+    Pages of registry objects have no `Last-Modified` header, since changes of statuses, expiration or related objects
+    don't change times of changes of the registry objects. `If-Modified-Since` headers are thus ignored.
+    """
+    response['ETag'] = etag
+    return get_conditional_response(request, etag=etag, response=response)
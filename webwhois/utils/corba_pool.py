@@ -0,0 +1,158 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Pool of CORBA object references resolved from several naming services."""
+import random
+import threading
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
+
+import omniORB
+
+# System exceptions which mark the object reference as failed.
+FAILURES = (omniORB.CORBA.TRANSIENT, omniORB.CORBA.OBJECT_NOT_EXIST, omniORB.CORBA.COMM_FAILURE)
+# Weight of the latest result in the health score.
+SCORE_DECAY = 0.2
+# Minimal weight of a member, so failed members are probed from time to time.
+MIN_WEIGHT = 0.05
+
+
+class PoolMember(object):
+    """Object reference resolved from a single naming service.
+
+    @ivar netloc: Network location of the naming service.
+    @ivar client: Client of the naming service.
+    @ivar reference: Resolved object reference or `None`, if it has to be resolved.
+    @ivar score: Health score between 0 and 1.
+    @ivar calls: Number of calls.
+    @ivar failures: Number of failed calls and resolutions.
+    @ivar resolutions: Number of resolutions of the object reference.
+    """
+
+    def __init__(self, netloc: str, client: Any):
+        self.netloc = netloc
+        self.client = client
+        self.reference = None  # type: Any
+        self.score = 1.0
+        self.calls = 0
+        self.failures = 0
+        self.resolutions = 0
+
+
+class ObjectReferencePool(object):
+    """Pool of object references of a single service, which may be used in place of the object reference.
+
+    Calls are balanced over the members according to their health score.
+    The object reference is resolved again through the naming service after a failure.
+    Calls which fail with `TRANSIENT`, `OBJECT_NOT_EXIST` or `COMM_FAILURE` are retried on the other members,
+    only if the call certainly wasn't processed by the server, i.e. it's completed with `COMPLETED_NO` status.
+    Calls which might have been processed, e.g. calls which exceeded their deadline, are not retried,
+    so requests which modify the registry are never repeated.
+    """
+
+    def __init__(self, object_name: str, idl_class: Any, clients: Dict[str, Any]):
+        """Initialize the pool.
+
+        @param object_name: Name of the object in the naming service.
+        @param idl_class: Class of the object reference.
+        @param clients: Naming service clients by their network locations.
+        """
+        self.object_name = object_name
+        self.idl_class = idl_class
+        self.members = [PoolMember(netloc, client) for netloc, client in clients.items()]
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return partial(self._call, name)
+
+    def select(self, exclude: Sequence[PoolMember] = ()) -> Optional[PoolMember]:
+        """Select a member randomly according to the health scores."""
+        members = [member for member in self.members if member not in exclude]
+        if not members:
+            return None
+        weights = [max(member.score, MIN_WEIGHT) for member in members]
+        point = random.uniform(0, sum(weights))
+        for member, weight in zip(members, weights):
+            point -= weight
+            if point <= 0:
+                return member
+        return members[-1]
+
+    def get_reference(self, member: PoolMember) -> Any:
+        """Return the object reference of the member, resolve it if necessary."""
+        with self._lock:
+            reference = member.reference
+        if reference is None:
+            reference = member.client.get_object(self.object_name, self.idl_class)
+            with self._lock:
+                member.reference = reference
+                member.resolutions += 1
+        return reference
+
+    def _call(self, method_name: str, *args: Any, **kwargs: Any) -> Any:
+        failed = []  # type: List[PoolMember]
+        while True:
+            member = self.select(failed)
+            try:
+                reference = self.get_reference(member)
+            except Exception:
+                if not self._retry(member, failed):
+                    raise
+                continue
+
+            try:
+                result = getattr(reference, method_name)(*args, **kwargs)
+            except FAILURES as error:
+                if not self._retry(member, failed) or error.completed != omniORB.CORBA.COMPLETED_NO:
+                    raise
+                continue
+            except omniORB.CORBA.UserException:
+                # The server is alive, it just refused the request.
+                self.report_success(member)
+                raise
+            self.report_success(member)
+            return result
+
+    def _retry(self, member: PoolMember, failed: List[PoolMember]) -> bool:
+        """Report failure of the member and return whether the call may be retried on another member."""
+        self.report_failure(member)
+        failed.append(member)
+        return len(failed) < len(self.members)
+
+    def report_success(self, member: PoolMember) -> None:
+        """Raise the health score of the member."""
+        with self._lock:
+            member.calls += 1
+            member.score = member.score * (1 - SCORE_DECAY) + SCORE_DECAY
+
+    def report_failure(self, member: PoolMember) -> None:
+        """Lower the health score of the member and drop its object reference."""
+        with self._lock:
+            member.calls += 1
+            member.failures += 1
+            member.score *= 1 - SCORE_DECAY
+            member.reference = None
+
+    def get_metrics(self) -> List[Dict[str, Any]]:
+        """Return metrics of the pool members."""
+        with self._lock:
+            return [{'netloc': member.netloc, 'score': member.score, 'resolved': member.reference is not None,
+                     'calls': member.calls, 'failures': member.failures, 'resolutions': member.resolutions}
+                    for member in self.members]
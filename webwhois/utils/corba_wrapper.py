@@ -17,18 +17,29 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 
 """Utilities for Corba."""
+import atexit
+from collections import OrderedDict
+from typing import Any, Dict, List
+
 from django.conf import settings
 from django.utils import timezone
 from django.utils.functional import SimpleLazyObject
 from fred_idl import ccReg
 from fred_idl.ccReg import FileManager, Logger
 from fred_idl.Registry import Buffer, IsoDate, IsoDateTime, PublicRequest, RecordStatement, Whois
-from pyfco import CorbaClient, CorbaClientProxy, CorbaNameServiceClient, CorbaRecoder
+from pyfco import CorbaClient, CorbaNameServiceClient, CorbaRecoder
 from pyfco.recoder import decode_iso_date, decode_iso_datetime
 
 from webwhois.settings import WEBWHOIS_SETTINGS
 
+from .async_logger import AsyncLogger
+from .concurrency import register_propagator
+from .corba_pool import ObjectReferencePool
+from .layers import CallDeadline, CircuitBreaker, CorbaClientLayer, LayeredClientProxy, RequestMemo
 from .logger import create_logger
+from .not_found import NotFoundFilter
+from .profiling import PROFILER, ProfilingLayer
+from .registry_cache import RegistryObjectCache
 
 
 class WebwhoisCorbaRecoder(CorbaRecoder):
@@ -57,45 +68,79 @@ class WebwhoisCorbaRecoder(CorbaRecoder):
         return result
 
 
-_CLIENT = CorbaNameServiceClient(host_port=WEBWHOIS_SETTINGS.CORBA_NETLOC, context_name=WEBWHOIS_SETTINGS.CORBA_CONTEXT)
-
+# Circuit breakers by service names.
+CIRCUIT_BREAKERS = OrderedDict(
+    (service, CircuitBreaker(service))
+    for service in ('WHOIS', 'PUBLIC_REQUEST', 'FILE_MANAGER', 'RECORD_STATEMENT', 'LOGGER'))
 
-def load_whois_from_idl():
-    return _CLIENT.get_object('Whois2', Whois.WhoisIntf)
 
+def get_service_layers(service: str) -> List[CorbaClientLayer]:
+    """Return layers with circuit breaker, call deadlines and profiling of backend calls of the service."""
+    return [CIRCUIT_BREAKERS[service], CallDeadline(service), ProfilingLayer(PROFILER, service, backend=True)]
 
-def load_public_request_from_idl():
-    return _CLIENT.get_object('PublicRequest', PublicRequest.PublicRequestIntf)
 
+def get_client_layers(service: str, *layers: CorbaClientLayer) -> List[CorbaClientLayer]:
+    """Return all layers of the service client.
 
-def load_filemanager_from_idl():
-    return _CLIENT.get_object('FileManager', FileManager)
+    Profiling of calls is the outermost layer, followed by the additional layers and the service layers.
+    """
+    return [ProfilingLayer(PROFILER, service)] + list(layers) + get_service_layers(service)
 
 
-def load_record_statement():
-    return _CLIENT.get_object('RecordStatement', RecordStatement.Server)
+# Time in seconds to wait for the asynchronous logger to send queued requests, when the process exits.
+LOGGER_FLUSH_TIMEOUT = 5
 
 
 def load_logger_from_idl():
     service_client = CorbaNameServiceClient(host_port=WEBWHOIS_SETTINGS.LOGGER_CORBA_NETLOC,
                                             context_name=WEBWHOIS_SETTINGS.LOGGER_CORBA_CONTEXT)
-    return CorbaClient(service_client.get_object(WEBWHOIS_SETTINGS.LOGGER_CORBA_OBJECT, Logger), CorbaRecoder('utf-8'),
-                       ccReg.Logger.INTERNAL_SERVER_ERROR)
+    client = CorbaClient(service_client.get_object(WEBWHOIS_SETTINGS.LOGGER_CORBA_OBJECT, Logger),
+                         CorbaRecoder('utf-8'), ccReg.Logger.INTERNAL_SERVER_ERROR)
+    return LayeredClientProxy(client, layers=get_client_layers('LOGGER'))
+
 
+# Naming service clients by network locations.
+_POOL_CLIENTS = OrderedDict(
+    (netloc, CorbaNameServiceClient(host_port=netloc, context_name=WEBWHOIS_SETTINGS.CORBA_CONTEXT))
+    for netloc in WEBWHOIS_SETTINGS.CORBA_NETLOCS or [WEBWHOIS_SETTINGS.CORBA_NETLOC])
 
-_WHOIS = SimpleLazyObject(load_whois_from_idl)
-_PUBLIC_REQUEST = SimpleLazyObject(load_public_request_from_idl)
-_FILE_MANAGER = SimpleLazyObject(load_filemanager_from_idl)
-_RECORD_STATEMENT = SimpleLazyObject(load_record_statement)
+_WHOIS = ObjectReferencePool('Whois2', Whois.WhoisIntf, _POOL_CLIENTS)
+_PUBLIC_REQUEST = ObjectReferencePool('PublicRequest', PublicRequest.PublicRequestIntf, _POOL_CLIENTS)
+_FILE_MANAGER = ObjectReferencePool('FileManager', FileManager, _POOL_CLIENTS)
+_RECORD_STATEMENT = ObjectReferencePool('RecordStatement', RecordStatement.Server, _POOL_CLIENTS)
 
 if WEBWHOIS_SETTINGS.LOGGER:
     LOGGER = SimpleLazyObject(lambda: create_logger(WEBWHOIS_SETTINGS.LOGGER, load_logger_from_idl()))
+    if WEBWHOIS_SETTINGS.LOGGER_ASYNC:
+        LOGGER = AsyncLogger(LOGGER, WEBWHOIS_SETTINGS.LOGGER_QUEUE_SIZE, WEBWHOIS_SETTINGS.LOGGER_OVERFLOW,
+                             WEBWHOIS_SETTINGS.LOGGER_JOURNAL or None)
+        # Send the queued requests, when the process exits.
+        atexit.register(LOGGER.flush, LOGGER_FLUSH_TIMEOUT)
 else:
     LOGGER = None
 
-WHOIS = CorbaClientProxy(CorbaClient(_WHOIS, WebwhoisCorbaRecoder('utf-8'), Whois.INTERNAL_SERVER_ERROR))
-PUBLIC_REQUEST = CorbaClientProxy(CorbaClient(_PUBLIC_REQUEST, WebwhoisCorbaRecoder('utf-8'),
-                                              PublicRequest.INTERNAL_SERVER_ERROR))
-FILE_MANAGER = CorbaClientProxy(CorbaClient(_FILE_MANAGER, WebwhoisCorbaRecoder('utf-8'), FileManager.InternalError))
-RECORD_STATEMENT = CorbaClientProxy(CorbaClient(_RECORD_STATEMENT, WebwhoisCorbaRecoder('utf-8'),
-                                                RecordStatement.INTERNAL_SERVER_ERROR))
+# Whois methods memoized within a request.
+WHOIS_MEMO_METHODS = ('get_contact_by_handle', 'get_domain_by_handle', 'get_keyset_by_handle', 'get_nsset_by_handle',
+                      'get_registrar_by_handle')
+WHOIS_MEMO = RequestMemo(WHOIS_MEMO_METHODS)
+register_propagator(WHOIS_MEMO.propagate)
+register_propagator(PROFILER.propagate)
+WHOIS_NOT_FOUND = NotFoundFilter()
+WHOIS_CACHE = RegistryObjectCache()
+
+WHOIS = LayeredClientProxy(CorbaClient(_WHOIS, WebwhoisCorbaRecoder('utf-8'), Whois.INTERNAL_SERVER_ERROR),
+                           layers=get_client_layers('WHOIS', WHOIS_MEMO, WHOIS_NOT_FOUND, WHOIS_CACHE))
+PUBLIC_REQUEST = LayeredClientProxy(CorbaClient(_PUBLIC_REQUEST, WebwhoisCorbaRecoder('utf-8'),
+                                                PublicRequest.INTERNAL_SERVER_ERROR),
+                                    layers=get_client_layers('PUBLIC_REQUEST'))
+FILE_MANAGER = LayeredClientProxy(CorbaClient(_FILE_MANAGER, WebwhoisCorbaRecoder('utf-8'), FileManager.InternalError),
+                                  layers=get_client_layers('FILE_MANAGER'))
+RECORD_STATEMENT = LayeredClientProxy(CorbaClient(_RECORD_STATEMENT, WebwhoisCorbaRecoder('utf-8'),
+                                                  RecordStatement.INTERNAL_SERVER_ERROR),
+                                      layers=get_client_layers('RECORD_STATEMENT'))
+
+
+def get_pool_metrics() -> Dict[str, List[Dict[str, Any]]]:
+    """Return metrics of object reference pools by object names."""
+    pools = (_WHOIS, _PUBLIC_REQUEST, _FILE_MANAGER, _RECORD_STATEMENT)
+    return {pool.object_name: pool.get_metrics() for pool in pools}
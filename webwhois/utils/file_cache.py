@@ -0,0 +1,157 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Local cache of downloaded files on disk.
+
+Files are stored under names derived from the hash of their keys. Files are written atomically, so a partially written
+file is never served. Once the cache exceeds the maximal size, the least recently used files are removed.
+Files are returned opened, so they can be served even if they are removed by another process in the meantime.
+"""
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+from django.http import HttpResponse
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .streaming import get_file_range_response
+
+# Prefix of temporary files, which are being written.
+TEMP_PREFIX = '.tmp'
+
+
+class FileCache(object):
+    """Cache of files in a directory with a size limit.
+
+    @ivar directory: The directory with cached files.
+    @ivar max_size: Maximal total size of cached files in bytes.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+    def get_name(self, key: str) -> str:
+        """Return name of the file relative to the cache directory."""
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(digest[:2], digest)
+
+    def get_path(self, key: str) -> str:
+        """Return path of the file."""
+        return os.path.join(self.directory, self.get_name(key))
+
+    def get(self, key: str) -> Optional[BinaryIO]:
+        """Return the opened cached file or `None` if it isn't cached."""
+        path = self.get_path(key)
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            # Mark the file as recently used.
+            os.utime(file.fileno())
+        except (FileNotFoundError, NotImplementedError):
+            pass
+        return file
+
+    def set(self, key: str, content: Iterable[bytes]) -> BinaryIO:
+        """Store the content in the cache and return the opened file.
+
+        The content is closed, if it can be, even if the file fails to be written.
+        """
+        path = self.get_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMP_PREFIX)
+            try:
+                with os.fdopen(handle, 'wb') as temp_file:
+                    for block in content:
+                        temp_file.write(block)
+                # Open the file before it's published, so it can't be removed before it's opened.
+                file = open(temp_path, 'rb')
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        finally:
+            close = getattr(content, 'close', None)
+            if close is not None:
+                close()
+        self.evict(keep=path)
+        return file
+
+    def _list_files(self) -> List[Tuple[float, int, str]]:
+        """Return a list of times of last use, sizes and paths of the cached files."""
+        files = []
+        for subdir in os.scandir(self.directory):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.name.startswith(TEMP_PREFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # File was removed by another process.
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove the least recently used files until the cache fits into its maximal size.
+
+        @param keep: Path of a file which should not be removed.
+        """
+        files = self._list_files()
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+
+def get_file_cache() -> Optional[FileCache]:
+    """Return the file cache or `None` if it's not enabled."""
+    if not WEBWHOIS_SETTINGS.FILE_CACHE_DIR:
+        return None
+    return FileCache(WEBWHOIS_SETTINGS.FILE_CACHE_DIR, WEBWHOIS_SETTINGS.FILE_CACHE_MAX_SIZE)
+
+
+def get_file_response(request, file: BinaryIO, name: str, content_type: str) -> HttpResponse:
+    """Return a response with the cached file, which supports single range requests.
+
+    If `WEBWHOIS_FILE_CACHE_ACCEL_REDIRECT` is set, the file is sent by the web server.
+
+    @param file: The opened cached file, it's closed once the response is closed.
+    @param name: Name of the file relative to the cache directory.
+    """
+    if WEBWHOIS_SETTINGS.FILE_CACHE_ACCEL_REDIRECT:
+        file.close()
+        response = HttpResponse(content_type=content_type)
+        prefix = WEBWHOIS_SETTINGS.FILE_CACHE_ACCEL_REDIRECT.rstrip('/')
+        response['X-Accel-Redirect'] = '{}/{}'.format(prefix, name.replace(os.sep, '/'))
+        return response
+    return get_file_range_response(request, file, content_type)
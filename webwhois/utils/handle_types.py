@@ -0,0 +1,169 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Classification of handles by their shape.
+
+Candidate object types of a handle are predicted by rules from `WEBWHOIS_HANDLE_TYPE_RULES`, so only plausible
+object types are looked up. Each rule is a dictionary with keys:
+
+ * ``pattern`` - regular expression searched in the handle, case is ignored,
+ * ``types`` - object types the matching handle may belong to,
+ * ``in_managed_zone`` - optional, if set, the rule matches only handles which are (or aren't) in a managed zone.
+   Such rules are skipped, unless the snapshot of managed zones is enabled by `WEBWHOIS_MANAGED_ZONES_REFRESH`.
+
+The first matching rule wins. If no rule matches, the classifier is unsure and all object types are candidates.
+Rules are only a prediction, if none of the candidates is found, the other object types are looked up as well.
+Rules are checked when the settings are loaded.
+"""
+import re
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Pattern, Sequence, Tuple
+
+from webwhois.constants import OBJECT_TYPES
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .managed_zones import ManagedZones, get_managed_zones
+
+
+class HandleTypeRule(object):
+    """Compiled rule of the classifier."""
+
+    __slots__ = ('pattern', 'types', 'in_managed_zone')
+
+    def __init__(self, pattern: str, types: Sequence[str], in_managed_zone: Optional[bool] = None):
+        unknown = set(types) - OBJECT_TYPES
+        if unknown:
+            raise ValueError("Unknown object types {} in handle type rule.".format(sorted(unknown)))
+        self.pattern = re.compile(pattern, re.IGNORECASE)  # type: Pattern
+        self.types = frozenset(types)  # type: FrozenSet[str]
+        self.in_managed_zone = in_managed_zone
+
+    def matches(self, handle: str, managed_zones: Sequence[str]) -> bool:
+        """Return whether the rule matches the handle."""
+        if not self.pattern.search(handle):
+            return False
+        if self.in_managed_zone is None:
+            return True
+        return is_in_zones(handle, managed_zones) == self.in_managed_zone
+
+
+def is_in_zones(handle: str, zones: Sequence[str]) -> bool:
+    """Return whether the handle is a name in one of the zones."""
+    name = handle.lower().rstrip('.')
+    return any(name.endswith('.' + zone.lower().strip('.')) for zone in zones)
+
+
+class HandleTypeClassifier(object):
+    """Classifier of handles by rules from `WEBWHOIS_HANDLE_TYPE_RULES`.
+
+    Rules are compiled once for each value of the setting.
+
+    @ivar lookups: Number of classified handles.
+    @ivar matched: Number of handles matched by a rule.
+    @ivar candidates: Total number of object types which could be looked up.
+    @ivar pruned: Total number of object types which were ruled out.
+    @ivar fallbacks: Number of handles, whose ruled out object types were looked up, because no candidate was found.
+    """
+
+    def __init__(self):
+        self.lookups = 0
+        self.matched = 0
+        self.candidates = 0
+        self.pruned = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self._compiled = None  # type: Optional[Tuple[Any, List[HandleTypeRule]]]
+
+    @property
+    def pruning_ratio(self) -> float:
+        """Return the ratio of object types which were ruled out."""
+        with self._lock:
+            return self.pruned / self.candidates if self.candidates else 0.0
+
+    def get_rules(self) -> List[HandleTypeRule]:
+        """Return the compiled rules."""
+        source = WEBWHOIS_SETTINGS.HANDLE_TYPE_RULES
+        compiled = self._compiled
+        # Value of the setting is cached, so it's replaced only if the setting is changed.
+        if compiled is None or compiled[0] is not source:
+            compiled = (source, [HandleTypeRule(**rule) for rule in source])
+            self._compiled = compiled
+        return compiled[1]
+
+    def classify(self, handle: str, object_types: Sequence[str]) -> List[str]:
+        """Return the object types the handle may belong to in the order of `object_types`.
+
+        @param handle: Handle to be looked up.
+        @param object_types: Object types which could be looked up.
+        """
+        rules = self.get_rules()
+        if not rules:
+            return list(object_types)
+
+        managed_zones = None  # type: Optional[ManagedZones]
+        if any(rule.in_managed_zone is not None for rule in rules):
+            # Managed zones are taken only from the snapshot, the classifier never calls the backend itself.
+            managed_zones = get_managed_zones()
+        matched = False
+        candidates = list(object_types)
+        for rule in rules:
+            if managed_zones is None and rule.in_managed_zone is not None:
+                continue
+            if rule.matches(handle, managed_zones.zones if managed_zones is not None else ()):
+                matched = True
+                candidates = [object_type for object_type in object_types if object_type in rule.types]
+                break
+
+        with self._lock:
+            self.lookups += 1
+            if matched:
+                self.matched += 1
+            self.candidates += len(object_types)
+            self.pruned += len(object_types) - len(candidates)
+        return candidates
+
+    def record_fallback(self) -> None:
+        """Record a lookup of the ruled out object types."""
+        with self._lock:
+            self.fallbacks += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters and the pruning ratio."""
+        with self._lock:
+            stats = {'lookups': self.lookups, 'matched': self.matched, 'candidates': self.candidates,
+                     'pruned': self.pruned, 'fallbacks': self.fallbacks}  # type: Dict[str, Any]
+        stats['pruning_ratio'] = self.pruning_ratio
+        return stats
+
+    def get_metrics(self) -> str:
+        """Return the counters in Prometheus text format."""
+        lines = []
+        for name, value in sorted(self.get_stats().items()):
+            if name == 'pruning_ratio':
+                continue
+            lines.append('# TYPE webwhois_handle_type_{}_total counter'.format(name))
+            lines.append('webwhois_handle_type_{}_total {}'.format(name, value))
+        return '\n'.join(lines) + '\n'
+
+    def clear(self) -> None:
+        """Reset the counters."""
+        with self._lock:
+            self.lookups = self.matched = self.candidates = self.pruned = self.fallbacks = 0
+
+
+HANDLE_TYPE_CLASSIFIER = HandleTypeClassifier()
@@ -0,0 +1,102 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Memoized IDNA conversions of domain names.
+
+Names which consist of plain ASCII labels, i.e. letters, digits and hyphens without IDNA labels, are returned
+without any conversion, exactly as `idna` package would return them. Other names are converted by `idna` package
+and the results, including failures, are kept in a process-wide LRU cache.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import idna
+
+# Maximal number of names kept in each cache.
+CACHE_SIZE = 4096
+_ASCII_NAME = re.compile(r'[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?(\.[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?)*\.?',
+                         re.IGNORECASE)
+_MAX_NAME_LENGTH = 253
+
+
+def is_plain_ascii(name: str) -> bool:
+    """Return whether the name consists of valid ASCII labels, which are not IDNA labels."""
+    if len(name) > _MAX_NAME_LENGTH or not _ASCII_NAME.fullmatch(name):
+        return False
+    # Hyphens at the third and the fourth position are reserved, e.g. for `xn--` prefix of IDNA labels.
+    return '--' not in name or all(label[2:4] != '--' for label in name.split('.'))
+
+
+def _strip_traceback(error: idna.IDNAError) -> idna.IDNAError:
+    # Cached errors are raised repeatedly, don't keep their frames nor let their tracebacks grow.
+    error.__context__ = None
+    return error.with_traceback(None)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _encode(name: str) -> Tuple[Optional[str], Optional[idna.IDNAError]]:
+    try:
+        return idna.encode(name).decode(), None
+    except idna.IDNAError as error:
+        return None, _strip_traceback(error)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _decode(name: str) -> Tuple[Optional[str], Optional[idna.IDNAError]]:
+    try:
+        return idna.decode(name), None
+    except idna.IDNAError as error:
+        return None, _strip_traceback(error)
+
+
+def encode(name: str) -> str:
+    """Return the domain name encoded in ASCII.
+
+    @raise idna.IDNAError: If the name isn't valid.
+    """
+    if is_plain_ascii(name):
+        return name
+    result, error = _encode(name)
+    if error is not None:
+        raise error
+    return result
+
+
+def decode(name: str) -> str:
+    """Return the domain name decoded to unicode.
+
+    @raise idna.IDNAError: If the name isn't valid.
+    """
+    if is_plain_ascii(name):
+        return name.lower()
+    result, error = _decode(name)
+    if error is not None:
+        raise error
+    return result
+
+
+def get_cache_info() -> Dict[str, Tuple[int, int, Optional[int], int]]:
+    """Return hits, misses, maximal size and current size of the caches."""
+    return {'encode': tuple(_encode.cache_info()), 'decode': tuple(_decode.cache_info())}
+
+
+def clear_cache() -> None:
+    """Clear the caches."""
+    _encode.cache_clear()
+    _decode.cache_clear()
@@ -0,0 +1,68 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Encoding of decoded CORBA structures into JSON."""
+import base64
+import inspect
+from datetime import date
+from typing import Any, Dict, Tuple, Type
+
+import omniORB
+from django.utils.functional import Promise
+
+# Members of structures with values which may be hidden by the owner of the object.
+DISCLOSABLE_FIELDS = ('value', 'disclose')
+
+_FIELDS = {}  # type: Dict[Type, Tuple[str, ...]]
+
+
+def _get_fields(cls: Type) -> Tuple[str, ...]:
+    """Return names of members of the structure."""
+    if cls not in _FIELDS:
+        _FIELDS[cls] = tuple(inspect.getfullargspec(cls.__init__).args[1:])
+    return _FIELDS[cls]
+
+
+def encode(value: Any) -> Any:
+    """Return the decoded CORBA value in a form which can be serialized into JSON.
+
+    Structures are encoded as objects with their members. Disclosable values are encoded as `None`,
+    unless they are disclosed. Enum items are encoded as their names, dates and times in ISO 8601 format.
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, omniORB.StructBase):
+        fields = _get_fields(type(value))
+        if fields == DISCLOSABLE_FIELDS:
+            return encode(value.value) if value.disclose else None
+        return {name: encode(getattr(value, name)) for name in fields}
+    if isinstance(value, omniORB.Union):
+        return encode(value._v)
+    if isinstance(value, omniORB.EnumItem):
+        return value._n
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    if isinstance(value, Promise):
+        return str(value)
+    raise TypeError("Value {!r} can't be encoded.".format(value))
@@ -0,0 +1,275 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Layers for calls of CORBA clients."""
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Dict, Iterable, Optional
+
+import omniORB
+from pyfco import CorbaClientProxy
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .corba_pool import FAILURES
+
+
+class CorbaClientLayer(object):
+    """Base class for layers which intercept calls made through `LayeredClientProxy`."""
+
+    def handles(self, method_name: str) -> bool:
+        """Return whether the layer intercepts calls of the method."""
+        return True
+
+    def call(self, method_name: str, function, *args, **kwargs):
+        """Make the call of the method.
+
+        @param function: Callable which passes the call to the next layer.
+        """
+        return function(*args, **kwargs)
+
+
+class LayeredClientProxy(CorbaClientProxy):
+    """Proxy for `CorbaClient` which passes method calls through layers.
+
+    Layers are applied in their order, i.e. the first layer is the outermost one.
+    """
+
+    def __init__(self, client, layers: Iterable[CorbaClientLayer] = ()):
+        super(LayeredClientProxy, self).__init__(client)
+        self.layers = list(layers)
+
+    def __getattr__(self, name):
+        if name in ('client', 'layers'):
+            # Attributes are not yet set.
+            raise AttributeError(name)
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+        layers = [layer for layer in self.layers if layer.handles(name)]
+        if not layers:
+            return attr
+        for layer in reversed(layers):
+            attr = partial(layer.call, name, attr)
+        return attr
+
+
+class _MemoEntry(object):
+    """Memoized result of a single call, which may still be in progress."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Optional[BaseException]
+
+
+class _MemoScope(object):
+    """Memoized results of a single scope."""
+
+    def __init__(self):
+        self.results = {}  # type: Dict[Any, _MemoEntry]
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+
+class RequestMemo(CorbaClientLayer):
+    """Layer which memoizes results of calls within a scope, usually a single request.
+
+    Each distinct call is made at most once within the scope, calls made outside of any scope are not memoized.
+    Registry exceptions, such as `OBJECT_NOT_FOUND`, are memoized as well, other failures are not.
+    Memoization is enabled by `WEBWHOIS_REQUEST_MEMO` setting.
+    The scope is shared with threads of the concurrent lookups, which wait for an identical call in progress.
+
+    @ivar hits: Total number of calls answered from the memo.
+    @ivar misses: Total number of memoized calls passed to the backend.
+    """
+
+    def __init__(self, methods: Iterable[str]):
+        self.methods = frozenset(methods)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current_scope(self) -> Optional[_MemoScope]:
+        """Return the scope active in the current thread."""
+        return getattr(self._local, 'scope', None)
+
+    @contextmanager
+    def activate(self, scope: Optional[_MemoScope]):
+        """Activate the existing scope in the current thread."""
+        previous = self.current_scope
+        self._local.scope = scope
+        try:
+            yield scope
+        finally:
+            self._local.scope = previous
+
+    def scope(self):
+        """Return context manager with a new memo scope."""
+        return self.activate(_MemoScope())
+
+    def propagate(self):
+        """Return context manager which activates the current scope in another thread."""
+        return self.activate(self.current_scope)
+
+    def handles(self, method_name):
+        return method_name in self.methods and self.current_scope is not None and WEBWHOIS_SETTINGS.REQUEST_MEMO
+
+    def call(self, method_name, function, *args, **kwargs):
+        scope = self.current_scope
+        assert scope is not None
+        try:
+            key = (method_name, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            # Arguments are not hashable, don't memoize.
+            return function(*args, **kwargs)
+
+        with scope.lock:
+            entry = scope.results.get(key)
+            hit = entry is not None
+            if hit:
+                scope.hits += 1
+            else:
+                entry = scope.results[key] = _MemoEntry()
+                scope.misses += 1
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if hit:
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.result
+
+        try:
+            entry.result = function(*args, **kwargs)
+        except omniORB.CORBA.UserException as error:
+            entry.error = error
+            raise
+        except BaseException as error:
+            # Share the failure with concurrent calls, but make the call again later.
+            entry.error = error
+            with scope.lock:
+                del scope.results[key]
+            raise
+        finally:
+            entry.done.set()
+        return entry.result
+
+
+class CallDeadline(CorbaClientLayer):
+    """Layer which sets omniORB call timeouts defined by `WEBWHOIS_CORBA_DEADLINES` setting.
+
+    Timeouts are looked up by `<service>.<method>` and then by `<service>` keys.
+    Calls which exceed the timeout fail with `TRANSIENT` exception.
+    """
+
+    def __init__(self, service: str):
+        self.service = service
+
+    def get_deadline(self, method_name: str) -> Optional[float]:
+        """Return timeout of the method in seconds or `None`, if it's not defined."""
+        deadlines = WEBWHOIS_SETTINGS.CORBA_DEADLINES
+        return deadlines.get('{}.{}'.format(self.service, method_name), deadlines.get(self.service))
+
+    def handles(self, method_name):
+        return self.get_deadline(method_name) is not None
+
+    def call(self, method_name, function, *args, **kwargs):
+        omniORB.setClientThreadCallTimeout(int(self.get_deadline(method_name) * 1000))
+        try:
+            return function(*args, **kwargs)
+        finally:
+            # Reset the timeout of the current thread.
+            omniORB.setClientThreadCallTimeout(0)
+
+
+class CircuitOpen(omniORB.CORBA.TRANSIENT):
+    """Circuit breaker of the service is open."""
+
+
+class CircuitBreaker(CorbaClientLayer):
+    """Layer which fails fast, if the service keeps failing.
+
+    The circuit is opened after `WEBWHOIS_CIRCUIT_BREAKER_THRESHOLD` consecutive failures of the service.
+    While the circuit is open, calls fail with `CircuitOpen` exception without calling the service.
+    After `WEBWHOIS_CIRCUIT_BREAKER_RESET_TIMEOUT` seconds a single trial call is let through.
+    The circuit is closed, if it succeeds, and opened again otherwise.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, service: str):
+        self.service = service
+        self.failures = 0
+        self.opened = None  # type: Optional[float]
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Return state of the circuit."""
+        with self._lock:
+            if self.opened is None:
+                return self.CLOSED
+            if time.monotonic() - self.opened < WEBWHOIS_SETTINGS.CIRCUIT_BREAKER_RESET_TIMEOUT:
+                return self.OPEN
+            return self.HALF_OPEN
+
+    def handles(self, method_name):
+        return WEBWHOIS_SETTINGS.CIRCUIT_BREAKER_THRESHOLD > 0
+
+    def call(self, method_name, function, *args, **kwargs):
+        with self._lock:
+            if self.opened is not None:
+                if self._trial or time.monotonic() - self.opened < WEBWHOIS_SETTINGS.CIRCUIT_BREAKER_RESET_TIMEOUT:
+                    raise CircuitOpen()
+                self._trial = True
+        try:
+            result = function(*args, **kwargs)
+        except FAILURES:
+            self._report(False)
+            raise
+        except BaseException:
+            # The service responded.
+            self._report(True)
+            raise
+        self._report(True)
+        return result
+
+    def _report(self, success: bool) -> None:
+        with self._lock:
+            self._trial = False
+            if success:
+                self.failures = 0
+                self.opened = None
+            else:
+                self.failures += 1
+                if self.opened is not None or self.failures >= WEBWHOIS_SETTINGS.CIRCUIT_BREAKER_THRESHOLD:
+                    self.opened = time.monotonic()
@@ -0,0 +1,171 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Process-wide list of managed zones.
+
+Names of domains are checked against the zones locally, so lookups of domains in unmanaged zones
+and of names with too many labels don't reach the backend. Local checks are made only for names, which the backend
+would certainly accept as syntactically valid, so their results match the backend exceptions.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fred_idl.Registry.Whois import TOO_MANY_LABELS, UNMANAGED_ZONE
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .corba_wrapper import WHOIS
+from .snapshot import PeriodicSnapshot
+
+# Suffix of ENUM zones, which allow names with several labels below the zone.
+ENUM_SUFFIX = 'e164.arpa'
+_LABEL = re.compile(r'^[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?$')
+_MAX_NAME_LENGTH = 253
+# Key of the zone name in nodes of the trie. Labels are never empty.
+_ZONE = ''
+
+
+def _split_labels(name: str) -> List[str]:
+    """Return labels of the name in lower case."""
+    return name.lower().split('.')
+
+
+def is_valid_name(name: str) -> bool:
+    """Return whether the ASCII domain name is certainly valid.
+
+    Labels may contain only letters, digits and hyphens, hyphens at the third and the fourth position are
+    allowed only in IDNA labels. Names with a trailing dot or a single label are not considered valid.
+    """
+    if len(name) > _MAX_NAME_LENGTH:
+        return False
+    labels = _split_labels(name)
+    if len(labels) < 2:
+        return False
+    for label in labels:
+        if not _LABEL.match(label):
+            return False
+        if label[2:4] == '--' and not label.startswith('xn--'):
+            return False
+    return True
+
+
+class ZoneTrie(object):
+    """Suffix trie of zones with nodes keyed by labels from the end of the zone names."""
+
+    def __init__(self, zones: Iterable[str]):
+        self._root = {}  # type: Dict[str, Any]
+        for zone in zones:
+            node = self._root
+            for label in reversed(_split_labels(zone.strip('.'))):
+                node = node.setdefault(label, {})
+            node[_ZONE] = zone
+
+    def find(self, labels: Sequence[str]) -> Optional[Tuple[str, int]]:
+        """Return the longest zone which contains the name and the number of labels of the zone.
+
+        @param labels: Labels of the name in lower case. The name must have at least one label below the zone.
+        """
+        found = None
+        node = self._root
+        for depth, label in enumerate(reversed(labels[1:]), start=1):
+            node = node.get(label)
+            if node is None:
+                break
+            if _ZONE in node:
+                found = (node[_ZONE], depth)
+        return found
+
+
+class ManagedZones(object):
+    """Immutable list of managed zones.
+
+    @ivar zones: Names of the zones in the order returned by the backend.
+    """
+
+    def __init__(self, zones: Iterable[str]):
+        self.zones = tuple(zones)
+        self._trie = ZoneTrie(self.zones)
+
+    def find_zone(self, name: str) -> Optional[str]:
+        """Return the managed zone of the name."""
+        found = self._trie.find(_split_labels(name))
+        return found[0] if found else None
+
+    def check_domain(self, name: str) -> None:
+        """Check the ASCII domain name against the zones.
+
+        @raise UNMANAGED_ZONE: If the name isn't in any managed zone.
+        @raise TOO_MANY_LABELS: If the name has more than one label below a zone other than ENUM.
+        """
+        if not is_valid_name(name):
+            # Leave the name to the backend.
+            return
+        labels = _split_labels(name)
+        found = self._trie.find(labels)
+        if found is None:
+            raise UNMANAGED_ZONE()
+        zone, depth = found
+        if len(labels) > depth + 1 and not self.is_enum(zone):
+            raise TOO_MANY_LABELS()
+
+    @staticmethod
+    def is_enum(zone: str) -> bool:
+        """Return whether the zone is an ENUM zone."""
+        zone = zone.lower().strip('.')
+        return zone == ENUM_SUFFIX or zone.endswith('.' + ENUM_SUFFIX)
+
+    def get_registrable_name(self, handle: str, ascii_name: str) -> Optional[str]:
+        """Return the name with a single label below its zone, e.g. `example.cz` for `www.example.cz`.
+
+        @param handle: The name as entered, possibly an IDN.
+        @param ascii_name: The name encoded in ASCII.
+        """
+        labels = _split_labels(ascii_name)
+        found = self._trie.find(labels)
+        handle_labels = handle.rstrip('.').split('.')
+        if found is None or len(handle_labels) != len(labels):
+            return None
+        return '.'.join(handle_labels[-found[1] - 1:])
+
+
+class ManagedZonesSnapshot(PeriodicSnapshot):
+    """Snapshot of managed zones refreshed every `WEBWHOIS_MANAGED_ZONES_REFRESH` seconds."""
+
+    def get_interval(self):
+        return WEBWHOIS_SETTINGS.MANAGED_ZONES_REFRESH
+
+    def load(self, initial):
+        return ManagedZones(WHOIS.get_managed_zone_list())
+
+
+MANAGED_ZONES = ManagedZonesSnapshot()
+
+
+def get_managed_zones() -> Optional[ManagedZones]:
+    """Return the managed zones or `None` if the snapshot isn't enabled."""
+    if not WEBWHOIS_SETTINGS.MANAGED_ZONES_REFRESH:
+        return None
+    return MANAGED_ZONES.get()
+
+
+def get_managed_zone_list() -> Sequence[str]:
+    """Return names of the managed zones from the snapshot, if it's enabled, or from the backend."""
+    zones = get_managed_zones()
+    if zones is None:
+        return WHOIS.get_managed_zone_list()
+    return zones.zones
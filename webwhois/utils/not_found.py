@@ -0,0 +1,214 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Answers for registry objects which don't exist without the backend.
+
+Lookups by handles are ruled out by a filter of known handles loaded from a registry export file,
+if the handle is not present in the export. The export file contains a single object on each line - its type and handle
+separated by whitespace, e.g. ``domain example.cz``. Handles of types not present in the file are not filtered.
+Domain names are compared in ASCII, so they may be exported either in unicode or in ASCII.
+
+The export is authoritative only while it's fresh, i.e. not older than `WEBWHOIS_KNOWN_HANDLES_MAX_AGE`,
+which is disabled by default. Cached `OBJECT_NOT_FOUND` results are handled by the registry cache,
+see `WEBWHOIS_OBJECT_CACHE_NOT_FOUND_TIMEOUT`.
+"""
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+import idna
+from fred_idl.Registry.Whois import OBJECT_NOT_FOUND
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from . import idna_codec
+from .layers import CorbaClientLayer
+from .registry_cache import CACHED_METHODS
+from .snapshot import PeriodicSnapshot
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+# Probability that a handle missing in the export passes the filter.
+FALSE_POSITIVE_RATE = 0.001
+
+
+def _normalize(object_type: str, handle: str) -> str:
+    """Return the handle in the form used in the filters.
+
+    Handles are case insensitive and domains may be fully qualified. Domains are looked up in ASCII,
+    so they're encoded to match the export in either form.
+
+    @raise idna.IDNAError: If the domain name can't be encoded.
+    """
+    handle = handle.strip().rstrip('.').lower()
+    if object_type == 'domain':
+        handle = idna_codec.encode(handle).lower()
+    return handle
+
+
+class BloomFilter(object):
+    """Bloom filter of strings.
+
+    @ivar size: Number of bits.
+    @ivar hash_count: Number of bits set for each item.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _get_positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.sha1(item.encode()).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._get_positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._get_positions(item))
+
+
+class KnownHandles(object):
+    """Immutable filters of handles from a registry export file.
+
+    @ivar exported: Time of the export, i.e. the modification time of the file.
+    @ivar filters: Filters of handles by object types.
+    """
+
+    def __init__(self, exported: float, filters: Mapping[str, BloomFilter]):
+        self.exported = exported
+        self.filters = MappingProxyType(dict(filters))  # type: Mapping[str, BloomFilter]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'KnownHandles':
+        """Load handles from the export file."""
+        exported = os.stat(path).st_mtime
+        handles = {}  # type: Dict[str, List[str]]
+        invalid = set()  # type: Set[str]
+        with open(path, encoding='utf-8') as export:
+            for line in export:
+                parts = line.split()
+                if len(parts) != 2:
+                    continue
+                object_type, handle = parts
+                try:
+                    handles.setdefault(object_type, []).append(_normalize(object_type, handle))
+                except idna.IDNAError:
+                    invalid.add(object_type)
+        for object_type in sorted(invalid):
+            # Lookups of such handles can't be matched, so the type isn't filtered at all.
+            WEBWHOIS_LOGGING.warning('Export of known handles %s contains invalid handles of type %s, '
+                                     'the type is not filtered.', path, object_type)
+        filters = {}
+        for object_type, items in handles.items():
+            if object_type in invalid:
+                continue
+            filters[object_type] = BloomFilter(len(items), FALSE_POSITIVE_RATE)
+            for item in items:
+                filters[object_type].add(item)
+        return cls(exported, filters)
+
+    def is_fresh(self) -> bool:
+        """Return whether the export isn't older than `WEBWHOIS_KNOWN_HANDLES_MAX_AGE`.
+
+        Exports from the future, e.g. due to a clock skew, are not considered fresh.
+        """
+        return 0 <= time.time() - self.exported <= WEBWHOIS_SETTINGS.KNOWN_HANDLES_MAX_AGE
+
+    def is_unknown(self, object_type: str, handle: str) -> bool:
+        """Return whether the handle is certainly missing in the export."""
+        handle_filter = self.filters.get(object_type)
+        if handle_filter is None:
+            return False
+        try:
+            return _normalize(object_type, handle) not in handle_filter
+        except idna.IDNAError:
+            # Let the backend answer.
+            return False
+
+
+class KnownHandlesSnapshot(PeriodicSnapshot):
+    """Known handles reloaded every `WEBWHOIS_KNOWN_HANDLES_REFRESH` seconds, if the export file changed."""
+
+    def get_interval(self):
+        return WEBWHOIS_SETTINGS.KNOWN_HANDLES_REFRESH
+
+    def load(self, initial):
+        path = WEBWHOIS_SETTINGS.KNOWN_HANDLES_FILE
+        current = None if initial else self._data
+        try:
+            if current is not None and os.stat(path).st_mtime == current.exported:
+                return current
+            return KnownHandles.from_file(path)
+        except OSError:
+            # Without the export, all handles are looked up in the backend.
+            WEBWHOIS_LOGGING.exception('Export of known handles %s could not be loaded.', path)
+            return current
+
+
+KNOWN_HANDLES = KnownHandlesSnapshot()
+
+
+def is_enabled() -> bool:
+    """Return whether the known handles are enabled."""
+    return bool(WEBWHOIS_SETTINGS.KNOWN_HANDLES_FILE) and WEBWHOIS_SETTINGS.KNOWN_HANDLES_MAX_AGE > 0
+
+
+def get_known_handles() -> Optional[KnownHandles]:
+    """Return the known handles, if they are enabled and fresh."""
+    if not is_enabled():
+        return None
+    known_handles = KNOWN_HANDLES.get()
+    if known_handles is None or not known_handles.is_fresh():
+        return None
+    return known_handles
+
+
+class NotFoundFilter(CorbaClientLayer):
+    """Layer which answers lookups of registry objects, which don't exist, without the backend.
+
+    Handles missing in the export file from `WEBWHOIS_KNOWN_HANDLES_FILE` are not found. The export is used only
+    while it's not older than `WEBWHOIS_KNOWN_HANDLES_MAX_AGE`, otherwise all lookups are passed to the backend.
+
+    @ivar filtered: Number of lookups answered by the known handles.
+    """
+
+    def __init__(self):
+        self.filtered = 0
+        self._lock = threading.Lock()
+
+    def handles(self, method_name):
+        return method_name in CACHED_METHODS and is_enabled()
+
+    def call(self, method_name, function, handle):
+        known_handles = get_known_handles()
+        if known_handles is not None and known_handles.is_unknown(CACHED_METHODS[method_name], handle):
+            with self._lock:
+                self.filtered += 1
+            raise OBJECT_NOT_FOUND()
+        return function(handle)
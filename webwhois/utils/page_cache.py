@@ -0,0 +1,83 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Cache of rendered pages of registry objects."""
+import hashlib
+import uuid
+
+import idna
+from django.core.cache import caches
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from . import idna_codec
+
+CACHE_KEY_PREFIX = 'webwhois_page'
+
+
+def get_page_cache():
+    """Return cache for rendered pages."""
+    return caches[WEBWHOIS_SETTINGS.PAGE_CACHE_ALIAS]
+
+
+def _hash(value: str) -> str:
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def normalize_handle(handle: str) -> str:
+    """Return the form of the handle shared by all its variants.
+
+    Handles are case insensitive and domain names may be in unicode or in ASCII.
+    """
+    try:
+        handle = idna_codec.decode(handle)
+    except idna.IDNAError:
+        # Not a domain name.
+        pass
+    return handle.lower()
+
+
+def _get_generation_key(handle: str) -> str:
+    return '{}_generation:{}'.format(CACHE_KEY_PREFIX, _hash(normalize_handle(handle)))
+
+
+def get_generation(handle: str) -> str:
+    """Return current generation of cached pages of the handle."""
+    cache = get_page_cache()
+    key = _get_generation_key(handle)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_page_cache_key(view_name: str, handle: str, language: str, base_template: str) -> str:
+    """Return cache key of the rendered page.
+
+    Pages are purged by all variants of the handle, since they share the generation. Each variant has its own page,
+    because pages contain the handle as it was requested.
+    """
+    return '{}:{}:{}:{}:{}:{}'.format(CACHE_KEY_PREFIX, view_name, _hash(handle), get_generation(handle), language,
+                                      _hash(base_template))
+
+
+def purge_page_cache(handle: str) -> None:
+    """Purge all cached pages of the handle."""
+    # Cached pages are not deleted, they just become unreachable.
+    get_page_cache().set(_get_generation_key(handle), uuid.uuid4().hex, None)
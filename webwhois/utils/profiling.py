@@ -0,0 +1,251 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Profiling of requests - accounting of backend calls and template rendering.
+
+Profiling is enabled by `WEBWHOIS_PROFILING` setting. Calls are recorded by two client layers of each service.
+The outer layer records all calls made by the application, the inner layer records calls which reach the backend,
+i.e. calls not answered by memos and caches. Calls rejected by an open circuit breaker are recorded by the outer layer
+as failed, not as answered. Records are kept for the current request and aggregated for the process.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .layers import CircuitOpen, CorbaClientLayer
+
+
+class RequestProfile(object):
+    """Profile of a single request.
+
+    @ivar calls: Numbers of calls by service and method names.
+    @ivar backend_calls: Numbers of calls which reached the backend by service and method names.
+    @ivar circuit_open: Numbers of calls rejected by an open circuit breaker by service and method names.
+    @ivar backend_time: Total time of backend calls in seconds.
+    @ivar backend_bytes: Total size of binary results of backend calls in bytes.
+    @ivar template_time: Total time of template rendering in seconds.
+    """
+
+    def __init__(self):
+        self.calls = Counter()  # type: Counter
+        self.backend_calls = Counter()  # type: Counter
+        self.circuit_open = Counter()  # type: Counter
+        self.backend_time = 0.0
+        self.backend_bytes = 0
+        self.template_time = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def circuit_open_calls(self) -> int:
+        """Return number of calls rejected by an open circuit breaker."""
+        return sum(self.circuit_open.values())
+
+    @property
+    def cache_hits(self) -> int:
+        """Return number of calls answered without the backend."""
+        return max(sum(self.calls.values()) - sum(self.backend_calls.values()) - self.circuit_open_calls, 0)
+
+    def get_rows(self) -> List[Tuple[str, str, int, int]]:
+        """Return service, method, number of calls and number of backend calls of the called methods."""
+        with self.lock:
+            return [(service, method_name, self.calls[service, method_name],
+                     self.backend_calls[service, method_name])
+                    for service, method_name in sorted(set(self.calls) | set(self.backend_calls))]
+
+    def get_server_timing(self) -> str:
+        """Return value of the `Server-Timing` header."""
+        metrics = [
+            'backend;dur={:.3f};desc="{} calls"'.format(self.backend_time * 1000, sum(self.backend_calls.values())),
+            'cache;desc="{} hits"'.format(self.cache_hits),
+        ]
+        if self.circuit_open_calls:
+            metrics.append('circuit;desc="{} open"'.format(self.circuit_open_calls))
+        if self.template_time:
+            metrics.append('template;dur={:.3f}'.format(self.template_time * 1000))
+        return ', '.join(metrics)
+
+
+class _Totals(object):
+    """Totals aggregated for a single service method."""
+
+    def __init__(self):
+        self.calls = 0
+        self.backend_calls = 0
+        self.circuit_open = 0
+        self.backend_time = 0.0
+        self.backend_bytes = 0
+
+
+class Profiler(object):
+    """Profiler of requests.
+
+    Profile of a request is active in the thread which handles it and it's shared with threads of the concurrent
+    lookups.
+
+    @ivar requests: Total number of profiled requests.
+    @ivar template_renders: Total number of rendered templates.
+    @ivar template_time: Total time of template rendering in seconds.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.template_renders = 0
+        self.template_time = 0.0
+        self._totals = defaultdict(_Totals)  # type: Dict[Tuple[str, str], _Totals]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current_profile(self) -> Optional[RequestProfile]:
+        """Return the profile active in the current thread."""
+        return getattr(self._local, 'profile', None)
+
+    @contextmanager
+    def activate(self, profile: Optional[RequestProfile]):
+        """Activate the existing profile in the current thread."""
+        previous = self.current_profile
+        self._local.profile = profile
+        try:
+            yield profile
+        finally:
+            self._local.profile = previous
+
+    def scope(self):
+        """Return context manager with a new request profile."""
+        with self._lock:
+            self.requests += 1
+        return self.activate(RequestProfile())
+
+    def propagate(self):
+        """Return context manager which activates the current profile in another thread."""
+        return self.activate(self.current_profile)
+
+    def record_call(self, service: str, method_name: str) -> None:
+        """Record a call made by the application."""
+        profile = self.current_profile
+        if profile is not None:
+            with profile.lock:
+                profile.calls[service, method_name] += 1
+        with self._lock:
+            self._totals[service, method_name].calls += 1
+
+    def record_circuit_open(self, service: str, method_name: str) -> None:
+        """Record a call rejected by an open circuit breaker."""
+        profile = self.current_profile
+        if profile is not None:
+            with profile.lock:
+                profile.circuit_open[service, method_name] += 1
+        with self._lock:
+            self._totals[service, method_name].circuit_open += 1
+
+    def record_backend_call(self, service: str, method_name: str, duration: float, size: int) -> None:
+        """Record a call which reached the backend.
+
+        @param duration: Duration of the call in seconds.
+        @param size: Size of the binary result in bytes.
+        """
+        profile = self.current_profile
+        if profile is not None:
+            with profile.lock:
+                profile.backend_calls[service, method_name] += 1
+                profile.backend_time += duration
+                profile.backend_bytes += size
+        with self._lock:
+            totals = self._totals[service, method_name]
+            totals.backend_calls += 1
+            totals.backend_time += duration
+            totals.backend_bytes += size
+
+    def record_template(self, profile: Optional[RequestProfile], duration: float) -> None:
+        """Record rendering of a template of the request with the profile."""
+        if profile is not None:
+            with profile.lock:
+                profile.template_time += duration
+        with self._lock:
+            self.template_renders += 1
+            self.template_time += duration
+
+    def get_metrics(self) -> str:
+        """Return aggregated metrics in Prometheus text format."""
+        with self._lock:
+            totals = sorted(self._totals.items())
+            lines = [
+                '# TYPE webwhois_requests_total counter',
+                'webwhois_requests_total {}'.format(self.requests),
+                '# TYPE webwhois_template_renders_total counter',
+                'webwhois_template_renders_total {}'.format(self.template_renders),
+                '# TYPE webwhois_template_seconds_total counter',
+                'webwhois_template_seconds_total {:.6f}'.format(self.template_time),
+            ]
+            for name, attr, pattern in (('calls', 'calls', '{}'), ('backend_calls', 'backend_calls', '{}'),
+                                        ('circuit_open_calls', 'circuit_open', '{}'),
+                                        ('backend_seconds', 'backend_time', '{:.6f}'),
+                                        ('backend_bytes', 'backend_bytes', '{}')):
+                lines.append('# TYPE webwhois_{}_total counter'.format(name))
+                for (service, method_name), method_totals in totals:
+                    lines.append('webwhois_{}_total{{service="{}",method="{}"}} {}'.format(
+                        name, service, method_name, pattern.format(getattr(method_totals, attr))))
+        return '\n'.join(lines) + '\n'
+
+    def clear(self) -> None:
+        """Clear the aggregated metrics."""
+        with self._lock:
+            self.requests = 0
+            self.template_renders = 0
+            self.template_time = 0.0
+            self._totals.clear()
+
+
+class ProfilingLayer(CorbaClientLayer):
+    """Layer which records calls of the service into the profiler.
+
+    @ivar backend: Whether the layer records calls which reach the backend, i.e. whether it's the innermost layer.
+    """
+
+    def __init__(self, profiler: Profiler, service: str, backend: bool = False):
+        self.profiler = profiler
+        self.service = service
+        self.backend = backend
+
+    def handles(self, method_name):
+        return WEBWHOIS_SETTINGS.PROFILING
+
+    def call(self, method_name, function, *args, **kwargs):
+        if not self.backend:
+            self.profiler.record_call(self.service, method_name)
+            try:
+                return function(*args, **kwargs)
+            except CircuitOpen:
+                self.profiler.record_circuit_open(self.service, method_name)
+                raise
+
+        start = time.perf_counter()
+        result = None
+        try:
+            result = function(*args, **kwargs)
+            return result
+        finally:
+            size = len(result) if isinstance(result, bytes) else 0
+            self.profiler.record_backend_call(self.service, method_name, time.perf_counter() - start, size)
+
+
+PROFILER = Profiler()
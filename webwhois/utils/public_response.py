@@ -19,9 +19,14 @@
 """Public responses - responses for public requests.
 
 Responses hold the data to be displayed on the response pages.
+
+Responses are stored in the cache in a compact form produced by `encode_public_response`, i.e. a tuple with a format
+version, a tag of the response class and values of the response attributes.
+Such data don't depend on the layout of the classes, so they can be decoded by a different version of the application.
 """
 import warnings
 from datetime import date
+from typing import Any, Dict, Optional, Tuple, Type
 
 from django.conf import settings
 from django.utils.timezone import localdate
@@ -30,7 +35,13 @@ UNDEFINED = 'UNDEFINED'
 
 
 class PublicResponse(object):
-    """Base class for public responses."""
+    """Base class for public responses.
+
+    @cvar tag: Tag of the class in the encoded responses.
+    """
+
+    tag = 'public'
+    __slots__ = ('object_type', 'public_request_id', 'request_type', 'handle', 'confirmation_method', 'create_date')
 
     def __init__(self, object_type, public_request_id, request_type, handle, confirmation_method=UNDEFINED):
         self.object_type = object_type
@@ -60,10 +71,21 @@ class PublicResponse(object):
     def __ne__(self, other):
         return not self == other
 
+    def __setstate__(self, state):
+        # Support responses pickled before the slots were defined, which pickled the instance dictionary.
+        if isinstance(state, tuple):
+            instance_state, slots_state = state
+            state = dict(instance_state or {}, **slots_state)
+        for name, value in state.items():
+            setattr(self, name, value)
+
 
 class SendPasswordResponse(PublicResponse):
     """Public response for send password public request."""
 
+    tag = 'send_password'
+    __slots__ = ('custom_email', )
+
     def __init__(self, object_type, public_request_id, request_type, handle, custom_email,
                  confirmation_method=UNDEFINED):
         super(SendPasswordResponse, self).__init__(object_type, public_request_id, request_type, handle,
@@ -77,6 +99,9 @@ class SendPasswordResponse(PublicResponse):
 class PersonalInfoResponse(PublicResponse):
     """Public response for personal info public request."""
 
+    tag = 'personal_info'
+    __slots__ = ('custom_email', )
+
     def __init__(self, object_type, public_request_id, request_type, handle, custom_email,
                  confirmation_method=UNDEFINED):
         super(PersonalInfoResponse, self).__init__(object_type, public_request_id, request_type, handle,
@@ -90,6 +115,9 @@ class PersonalInfoResponse(PublicResponse):
 class BlockResponse(PublicResponse):
     """Public response for block public requests."""
 
+    tag = 'block'
+    __slots__ = ('action', 'lock_type')
+
     def __init__(self, object_type, public_request_id, request_type, handle, action, lock_type,
                  confirmation_method=UNDEFINED):
         super(BlockResponse, self).__init__(object_type, public_request_id, request_type, handle, confirmation_method)
@@ -99,3 +127,58 @@ class BlockResponse(PublicResponse):
     def __eq__(self, other):
         return super(BlockResponse, self).__eq__(other) and self.action == other.action \
             and self.lock_type == other.lock_type
+
+
+# Version of the encoded responses.
+ENCODING_VERSION = 1
+# Classes of the encoded responses by their tags.
+RESPONSE_CLASSES = {cls.tag: cls for cls in (PublicResponse, SendPasswordResponse, PersonalInfoResponse,
+                                             BlockResponse)}  # type: Dict[str, Type[PublicResponse]]
+
+_ATTRIBUTES = {}  # type: Dict[Type[PublicResponse], Tuple[str, ...]]
+
+
+def _get_attributes(cls: Type[PublicResponse]) -> Tuple[str, ...]:
+    """Return names of attributes of the response class."""
+    if cls not in _ATTRIBUTES:
+        attributes = []
+        for base in reversed(cls.__mro__):
+            attributes.extend(base.__dict__.get('__slots__', ()))
+        _ATTRIBUTES[cls] = tuple(attributes)
+    return _ATTRIBUTES[cls]
+
+
+def encode_public_response(public_response: PublicResponse) -> Any:
+    """Encode the public response to be stored in the cache.
+
+    Responses of classes not registered in `RESPONSE_CLASSES` are returned unchanged.
+    """
+    cls = type(public_response)
+    if RESPONSE_CLASSES.get(getattr(cls, 'tag', None)) is not cls:
+        return public_response
+    values = []
+    for name in _get_attributes(cls):
+        value = getattr(public_response, name)
+        if name == 'create_date':
+            value = value.toordinal()
+        values.append(value)
+    return (ENCODING_VERSION, cls.tag, tuple(values))
+
+
+def decode_public_response(data: Any) -> Optional[PublicResponse]:
+    """Decode the public response from the cache.
+
+    Returns `None` if there is no response or it's encoded in an unknown format.
+    Responses stored in the cache without encoding, e.g. by older versions, are returned unchanged.
+    """
+    if not isinstance(data, tuple):
+        return data
+    if len(data) != 3 or data[0] != ENCODING_VERSION or data[1] not in RESPONSE_CLASSES:
+        return None
+    cls = RESPONSE_CLASSES[data[1]]
+    public_response = cls.__new__(cls)
+    for name, value in zip(_get_attributes(cls), data[2]):
+        if name == 'create_date':
+            value = date.fromordinal(value)
+        setattr(public_response, name, value)
+    return public_response
@@ -0,0 +1,59 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Quotas of clients stored in the Django cache."""
+import hashlib
+import time
+from typing import Optional
+
+from django.core.cache import cache
+
+CACHE_KEY_PREFIX = 'webwhois_quota'
+
+
+def consume_quota(name: str, client: str, amount: int, limit: int, period: int) -> Optional[int]:
+    """Consume the amount from the quota of the client.
+
+    Quotas are renewed at the start of each period.
+
+    @param name: Name of the quota.
+    @param client: Identifier of the client, e.g. its IP address.
+    @param amount: Amount to be consumed.
+    @param limit: Amount available to the client in each period.
+    @param period: Length of the period in seconds.
+    @return: `None` if the amount was consumed, otherwise number of seconds until the quota is renewed.
+    """
+    now = time.time()
+    window = int(now // period)
+    cache_key = '{}:{}:{}:{}'.format(CACHE_KEY_PREFIX, name, hashlib.md5(client.encode()).hexdigest(), window)
+    # Counter is created and incremented atomically, so concurrent requests can't exceed the limit.
+    cache.add(cache_key, 0, period)
+    try:
+        used = cache.incr(cache_key, amount)
+    except ValueError:
+        # The key expired in the meantime.
+        cache.add(cache_key, 0, period)
+        used = cache.incr(cache_key, amount)
+    if used > limit:
+        # Rejected amount is not consumed.
+        try:
+            cache.decr(cache_key, amount)
+        except ValueError:
+            pass
+        return int((window + 1) * period - now) + 1
+    return None
@@ -0,0 +1,72 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Process-wide catalogue of registrars."""
+from types import MappingProxyType
+from typing import Any, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .concurrency import call_all
+from .corba_wrapper import WHOIS
+from .snapshot import PeriodicSnapshot
+
+
+class RegistrarCatalogue(object):
+    """Immutable catalogue of registrars with their groups and certifications.
+
+    @ivar registrars: Registrars in the order returned by the backend.
+    @ivar registrar_index: Registrars by their handles.
+    @ivar groups: Registrar groups by their names.
+    @ivar group_members: Handles of group members by group names.
+    @ivar group_registrars: Registrars in groups by group names.
+    @ivar certifications: Registrar certifications by registrar handles.
+    """
+
+    def __init__(self, registrars: Iterable, groups: Iterable, certifications: Iterable):
+        self.registrars = tuple(registrars)  # type: Tuple[Any, ...]
+        self.registrar_index = MappingProxyType({r.handle: r for r in self.registrars})  # type: Mapping[str, Any]
+        self.groups = MappingProxyType({group.name: group for group in groups})  # type: Mapping[str, Any]
+        members = {name: frozenset(group.members) for name, group in self.groups.items()}
+        self.group_members = MappingProxyType(members)  # type: Mapping[str, FrozenSet[str]]
+        self.group_registrars = MappingProxyType(
+            {name: tuple(r for r in self.registrars if r.handle in handles)
+             for name, handles in members.items()})  # type: Mapping[str, Tuple[Any, ...]]
+        self.certifications = MappingProxyType(
+            {cert.registrar_handle: cert for cert in certifications})  # type: Mapping[str, Any]
+
+
+class RegistrarCatalogueSnapshot(PeriodicSnapshot):
+    """Snapshot of the registrar catalogue refreshed every `WEBWHOIS_REGISTRAR_CATALOGUE_REFRESH` seconds."""
+
+    def get_interval(self):
+        return WEBWHOIS_SETTINGS.REGISTRAR_CATALOGUE_REFRESH
+
+    def load(self, initial):
+        return RegistrarCatalogue(*call_all([(WHOIS.get_registrars, ()), (WHOIS.get_registrar_groups, ()),
+                                             (WHOIS.get_registrar_certification_list, ())]))
+
+
+REGISTRAR_CATALOGUE = RegistrarCatalogueSnapshot()
+
+
+def get_registrar_catalogue() -> Optional[RegistrarCatalogue]:
+    """Return the registrar catalogue or `None` if it isn't enabled."""
+    if not WEBWHOIS_SETTINGS.REGISTRAR_CATALOGUE_REFRESH:
+        return None
+    return REGISTRAR_CATALOGUE.get()
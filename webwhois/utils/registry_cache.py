@@ -0,0 +1,136 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Shared cache of registry objects."""
+import hashlib
+import time
+
+from django.core.cache import caches
+from fred_idl.Registry.Whois import OBJECT_NOT_FOUND
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .layers import CorbaClientLayer
+from .serialization import pack, unpack
+
+# Object types of the cached WHOIS methods.
+CACHED_METHODS = {
+    'get_contact_by_handle': 'contact',
+    'get_domain_by_handle': 'domain',
+    'get_keyset_by_handle': 'keyset',
+    'get_nsset_by_handle': 'nsset',
+    'get_registrar_by_handle': 'registrar',
+}
+CACHE_KEY_PREFIX = 'webwhois_object'
+
+_FOUND = 'F'
+_NOT_FOUND = 'N'
+# Interval between checks of the cache while waiting for an object loaded by another thread or process.
+_POLL_INTERVAL = 0.05
+
+
+def get_cache_key(object_type: str, handle: str) -> str:
+    """Return cache key for the registry object."""
+    # Handles may contain characters not allowed in cache keys.
+    return '{}:{}:{}'.format(CACHE_KEY_PREFIX, object_type, hashlib.md5(handle.encode()).hexdigest())
+
+
+class RegistryObjectCache(CorbaClientLayer):
+    """Layer which caches registry objects loaded by their handles in the Django cache.
+
+    Objects are cached for the time defined for their type in `WEBWHOIS_OBJECT_CACHE_TIMEOUTS`.
+    `OBJECT_NOT_FOUND` results are cached for `WEBWHOIS_OBJECT_CACHE_NOT_FOUND_TIMEOUT`.
+    Objects are stored in the compact form produced by `webwhois.utils.serialization.pack`.
+
+    Only a single thread across all processes loads an object from the backend at a time, others wait for its result.
+    Expired objects are kept in the cache for `WEBWHOIS_OBJECT_CACHE_STALE_TIMEOUT` and served, while the object
+    is reloaded by another thread.
+    """
+
+    @property
+    def cache(self):
+        return caches[WEBWHOIS_SETTINGS.OBJECT_CACHE_ALIAS]
+
+    def handles(self, method_name):
+        return CACHED_METHODS.get(method_name) in WEBWHOIS_SETTINGS.OBJECT_CACHE_TIMEOUTS
+
+    def call(self, method_name, function, handle):
+        object_type = CACHED_METHODS[method_name]
+        cache_key = get_cache_key(object_type, handle)
+        entry = self.cache.get(cache_key)
+        if entry is not None and self.is_fresh(entry):
+            return self.decode_entry(entry)
+
+        if self.acquire_lock(cache_key):
+            try:
+                return self.store(cache_key, object_type, function, handle)
+            finally:
+                self.release_lock(cache_key)
+
+        # Object is being loaded by another thread.
+        if entry is not None:
+            # Serve the stale object.
+            return self.decode_entry(entry)
+        entry = self.wait_for_entry(cache_key)
+        if entry is not None:
+            return self.decode_entry(entry)
+        # The other thread didn't finish in time.
+        return self.store(cache_key, object_type, function, handle)
+
+    @staticmethod
+    def is_fresh(entry) -> bool:
+        """Return whether the cache entry is fresh."""
+        fresh_until = entry[1]
+        return fresh_until is None or fresh_until > time.time()
+
+    def decode_entry(self, entry):
+        """Return the object from the cache entry or raise `OBJECT_NOT_FOUND`."""
+        if entry[0] == _NOT_FOUND:
+            raise OBJECT_NOT_FOUND()
+        return unpack(entry[2])
+
+    def acquire_lock(self, cache_key: str) -> bool:
+        """Acquire the lock for loading the object. Return whether the lock was acquired."""
+        return self.cache.add(cache_key + ':lock', True, WEBWHOIS_SETTINGS.OBJECT_CACHE_LOCK_TIMEOUT)
+
+    def release_lock(self, cache_key: str) -> None:
+        """Release the lock for loading the object."""
+        self.cache.delete(cache_key + ':lock')
+
+    def wait_for_entry(self, cache_key: str):
+        """Wait for a fresh cache entry loaded by another thread. Return `None` if it isn't loaded in time."""
+        deadline = time.time() + WEBWHOIS_SETTINGS.OBJECT_CACHE_LOCK_WAIT
+        while time.time() < deadline:
+            time.sleep(_POLL_INTERVAL)
+            entry = self.cache.get(cache_key)
+            if entry is not None and self.is_fresh(entry):
+                return entry
+        return None
+
+    def store(self, cache_key, object_type, function, handle):
+        """Load the object from the backend and store it in the cache."""
+        try:
+            result = function(handle)
+        except OBJECT_NOT_FOUND:
+            if WEBWHOIS_SETTINGS.OBJECT_CACHE_NOT_FOUND_TIMEOUT:
+                self.cache.set(cache_key, (_NOT_FOUND, None), WEBWHOIS_SETTINGS.OBJECT_CACHE_NOT_FOUND_TIMEOUT)
+            raise
+        timeout = WEBWHOIS_SETTINGS.OBJECT_CACHE_TIMEOUTS[object_type]
+        self.cache.set(cache_key, (_FOUND, time.time() + timeout, pack(result)),
+                       timeout + WEBWHOIS_SETTINGS.OBJECT_CACHE_STALE_TIMEOUT)
+        return result
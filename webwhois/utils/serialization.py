@@ -0,0 +1,83 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compact serialization of decoded CORBA structures.
+
+Decoded structures are packed into trees of tuples, lists and primitive values. Structures are stored as tuples
+of their values without member names and identified by their repository IDs, so the packed data are smaller
+and faster to pickle than the original structures.
+
+Packed nodes are tuples which start with a tag:
+
+ * ``('s', repository_id, values)`` - a structure,
+ * ``('u', repository_id, discriminator, value)`` - a union,
+ * ``('e', repository_id, index)`` - an enum item,
+ * ``('t', values)`` - a tuple.
+"""
+import inspect
+from typing import Any, Dict, Tuple, Type
+
+import omniORB
+
+_STRUCT = 's'
+_UNION = 'u'
+_ENUM = 'e'
+_TUPLE = 't'
+
+_MEMBERS = {}  # type: Dict[Type, Tuple[str, ...]]
+
+
+def _get_members(cls: Type) -> Tuple[str, ...]:
+    """Return names of members of the structure in the order of the constructor arguments."""
+    if cls not in _MEMBERS:
+        _MEMBERS[cls] = tuple(inspect.getfullargspec(cls.__init__).args[1:])
+    return _MEMBERS[cls]
+
+
+def pack(value: Any) -> Any:
+    """Pack the decoded CORBA value."""
+    if isinstance(value, list):
+        return [pack(item) for item in value]
+    if isinstance(value, tuple):
+        return (_TUPLE, tuple(pack(item) for item in value))
+    if isinstance(value, omniORB.StructBase):
+        return (_STRUCT, value._NP_RepositoryId,
+                tuple(pack(getattr(value, name)) for name in _get_members(type(value))))
+    if isinstance(value, omniORB.Union):
+        return (_UNION, value._NP_RepositoryId, pack(value._d), pack(value._v))
+    if isinstance(value, omniORB.EnumItem):
+        return (_ENUM, value._parent_id, value._v)
+    return value
+
+
+def unpack(data: Any) -> Any:
+    """Unpack the value packed by `pack`."""
+    if isinstance(data, list):
+        return [unpack(item) for item in data]
+    if isinstance(data, tuple):
+        tag = data[0]
+        if tag == _TUPLE:
+            return tuple(unpack(item) for item in data[1])
+        if tag == _STRUCT:
+            return omniORB.findType(data[1])[1](*(unpack(item) for item in data[2]))
+        if tag == _UNION:
+            return omniORB.findType(data[1])[1](unpack(data[2]), unpack(data[3]))
+        if tag == _ENUM:
+            return omniORB.findType(data[1])[3][data[2]]
+        raise ValueError("Unknown packed node {!r}.".format(tag))
+    return data
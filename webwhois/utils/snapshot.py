@@ -0,0 +1,128 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Process-wide snapshots of data loaded from the backend."""
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+
+class PeriodicSnapshot(object):
+    """Snapshot of data loaded from the backend, which is shared by all threads of the process.
+
+    Data are loaded on first use and refreshed in a background thread, once they are older than the refresh interval.
+    Readers are served the current data while the refresh runs, so they never wait for the backend
+    except for the first use. Data are never refreshed in background, if the interval isn't positive.
+    The first use loads the data only in a single thread, other threads wait for it at most `load_timeout` seconds
+    and then load the data themselves.
+    Subclasses define `load` and `get_interval` methods.
+    """
+
+    # Maximal time in seconds to wait for the first load made by another thread.
+    load_timeout = 10.0
+
+    def __init__(self):
+        self._data = None  # type: Any
+        self._loaded = None  # type: Optional[float]
+        self._loading = None  # type: Optional[threading.Event]
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get_interval(self) -> float:
+        """Return the refresh interval in seconds."""
+        raise NotImplementedError
+
+    def load(self, initial: bool) -> Any:
+        """Load the data. Data should be immutable, they are shared by threads.
+
+        @param initial: Whether the data are loaded for the first time in this process.
+        """
+        raise NotImplementedError
+
+    def get(self) -> Any:
+        """Return the data, load them if they are not loaded yet."""
+        with self._lock:
+            if self._loaded is None:
+                loading = self._loading
+                owner = loading is None
+                if owner:
+                    loading = self._loading = threading.Event()
+            else:
+                loading = None
+                data = self._data
+                interval = self.get_interval()
+                start_refresh = not self._refreshing and interval > 0 and time.monotonic() - self._loaded >= interval
+                if start_refresh:
+                    self._refreshing = True
+        if loading is not None:
+            return self._load_initial(loading, owner)
+        if start_refresh:
+            thread = threading.Thread(target=self._refresh, name='{}-refresh'.format(type(self).__name__))
+            thread.daemon = True
+            thread.start()
+        return data
+
+    def _load_initial(self, loading: threading.Event, owner: bool) -> Any:
+        """Load the data for the first time, the backend is called without holding the lock."""
+        if not owner:
+            if loading.wait(self.load_timeout):
+                with self._lock:
+                    if self._loaded is not None:
+                        return self._data
+            # The first load failed or didn't finish in time.
+        try:
+            data = self.load(True)
+            with self._lock:
+                self._store(data)
+            return data
+        finally:
+            if owner:
+                with self._lock:
+                    self._loading = None
+                loading.set()
+
+    def refresh(self) -> None:
+        """Reload the data."""
+        data = self.load(False)
+        with self._lock:
+            self._store(data)
+
+    def clear(self) -> None:
+        """Drop the loaded data, they are loaded again on next use."""
+        with self._lock:
+            self._data = None
+            self._loaded = None
+
+    def _store(self, data: Any) -> None:
+        self._data = data
+        self._loaded = time.monotonic()
+
+    def _refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            # Keep the current data, refresh is retried after the next interval.
+            WEBWHOIS_LOGGING.exception('Refresh of %s failed.', type(self).__name__)
+            with self._lock:
+                self._loaded = time.monotonic()
+        finally:
+            with self._lock:
+                self._refreshing = False
@@ -0,0 +1,85 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Preloaded descriptions of registry object statuses."""
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .corba_wrapper import WHOIS
+from .snapshot import PeriodicSnapshot
+
+# WHOIS methods which return status descriptions of object types.
+STATUS_DESCRIPTION_METHODS = {
+    'contact': 'get_contact_status_descriptions',
+    'domain': 'get_domain_status_descriptions',
+    'keyset': 'get_keyset_status_descriptions',
+    'nsset': 'get_nsset_status_descriptions',
+}
+
+
+def get_cache_key(lang: str, type_name: str) -> str:
+    """Return key of status descriptions in the Django cache."""
+    return "webwhois_descr_%s_%s" % (lang, type_name)
+
+
+def load_status_descriptions(type_name: str, lang: str, use_cache: bool = True) -> Dict[str, str]:
+    """Load status descriptions from the Django cache or the backend and store them in the Django cache.
+
+    @param use_cache: Whether descriptions may be read from the Django cache.
+    """
+    cache_key = get_cache_key(lang, type_name)
+    descriptions = cache.get(cache_key) if use_cache else None
+    if descriptions is None:
+        descriptions = {desc.handle: desc.name
+                        for desc in getattr(WHOIS, STATUS_DESCRIPTION_METHODS[type_name])(lang)}
+        cache.set(cache_key, descriptions)
+    return descriptions
+
+
+class StatusDescriptions(PeriodicSnapshot):
+    """Status descriptions of all object types in all languages from `LANGUAGES` setting.
+
+    Descriptions are read from the Django cache when loaded for the first time, so new processes don't load them
+    from the backend. Refreshes always load descriptions from the backend and update the Django cache.
+    """
+
+    def get_interval(self):
+        return WEBWHOIS_SETTINGS.STATUS_DESCRIPTIONS_REFRESH
+
+    def load(self, initial):
+        table = {}  # type: Dict[Tuple[str, str], Mapping[str, str]]
+        for lang, _ in settings.LANGUAGES:
+            for type_name in STATUS_DESCRIPTION_METHODS:
+                table[(lang, type_name)] = MappingProxyType(load_status_descriptions(type_name, lang, initial))
+        return MappingProxyType(table)
+
+    def get_descriptions(self, type_name: str, lang: str) -> Mapping[str, str]:
+        """Return status descriptions of the object type in the language."""
+        descriptions = self.get().get((lang, type_name))
+        if descriptions is None:
+            # Language isn't defined in `LANGUAGES`.
+            descriptions = load_status_descriptions(type_name, lang)
+        return descriptions
+
+
+STATUS_DESCRIPTIONS = StatusDescriptions()
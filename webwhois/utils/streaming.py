@@ -0,0 +1,188 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Streaming of binary content."""
+import os
+import re
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Tuple, Union
+
+from django.http import HttpResponse, StreamingHttpResponse
+
+# Size of blocks of streamed content.
+BLOCK_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a HTTP Range header and return the first and the last byte of the range.
+
+    Only single ranges are supported. Return `None` if the header isn't supported and the whole content
+    should be returned.
+
+    @raise ValueError: If the range can't be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        # Suffix range, i.e. the last bytes.
+        if not int(end) or not size:
+            raise ValueError("Range {!r} can't be satisfied.".format(header))
+        return max(size - int(end), 0), size - 1
+    if end and int(end) < int(start):
+        return None
+    if int(start) >= size:
+        raise ValueError("Range {!r} can't be satisfied.".format(header))
+    return int(start), min(int(end), size - 1) if end else size - 1
+
+
+def iter_blocks(content: memoryview, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the content in blocks, so only a single block is copied at a time."""
+    for offset in range(0, len(content), block_size):
+        yield bytes(content[offset:offset + block_size])
+
+
+class FileDownloadIterator(object):
+    """Iterator over content of a `ccReg.FileDownload` object, which downloads the file in blocks.
+
+    The download is finalized once the whole file is read, the download fails or the iterator is closed.
+    Streaming responses close their content, so the download is finalized even if the response isn't read whole.
+
+    @ivar file_download: The `ccReg.FileDownload` object.
+    @ivar remaining: Number of bytes left to download.
+    """
+
+    def __init__(self, file_download, size: int, block_size: int = BLOCK_SIZE):
+        self.file_download = file_download
+        self.remaining = size
+        self.block_size = block_size
+        self._finalized = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        if self._finalized or self.remaining <= 0:
+            self.close()
+            raise StopIteration
+        try:
+            block = self.file_download.download(min(self.block_size, self.remaining))
+        except Exception:
+            self.close()
+            raise
+        if not block:
+            self.close()
+            raise StopIteration
+        self.remaining -= len(block)
+        return block
+
+    def close(self) -> None:
+        """Finalize the download, if it wasn't finalized yet."""
+        if not self._finalized:
+            self._finalized = True
+            self.file_download.finalize_download()
+
+
+class FileRangeIterator(object):
+    """Iterator over a range of a file, which reads the file in blocks.
+
+    The file is closed once the range is read or the iterator is closed.
+
+    @ivar file: The file object.
+    @ivar remaining: Number of bytes left to read.
+    """
+
+    def __init__(self, file: BinaryIO, start: int, length: int, block_size: int = BLOCK_SIZE):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+        self.block_size = block_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        block = self.file.read(min(self.block_size, self.remaining)) if self.remaining > 0 else b''
+        if not block:
+            self.close()
+            raise StopIteration
+        self.remaining -= len(block)
+        return block
+
+    def close(self) -> None:
+        """Close the file."""
+        self.file.close()
+
+
+def get_range_response(request, size: int, get_content: Callable[[int, int], Iterable[bytes]],
+                       content_type: str) -> HttpResponse:
+    """Return a streaming response with the content, which supports single range requests.
+
+    Range requests with `If-Range` header are answered with the whole content, since the content has no validators.
+
+    @param size: Size of the whole content.
+    @param get_content: Callable which returns the content between the first and the last byte.
+    """
+    content_range = None
+    header = request.META.get('HTTP_RANGE')
+    if header and 'HTTP_IF_RANGE' not in request.META:
+        try:
+            content_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+
+    if content_range is None:
+        response = StreamingHttpResponse(get_content(0, size - 1), content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        start, end = content_range
+        response = StreamingHttpResponse(get_content(start, end), content_type=content_type, status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def get_buffer_response(request, content: Union[bytes, str], content_type: str) -> HttpResponse:
+    """Return a streaming response with the content, which supports single range requests.
+
+    The content isn't copied as a whole, it's streamed in blocks from the original buffer.
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    buffer = memoryview(content)
+    return get_range_response(request, len(buffer), lambda start, end: iter_blocks(buffer[start:end + 1]),
+                              content_type)
+
+
+def get_file_range_response(request, file: BinaryIO, content_type: str) -> HttpResponse:
+    """Return a streaming response with the content of the file, which supports single range requests.
+
+    The file is closed once the response is closed.
+    """
+    size = os.fstat(file.fileno()).st_size
+    response = get_range_response(request, size, lambda start, end: FileRangeIterator(file, start, end - start + 1),
+                                  content_type)
+    if response.status_code == 416:
+        file.close()
+    return response
@@ -32,10 +32,16 @@ from .record_statement import ServeRecordStatementView
 from .registrar import DownloadEvalFileView, RegistrarDetailMixin, RegistrarDetailView, RegistrarListMixin, \
     RegistrarListView
 from .resolve_handle_type import ResolveHandleTypeMixin, ResolveHandleTypeView
+from .api import BulkJsonView, ContactJsonView, DomainJsonView, KeysetJsonView, NssetJsonView, RegistrarJsonView, \
+    RegistryObjectJsonMixin
+from .bulk_lookup import BulkLookupView
+from .metrics import MetricsView
 
-__all__ = ['BlockObjectFormView', 'ContactDetailMixin', 'ContactDetailView', 'CustomEmailView', 'DomainDetailMixin',
-           'DomainDetailView', 'DownloadEvalFileView', 'EmailInRegistryView', 'KeysetDetailMixin', 'KeysetDetailView',
-           'NotarizedLetterView', 'NssetDetailMixin', 'NssetDetailView', 'PersonalInfoFormView',
-           'PublicResponseNotFoundView', 'RegistrarDetailMixin', 'RegistrarDetailView', 'RegistrarListMixin',
-           'RegistrarListView', 'ResolveHandleTypeMixin', 'ResolveHandleTypeView', 'SendPasswordFormView',
-           'ServeNotarizedLetterView', 'ServeRecordStatementView', 'UnblockObjectFormView', 'WhoisFormView']
+__all__ = ['BlockObjectFormView', 'BulkJsonView', 'BulkLookupView', 'ContactDetailMixin', 'ContactDetailView',
+           'ContactJsonView', 'CustomEmailView', 'DomainDetailMixin', 'DomainDetailView', 'DomainJsonView',
+           'DownloadEvalFileView', 'EmailInRegistryView', 'KeysetDetailMixin', 'KeysetDetailView', 'KeysetJsonView',
+           'MetricsView', 'NotarizedLetterView', 'NssetDetailMixin', 'NssetDetailView', 'NssetJsonView',
+           'PersonalInfoFormView', 'PublicResponseNotFoundView', 'RegistrarDetailMixin', 'RegistrarDetailView',
+           'RegistrarJsonView', 'RegistrarListMixin', 'RegistrarListView', 'RegistryObjectJsonMixin',
+           'ResolveHandleTypeMixin', 'ResolveHandleTypeView', 'SendPasswordFormView', 'ServeNotarizedLetterView',
+           'ServeRecordStatementView', 'UnblockObjectFormView', 'WhoisFormView']
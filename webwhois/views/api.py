@@ -0,0 +1,161 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Views with registry objects in JSON."""
+import hashlib
+import logging
+from typing import Any, Dict, Tuple
+
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.views.decorators.gzip import gzip_page
+from django.views.generic import View
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.concurrency import call_all
+from webwhois.utils.conditional import get_validated_response
+from webwhois.utils.json_encoder import encode
+
+from .base import BaseContextMixin, RegistryObjectMixin
+from .detail_contact import ContactDetailMixin
+from .detail_domain import DomainDetailMixin
+from .detail_keyset import KeysetDetailMixin
+from .detail_nsset import NssetDetailMixin
+from .registrar import RegistrarDetailMixin
+
+JSON_DUMPS_PARAMS = {'separators': (',', ':'), 'ensure_ascii': False}
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+
+class RegistryObjectJsonMixin(RegistryObjectMixin):
+    """Mixin which returns the registry object in JSON.
+
+    Objects are loaded by the detail mixin of the object type. Responses contain ETag header
+    and are compressed, if the client accepts it.
+    """
+
+    # Codes of server exceptions caused by an invalid handle.
+    invalid_handle_codes = ("INVALID_HANDLE", "IDNAError", "INVALID_LABEL", "TOO_MANY_LABELS")
+
+    @method_decorator(gzip_page)
+    def dispatch(self, request, *args, **kwargs):
+        return super(RegistryObjectJsonMixin, self).dispatch(request, *args, **kwargs)
+
+    def get_object_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return data of the registry object for the JSON response.
+
+        @param data: Data of the registry object from the context, i.e. its detail and related objects.
+        """
+        return {key: value for key, value in data.items() if key != "label"}
+
+    def get_json_data(self) -> Tuple[int, Dict[str, Any]]:
+        """Load the registry object and return HTTP status and data of the response."""
+        context = self._get_registry_objects()
+        result = {"type": self.object_type_name, "handle": self.kwargs["handle"]}  # type: Dict[str, Any]
+        data = context[self._registry_objects_key].get(self.object_type_name)
+        if data is not None:
+            result["data"] = encode(self.get_object_data(data))
+            return 200, result
+
+        if context.get("object_delete_candidate"):
+            result["error"] = "OBJECT_DELETE_CANDIDATE"
+        else:
+            result["error"] = context.get("server_exception", {}).get("code", "OBJECT_NOT_FOUND")
+        if result["error"] in self.invalid_handle_codes:
+            return 400, result
+        if result["error"] == "SERVICE_UNAVAILABLE":
+            return 503, result
+        return 404, result
+
+    def get(self, request, *args, **kwargs):
+        status, data = self.get_json_data()
+        response = JsonResponse(data, status=status, json_dumps_params=JSON_DUMPS_PARAMS)
+        if status != 200:
+            return response
+        etag = quote_etag(hashlib.sha1(response.content).hexdigest())
+        return get_validated_response(request, response, etag)
+
+
+class ContactJsonView(RegistryObjectJsonMixin, ContactDetailMixin, View):
+    """View with a contact in JSON."""
+
+    def get_object_data(self, data):
+        data = super(ContactJsonView, self).get_object_data(data)
+        # Birthday is derived from the identification.
+        if not data["detail"].identification.disclose:
+            data.pop("birthday", None)
+        if "verification_status" in data:
+            data["verification_status"] = [{"code": status["code"], "label": status["label"]}
+                                           for status in data["verification_status"]]
+        return data
+
+
+class DomainJsonView(RegistryObjectJsonMixin, DomainDetailMixin, View):
+    """View with a domain in JSON."""
+
+
+class KeysetJsonView(RegistryObjectJsonMixin, KeysetDetailMixin, View):
+    """View with a keyset in JSON."""
+
+
+class NssetJsonView(RegistryObjectJsonMixin, NssetDetailMixin, View):
+    """View with a nsset in JSON."""
+
+
+class RegistrarJsonView(RegistryObjectJsonMixin, RegistrarDetailMixin, View):
+    """View with a registrar in JSON."""
+
+
+class BulkJsonView(BaseContextMixin, View):
+    """View with multiple registry objects in JSON.
+
+    Handles are passed in query parameters named by object types, e.g. ``?domain=example.cz&contact=CID``.
+    At most `WEBWHOIS_API_BULK_LIMIT` objects may be requested at once.
+    Objects are loaded concurrently, if `WEBWHOIS_CONCURRENT_LOOKUP` is enabled.
+    Failed lookups are returned with `INTERNAL_SERVER_ERROR` error, they don't fail lookups of the other objects.
+    """
+
+    views = {
+        "contact": ContactJsonView,
+        "domain": DomainJsonView,
+        "keyset": KeysetJsonView,
+        "nsset": NssetJsonView,
+        "registrar": RegistrarJsonView,
+    }
+
+    @method_decorator(gzip_page)
+    def dispatch(self, request, *args, **kwargs):
+        return super(BulkJsonView, self).dispatch(request, *args, **kwargs)
+
+    def _get_result(self, object_type: str, handle: str) -> Dict[str, Any]:
+        view = self.views[object_type](request=self.request, args=(), kwargs={"handle": handle})
+        try:
+            return view.get_json_data()[1]
+        except Exception:
+            WEBWHOIS_LOGGING.exception('Lookup of %s %s failed.', object_type, handle)
+            return {"type": object_type, "handle": handle, "error": "INTERNAL_SERVER_ERROR"}
+
+    def get(self, request, *args, **kwargs):
+        keys = [(object_type, handle) for object_type in sorted(self.views)
+                for handle in request.GET.getlist(object_type)]
+        if len(keys) > WEBWHOIS_SETTINGS.API_BULK_LIMIT:
+            return JsonResponse({"error": "TOO_MANY_HANDLES", "limit": WEBWHOIS_SETTINGS.API_BULK_LIMIT}, status=400)
+        results = call_all((self._get_result, key) for key in keys)
+        return JsonResponse({"results": results}, json_dumps_params=JSON_DUMPS_PARAMS)
@@ -15,9 +15,14 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+import time
+from functools import partial
 from typing import Any, Dict
 
+from django.conf import settings
 from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse, TemplateResponse
 from django.utils.functional import lazy
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
@@ -25,21 +30,72 @@ from django.utils.translation import get_language, ugettext_lazy as _
 from django.views.generic.base import ContextMixin
 
 from webwhois.constants import STATUS_DELETE_CANDIDATE
+from webwhois.settings import WEBWHOIS_SETTINGS
 from webwhois.utils import LOGGER
+from webwhois.utils.conditional import get_etag, get_validated_response
+from webwhois.utils.corba_wrapper import WHOIS_MEMO
+from webwhois.utils.layers import CircuitOpen
+from webwhois.utils.page_cache import get_page_cache, get_page_cache_key
+from webwhois.utils.profiling import PROFILER, RequestProfile
+from webwhois.utils.status_descriptions import STATUS_DESCRIPTIONS, get_cache_key
 
 mark_safe_lazy = lazy(mark_safe, str)
 
 
+class ProfiledTemplateResponse(TemplateResponse):
+    """Template response which records the time of rendering into the request profile.
+
+    @ivar profile: Profile of the request.
+    """
+
+    profile = None
+
+    @property
+    def rendered_content(self):
+        if not WEBWHOIS_SETTINGS.PROFILING:
+            return super(ProfiledTemplateResponse, self).rendered_content
+        start = time.perf_counter()
+        try:
+            return super(ProfiledTemplateResponse, self).rendered_content
+        finally:
+            PROFILER.record_template(self.profile, time.perf_counter() - start)
+
+
+def _set_server_timing(response, profile: RequestProfile) -> None:
+    response['Server-Timing'] = profile.get_server_timing()
+
+
 class BaseContextMixin(ContextMixin):
     """Base mixin for webwhois views.
 
+    If `WEBWHOIS_PROFILING` is enabled, responses contain `Server-Timing` header with the backend and template times.
+
     @cvar base_template: Path to base template.
     """
 
     base_template = "base_site_example.html"
+    response_class = ProfiledTemplateResponse
+
+    def dispatch(self, request, *args, **kwargs):
+        # Backend calls made while handling the request share the memo.
+        with WHOIS_MEMO.scope():
+            if not WEBWHOIS_SETTINGS.PROFILING:
+                return super(BaseContextMixin, self).dispatch(request, *args, **kwargs)
+            with PROFILER.scope() as profile:
+                response = super(BaseContextMixin, self).dispatch(request, *args, **kwargs)
+
+        if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+            # Templates are rendered after the view returns the response.
+            response.profile = profile
+            response.add_post_render_callback(partial(_set_server_timing, profile=profile))
+        else:
+            _set_server_timing(response, profile)
+        return response
 
     def get_context_data(self, **kwargs):
         kwargs.setdefault("base_template", self.base_template)
+        if settings.DEBUG and WEBWHOIS_SETTINGS.PROFILING:
+            kwargs.setdefault("webwhois_profile", PROFILER.current_profile)
         return super(BaseContextMixin, self).get_context_data(**kwargs)
 
     def render_to_response(self, context, **response_kwargs):
@@ -53,6 +109,9 @@ class RegistryObjectMixin(BaseContextMixin):
     It is rasied standard HTTP 500 "Server Error" page when Corba backend falied.
     Catch omniORB.CORBA.TRANSIENT and omniORB.CORBA.OBJECT_NOT_EXIST
     and redirect to your own customized page if you need.
+    If the circuit breaker of the backend is open, the server exception page is rendered.
+    If `WEBWHOIS_CONDITIONAL_GET` is enabled, pages of registry objects contain ETag header
+    and conditional requests are answered without rendering the template.
     """
 
     _registry_objects_key = "registry_objects"
@@ -66,11 +125,14 @@ class RegistryObjectMixin(BaseContextMixin):
         """Get status descritions from the cache. Load them from a backend and put in the cache if they missing there.
 
         Load status only for a defined object type and current site language.
+        If `WEBWHOIS_STATUS_DESCRIPTIONS_REFRESH` is set, descriptions are taken from the preloaded table.
         """
         lang = get_language()
-        cache_key = "webwhois_descr_%s_%s" % (lang, type_name)
+        if WEBWHOIS_SETTINGS.STATUS_DESCRIPTIONS_REFRESH:
+            return STATUS_DESCRIPTIONS.get_descriptions(type_name, lang)
+        cache_key = get_cache_key(lang, type_name)
         descripts = cache.get(cache_key)
-        if not descripts:
+        if descripts is None:
             descripts = {object_status_desc.handle: object_status_desc.name
                          for object_status_desc in fnc_get_descriptions(lang)}
             cache.set(cache_key, descripts)
@@ -89,6 +151,14 @@ class RegistryObjectMixin(BaseContextMixin):
             "message": cls.message_with_handle_in_html(_("%s is not a valid handle."), handle),
         }
 
+    @staticmethod
+    def message_service_unavailable():
+        return {
+            "code": "SERVICE_UNAVAILABLE",
+            "title": _("Service unavailable"),
+            "message": _("The registry is temporarily unavailable. Please try again later."),
+        }
+
     @classmethod
     def load_registry_object(cls, context, handle):
         """Load registry object of the handle and append it into the context."""
@@ -135,13 +205,20 @@ class RegistryObjectMixin(BaseContextMixin):
             exception_name = None
             try:
                 self.load_registry_object(context, self.kwargs["handle"])
+            except CircuitOpen as err:
+                exception_name = err.__class__.__name__
+                context["server_exception"] = self.message_service_unavailable()
             except BaseException as err:
                 exception_name = err.__class__.__name__
                 raise
             finally:
                 self.finish_logging_request(log_request, context, exception_name)
-            if len(context[self._registry_objects_key]) == 1:
-                self.load_related_objects(context)
+            # Related objects are loaded even if a server exception was set by a lookup of an object of another type.
+            if len(context[self._registry_objects_key]) == 1 and exception_name is None:
+                try:
+                    self.load_related_objects(context)
+                except CircuitOpen:
+                    context["server_exception"] = self.message_service_unavailable()
             self._registry_objects_cache = context
         return self._registry_objects_cache
 
@@ -155,10 +232,68 @@ class RegistryObjectMixin(BaseContextMixin):
             if obj is not None:
                 # Registrars don't have statuses
                 kwargs['object_delete_candidate'] = STATUS_DELETE_CANDIDATE in getattr(obj['detail'], 'statuses', ())
+                if WEBWHOIS_SETTINGS.CONDITIONAL_GET and "server_exception" not in objects:
+                    kwargs["etag"] = get_etag(objects[self._registry_objects_key], self.object_type_name,
+                                              get_language(), self.base_template)
         return super(RegistryObjectMixin, self).get_context_data(**kwargs)
 
+    def get(self, request, *args, **kwargs):
+        response = super(RegistryObjectMixin, self).get(request, *args, **kwargs)
+        context = getattr(response, "context_data", None) or {}
+        if context.get("etag") is None:
+            return response
+        # The template response isn't rendered yet, so it's not rendered at all if the page wasn't modified.
+        return get_validated_response(request, response, context["etag"])
+
     def get_template_names(self):
         context = self._get_registry_objects()
         if "server_exception" in context:
             return [self.server_exception_template]
         return super(RegistryObjectMixin, self).get_template_names()
+
+
+class PageCacheMixin(RegistryObjectMixin):
+    """Mixin which caches rendered pages of registry objects.
+
+    Pages are cached for the time defined for the object type in `WEBWHOIS_PAGE_CACHE_TIMEOUTS`.
+    Pages with server exceptions and pages of delete candidates are cached for `WEBWHOIS_PAGE_CACHE_SHORT_TIMEOUT`.
+    Pages with unavailable services and pages with the debug profile of the request are not cached.
+    Requests served from the cache are logged as well.
+    """
+
+    def get(self, request, *args, **kwargs):
+        timeout = WEBWHOIS_SETTINGS.PAGE_CACHE_TIMEOUTS.get(self.object_type_name)
+        if not timeout:
+            return super(PageCacheMixin, self).get(request, *args, **kwargs)
+
+        cache_key = get_page_cache_key(self.object_type_name, kwargs["handle"], get_language(), self.base_template)
+        entry = get_page_cache().get(cache_key)
+        if entry is not None:
+            content, content_type, log_context, etag = entry
+            self.finish_logging_request(self.prepare_logging_request(), log_context)
+            response = HttpResponse(content, content_type=content_type)
+            if etag is None:
+                return response
+            return get_validated_response(request, response, etag)
+
+        response = super(PageCacheMixin, self).get(request, *args, **kwargs)
+        # Responses to conditional requests aren't rendered.
+        if isinstance(response, SimpleTemplateResponse):
+            response.add_post_render_callback(partial(self._store_page, cache_key, timeout))
+        return response
+
+    def _store_page(self, cache_key, timeout, response):
+        context = response.context_data
+        if "server_exception" in context or context.get("object_delete_candidate"):
+            timeout = WEBWHOIS_SETTINGS.PAGE_CACHE_SHORT_TIMEOUT
+        # Don't cache pages with CSRF tokens.
+        if not timeout or response.status_code != 200 or self.request.META.get("CSRF_COOKIE_USED"):
+            return
+        if context.get("webwhois_profile") or context.get("server_exception", {}).get("code") == "SERVICE_UNAVAILABLE":
+            return
+        # Keep only data required to log the request.
+        log_context = {self._registry_objects_key: dict.fromkeys(context[self._registry_objects_key])}
+        if "server_exception" in context:
+            log_context["server_exception"] = {"code": context["server_exception"].get("code")}
+        entry = (response.content, response["Content-Type"], log_context, context.get("etag"))
+        get_page_cache().set(cache_key, entry, timeout)
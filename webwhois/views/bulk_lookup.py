@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""View which looks up many handles at once."""
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import translation
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import View
+
+from webwhois.forms import BulkLookupForm
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.concurrency import call_as_completed
+from webwhois.utils.corba_wrapper import WHOIS_MEMO
+from webwhois.utils.quota import consume_quota
+
+from .resolve_handle_type import ResolveHandleTypeView
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BulkLookupView(View):
+    """View which looks up many handles at once and streams the results as each lookup finishes.
+
+    Handles are posted in `handles` field or uploaded in `handles_file`, separated by whitespaces.
+    Each handle is looked up in all object types as by `ResolveHandleTypeView`. Results are streamed
+    in NDJSON or CSV format in the order in which the lookups finished.
+    Number of handles looked up by a client is limited by `WEBWHOIS_BULK_LOOKUP_QUOTA`.
+    Results are streamed after the view returned, so the lookups re-enter the memo scope and language of the request.
+    """
+
+    http_method_names = ['post']
+    form_class = BulkLookupForm
+    lookup_view_class = ResolveHandleTypeView
+    csv_header = ('handle', 'types', 'error')
+
+    def get_client(self) -> str:
+        """Return identifier of the client for the quotas."""
+        return self.request.META.get('REMOTE_ADDR', '')
+
+    def lookup(self, handle: str) -> Dict[str, Any]:
+        """Look up the handle and return the result."""
+        view = self.lookup_view_class(request=self.request, args=(), kwargs={"handle": handle})
+        result = {"handle": handle, "types": []}  # type: Dict[str, Any]
+        try:
+            context = view._get_registry_objects()
+        except Exception:
+            WEBWHOIS_LOGGING.exception('Lookup of handle %r failed.', handle)
+            result["error"] = "INTERNAL_SERVER_ERROR"
+            return result
+        result["types"] = sorted(context[view._registry_objects_key])
+        if not result["types"]:
+            result["error"] = context.get("server_exception", {}).get("code", "OBJECT_NOT_FOUND")
+        return result
+
+    def iter_results(self, handles: List[str]) -> Iterator[Dict[str, Any]]:
+        """Look up the handles and yield the results as the lookups finish."""
+        calls = ((self.lookup, (handle, )) for handle in handles)
+        for _, result in call_as_completed(calls, WEBWHOIS_SETTINGS.BULK_LOOKUP_WORKERS):
+            yield result
+
+    def iter_in_request(self, iterable: Iterable[str], language: Optional[str]) -> Iterator[str]:
+        """Yield the items with the memo scope and the language of the request active while each of them is created.
+
+        State is not left active between the items, because the server may use the thread in the meantime.
+        """
+        iterator = iter(iterable)
+        while True:
+            with WHOIS_MEMO.activate(self._memo_scope), translation.override(language, deactivate=True):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def iter_ndjson(self, handles: List[str]) -> Iterator[str]:
+        for result in self.iter_results(handles):
+            yield json.dumps(result, separators=(',', ':'), ensure_ascii=False) + '\n'
+
+    def iter_csv(self, handles: List[str]) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.csv_header)
+        for result in self.iter_results(handles):
+            writer.writerow((result["handle"], " ".join(result["types"]), result.get("error", "")))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def dispatch(self, request, *args, **kwargs):
+        # Lookups made while handling the request and streaming the results share the memo.
+        with WHOIS_MEMO.scope() as self._memo_scope:
+            return super().dispatch(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        form = self.form_class(request.POST, request.FILES)
+        if not form.is_valid():
+            return JsonResponse({"errors": {field: list(errors) for field, errors in form.errors.items()}},
+                                status=400)
+        handles = form.cleaned_data["handles"]
+
+        if WEBWHOIS_SETTINGS.BULK_LOOKUP_QUOTA:
+            retry_after = consume_quota('bulk_lookup', self.get_client(), len(handles),
+                                        WEBWHOIS_SETTINGS.BULK_LOOKUP_QUOTA, WEBWHOIS_SETTINGS.BULK_LOOKUP_QUOTA_PERIOD)
+            if retry_after is not None:
+                response = JsonResponse({"errors": {"__all__": ["QUOTA_EXCEEDED"]}}, status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
+
+        language = translation.get_language()
+        if form.cleaned_data["format"] == BulkLookupForm.FORMAT_CSV:
+            return StreamingHttpResponse(self.iter_in_request(self.iter_csv(handles), language),
+                                         content_type='text/csv; charset=utf-8')
+        return StreamingHttpResponse(self.iter_in_request(self.iter_ndjson(handles), language),
+                                     content_type='application/x-ndjson')
@@ -24,7 +24,7 @@ from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_NOT_FOUND
 from webwhois.constants import STATUS_CONDITIONALLY_IDENTIFIED, STATUS_IDENTIFIED, STATUS_LINKED, STATUS_VALIDATED, \
     STATUS_VERIFICATION_FAILED, STATUS_VERIFICATION_IN_PROCESS, STATUS_VERIFICATION_PASSED
 from webwhois.utils import WHOIS
-from webwhois.views.base import RegistryObjectMixin
+from webwhois.views.base import PageCacheMixin, RegistryObjectMixin
 
 
 class ContactDetailMixin(RegistryObjectMixin):
@@ -88,5 +88,5 @@ class ContactDetailMixin(RegistryObjectMixin):
             data["sponsoring_registrar"] = WHOIS.get_registrar_by_handle(registry_object.sponsoring_registrar_handle)
 
 
-class ContactDetailView(ContactDetailMixin, TemplateView):
+class ContactDetailView(PageCacheMixin, ContactDetailMixin, TemplateView):
     """View with details of a contact."""
@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 import re
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
 
 import idna
 from django.utils.translation import ugettext_lazy as _
@@ -24,9 +26,12 @@ from fred_idl.Registry.Whois import INVALID_LABEL, OBJECT_DELETE_CANDIDATE, OBJE
     UNMANAGED_ZONE
 
 from webwhois.constants import STATUS_DELETE_CANDIDATE
-from webwhois.utils import WHOIS
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils import WHOIS, idna_codec
+from webwhois.utils.concurrency import call_all
+from webwhois.utils.managed_zones import get_managed_zone_list, get_managed_zones
 from webwhois.views import KeysetDetailMixin, NssetDetailMixin
-from webwhois.views.base import RegistryObjectMixin
+from webwhois.views.base import PageCacheMixin, RegistryObjectMixin
 
 
 class DomainDetailMixin(RegistryObjectMixin):
@@ -52,12 +57,16 @@ class DomainDetailMixin(RegistryObjectMixin):
             return
 
         try:
-            idna_handle = idna.encode(handle).decode()
+            idna_handle = idna_codec.encode(handle)
         except idna.IDNAError:
             context["server_exception"] = cls.message_invalid_handle(handle, "IDNAError")
             return
 
+        managed_zones = get_managed_zones()
         try:
+            if managed_zones is not None:
+                # Names in unmanaged zones and names with too many labels are rejected without the backend.
+                managed_zones.check_domain(idna_handle)
             context[cls._registry_objects_key]["domain"] = {
                 "detail": WHOIS.get_domain_by_handle(idna_handle),
                 "label": _("Domain"),
@@ -71,7 +80,7 @@ class DomainDetailMixin(RegistryObjectMixin):
             context["server_exception"] = cls.make_message_not_found(handle)
             context["server_exception"]["handle_is_in_zone"] = True
         except UNMANAGED_ZONE:
-            context["managed_zone_list"] = WHOIS.get_managed_zone_list()
+            context["managed_zone_list"] = get_managed_zone_list()
             context["server_exception"] = {
                 "code": "UNMANAGED_ZONE",
                 "title": _("Unmanaged zone"),
@@ -87,9 +96,14 @@ class DomainDetailMixin(RegistryObjectMixin):
             # Caution! Domain name can have more than one fullstop character and it is still valid.
             # for example: '0.2.4.e164.arpa'
             # remove subdomain names: 'www.sub.domain.cz' -> 'domain.cz'
-            domain_match = re.search(r"([^.]+\.\w+)\.?$", handle, re.IGNORECASE)
-            assert domain_match is not None
-            context["example_domain_name"] = domain_match.group(1)
+            example_domain_name = None
+            if managed_zones is not None:
+                example_domain_name = managed_zones.get_registrable_name(handle, idna_handle)
+            if example_domain_name is None:
+                domain_match = re.search(r"([^.]+\.\w+)\.?$", handle, re.IGNORECASE)
+                assert domain_match is not None
+                example_domain_name = domain_match.group(1)
+            context["example_domain_name"] = example_domain_name
             context["server_exception"] = {
                 "code": "TOO_MANY_LABELS",
                 "title": _("Incorrect input"),
@@ -107,6 +121,9 @@ class DomainDetailMixin(RegistryObjectMixin):
         data["status_descriptions"] = [descriptions[key] for key in registry_object.statuses]
         if STATUS_DELETE_CANDIDATE in registry_object.statuses:
             return
+        if WEBWHOIS_SETTINGS.CONCURRENT_LOOKUP:
+            self._load_related_objects_concurrently(data)
+            return
         data.update({
             "registrant": WHOIS.get_contact_by_handle(registry_object.registrant_handle),
             "registrar": WHOIS.get_registrar_by_handle(registry_object.registrar_handle),
@@ -119,6 +136,58 @@ class DomainDetailMixin(RegistryObjectMixin):
             data["keyset"] = {"detail": WHOIS.get_keyset_by_handle(registry_object.keyset_handle)}
             KeysetDetailMixin.append_keyset_related(data["keyset"])
 
+    @staticmethod
+    def _load_objects(keys, loaded):
+        """Load registry objects concurrently and add them into the loaded objects.
+
+        @param keys: Pairs of WHOIS method name and handle. Duplicates and already loaded objects are skipped.
+        @param loaded: Dictionary of loaded objects by their keys.
+        """
+        keys = [key for key in OrderedDict.fromkeys(keys) if key not in loaded]
+        loaded.update(zip(keys, call_all((getattr(WHOIS, method), (handle, )) for method, handle in keys)))
+
+    def _load_related_objects_concurrently(self, data):
+        """Load objects related to the domain in two concurrent stages.
+
+        The first stage loads the objects referenced by the domain, the second stage loads the objects referenced
+        by the nsset and the keyset.
+        """
+        registry_object = data["detail"]
+        contact_handles = [registry_object.registrant_handle] + list(registry_object.admin_contact_handles)
+        keys = [("get_contact_by_handle", handle) for handle in contact_handles]
+        keys.append(("get_registrar_by_handle", registry_object.registrar_handle))
+        if registry_object.nsset_handle:
+            keys.append(("get_nsset_by_handle", registry_object.nsset_handle))
+        if registry_object.keyset_handle:
+            keys.append(("get_keyset_by_handle", registry_object.keyset_handle))
+        loaded = {}  # type: Dict[Tuple[str, str], Any]
+        self._load_objects(keys, loaded)
+
+        sets = []
+        if registry_object.nsset_handle:
+            sets.append(loaded[("get_nsset_by_handle", registry_object.nsset_handle)])
+        if registry_object.keyset_handle:
+            sets.append(loaded[("get_keyset_by_handle", registry_object.keyset_handle)])
+        keys = []
+        for set_object in sets:
+            keys.extend(("get_contact_by_handle", handle) for handle in set_object.tech_contact_handles)
+            keys.append(("get_registrar_by_handle", set_object.registrar_handle))
+        self._load_objects(keys, loaded)
+
+        contacts = {handle: obj for (method, handle), obj in loaded.items() if method == "get_contact_by_handle"}
+        registrars = {handle: obj for (method, handle), obj in loaded.items() if method == "get_registrar_by_handle"}
+        data.update({
+            "registrant": contacts[registry_object.registrant_handle],
+            "registrar": registrars[registry_object.registrar_handle],
+            "admins": [contacts[handle] for handle in registry_object.admin_contact_handles],
+        })
+        if registry_object.nsset_handle:
+            data["nsset"] = {"detail": loaded[("get_nsset_by_handle", registry_object.nsset_handle)]}
+            NssetDetailMixin.append_nsset_related(data["nsset"], contacts, registrars)
+        if registry_object.keyset_handle:
+            data["keyset"] = {"detail": loaded[("get_keyset_by_handle", registry_object.keyset_handle)]}
+            KeysetDetailMixin.append_keyset_related(data["keyset"], contacts, registrars)
+
 
-class DomainDetailView(DomainDetailMixin, TemplateView):
+class DomainDetailView(PageCacheMixin, DomainDetailMixin, TemplateView):
     """View with details of a domain."""
@@ -20,7 +20,7 @@ from django.views.generic import TemplateView
 from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_NOT_FOUND
 
 from webwhois.utils import WHOIS
-from webwhois.views.base import RegistryObjectMixin
+from webwhois.views.base import PageCacheMixin, RegistryObjectMixin
 
 
 class KeysetDetailMixin(RegistryObjectMixin):
@@ -29,13 +29,20 @@ class KeysetDetailMixin(RegistryObjectMixin):
     object_type_name = "keyset"
 
     @classmethod
-    def append_keyset_related(cls, data):
-        """Load objects related to the nsset and append them into the data context."""
+    def append_keyset_related(cls, data, contacts=None, registrars=None):
+        """Load objects related to the nsset and append them into the data context.
+
+        @param contacts: Already loaded contacts by their handles. Missing contacts are loaded from the backend.
+        @param registrars: Already loaded registrars by their handles. Missing registrars are loaded from the backend.
+        """
         descriptions = cls._get_status_descriptions("keyset", WHOIS.get_keyset_status_descriptions)
         registry_object = data["detail"]
+        contacts = contacts or {}
+        registrar = (registrars or {}).get(registry_object.registrar_handle)
         data.update({
-            "admins": [WHOIS.get_contact_by_handle(handle) for handle in registry_object.tech_contact_handles],
-            "registrar": WHOIS.get_registrar_by_handle(registry_object.registrar_handle),
+            "admins": [contacts.get(handle) or WHOIS.get_contact_by_handle(handle)
+                       for handle in registry_object.tech_contact_handles],
+            "registrar": registrar or WHOIS.get_registrar_by_handle(registry_object.registrar_handle),
             "status_descriptions": [descriptions[key] for key in registry_object.statuses],
         })
 
@@ -60,5 +67,5 @@ class KeysetDetailMixin(RegistryObjectMixin):
         self.append_keyset_related(context[self._registry_objects_key]["keyset"])
 
 
-class KeysetDetailView(KeysetDetailMixin, TemplateView):
+class KeysetDetailView(PageCacheMixin, KeysetDetailMixin, TemplateView):
     """View with details of a keyset."""
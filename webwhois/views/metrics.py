@@ -0,0 +1,50 @@
+#
+# Copyright (C) 2020  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Metrics of the application."""
+import ipaddress
+
+from django.http import Http404, HttpResponse
+from django.views.generic import View
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.handle_types import HANDLE_TYPE_CLASSIFIER
+from webwhois.utils.profiling import PROFILER
+
+
+class MetricsView(View):
+    """Aggregated metrics of profiled requests and of the handle type classifier in Prometheus text format.
+
+    Metrics are available only if `WEBWHOIS_PROFILING` is enabled and only to the clients
+    from `WEBWHOIS_METRICS_ALLOWED_IPS`.
+    """
+
+    def is_allowed(self, request) -> bool:
+        """Return whether the client may read the metrics."""
+        try:
+            address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+        except ValueError:
+            return False
+        return any(address in ipaddress.ip_network(network, strict=False)
+                   for network in WEBWHOIS_SETTINGS.METRICS_ALLOWED_IPS)
+
+    def get(self, request):
+        if not WEBWHOIS_SETTINGS.PROFILING or not self.is_allowed(request):
+            raise Http404
+        metrics = PROFILER.get_metrics() + HANDLE_TYPE_CLASSIFIER.get_metrics()
+        return HttpResponse(metrics, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -20,7 +20,7 @@ from typing import Any, Dict, Optional, Type
 
 from django.core.cache import cache
 from django.forms import Form
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse
 from django.utils.encoding import force_text
 from django.utils.formats import date_format
@@ -35,7 +35,9 @@ from webwhois.forms.public_request import CONFIRMATION_METHOD_IDL_MAP, LOCK_TYPE
     LOCK_TYPE_URL_PARAM, SEND_TO_CUSTOM, SEND_TO_IN_REGISTRY, ConfirmationMethod
 from webwhois.forms.widgets import DeliveryType
 from webwhois.utils.corba_wrapper import LOGGER, PUBLIC_REQUEST
-from webwhois.utils.public_response import BlockResponse, PersonalInfoResponse, SendPasswordResponse
+from webwhois.utils.public_response import BlockResponse, PersonalInfoResponse, SendPasswordResponse, \
+    decode_public_response
+from webwhois.utils.streaming import get_buffer_response
 from webwhois.views.base import BaseContextMixin
 from webwhois.views.public_request_mixin import PublicRequestFormView, PublicRequestKnownException, \
     PublicRequestLoggerMixin
@@ -325,7 +327,7 @@ class BaseResponseTemplateView(BaseContextMixin, TemplateView):
         # Cache the result for case the cache gets deleted while handling the request.
         if self._public_response is None:
             public_key = self.kwargs['public_key']
-            public_response = cache.get(public_key)
+            public_response = decode_public_response(cache.get(public_key))
             if public_response is None:
                 raise PublicResponseNotFound(public_key)
             self._public_response = public_response
@@ -624,7 +626,10 @@ class NotarizedLetterView(TextPasswordAndBlockMixin, BaseResponseTemplateView):
 
 
 class ServeNotarizedLetterView(PublicRequestLoggerMixin, View):
-    """Serve Notarized letter PDF view."""
+    """Serve Notarized letter PDF view.
+
+    PDF is streamed from the decoded buffer and the response supports range requests.
+    """
 
     def _get_logging_request_name_and_properties(self, data):
         properties = [
@@ -638,7 +643,7 @@ class ServeNotarizedLetterView(PublicRequestLoggerMixin, View):
         return 'NotarizedLetterPdf', properties
 
     def get(self, request, public_key):
-        public_response = cache.get(public_key)
+        public_response = decode_public_response(cache.get(public_key))
         if public_response is None:
             raise Http404
 
@@ -677,8 +682,7 @@ class ServeNotarizedLetterView(PublicRequestLoggerMixin, View):
         finally:
             self.finish_logging_request(log_request, public_response.public_request_id, error_object)
 
-        response = HttpResponse(content_type='application/pdf')
+        response = get_buffer_response(request, pdf_content, 'application/pdf')
         response['Content-Disposition'] = 'attachment; filename="notarized-letter-{0}.pdf"'.format(lang_code)
-        response.content = pdf_content
 
         return response
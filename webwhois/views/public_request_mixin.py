@@ -21,6 +21,7 @@ from django.views.generic import FormView
 from fred_idl.Registry.PublicRequest import ObjectType_PR
 
 from webwhois.utils.corba_wrapper import LOGGER
+from webwhois.utils.public_response import encode_public_response
 from webwhois.views.logger_mixin import LoggerMixin
 
 
@@ -99,7 +100,7 @@ class PublicRequestFormView(PublicRequestLoggerMixin, FormView):
         try:
             public_request_id = self._call_registry_command(form, log_request_id)
             public_response = self.get_public_response(form, public_request_id)
-            cache.set(self.public_key, public_response, 60 * 60 * 24)
+            cache.set(self.public_key, encode_public_response(public_response), 60 * 60 * 24)
         except BaseException as err:
             error = err
             raise
@@ -15,20 +15,38 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
-from typing import Any, Iterable, List, Tuple
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from django.http import Http404, HttpResponse
+from django.http import Http404
 from django.views.generic import View
 from fred_idl.Registry.RecordStatement import OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND
 
+from webwhois.utils.conditional import get_etag
 from webwhois.utils.corba_wrapper import LOGGER, RECORD_STATEMENT
+from webwhois.utils.file_cache import get_file_cache, get_file_response
+from webwhois.utils.streaming import get_buffer_response
+from webwhois.views import ContactDetailMixin, DomainDetailMixin, KeysetDetailMixin, NssetDetailMixin
 from webwhois.views.public_request_mixin import LoggerMixin
 
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
 
 class ServeRecordStatementView(LoggerMixin, View):
-    """Serve record statement PDF."""
+    """Serve record statement PDF.
+
+    PDF is streamed from the decoded buffer and the response supports range requests.
+    If the file cache is enabled, PDFs are cached until the registry object changes.
+    """
 
     service_name = "Web whois"
+    # Mixins used to load the registry object for the key of the file cache.
+    object_type_mixins = {
+        "contact": ContactDetailMixin,
+        "domain": DomainDetailMixin,
+        "keyset": KeysetDetailMixin,
+        "nsset": NssetDetailMixin,
+    }
 
     def _get_logging_request_name_and_properties(self, data):
         properties = [
@@ -58,6 +76,44 @@ class ServeRecordStatementView(LoggerMixin, View):
             log_request.result = "Ok"
         log_request.close(properties=properties_out, references=references)
 
+    def get_printout(self, object_type, handle):
+        """Return the record statement PDF from the backend."""
+        if object_type == "domain":
+            return RECORD_STATEMENT.domain_printout(handle, False)
+        elif object_type == "contact":
+            return RECORD_STATEMENT.contact_printout(handle, False)
+        elif object_type == "nsset":
+            return RECORD_STATEMENT.nsset_printout(handle)
+        elif object_type == "keyset":
+            return RECORD_STATEMENT.keyset_printout(handle)
+        else:
+            raise ValueError("Unknown object_type.")
+
+    def get_cache_key(self, object_type: str, handle: str) -> Optional[str]:
+        """Return key of the record statement in the file cache or `None` if it can't be cached.
+
+        The key contains a hash of the registry object as returned by the WHOIS, so it changes with the object,
+        e.g. with its time of change, expiration or statuses. Related objects aren't loaded to keep the lookup cheap.
+        If the object can't be loaded, e.g. the WHOIS is unavailable, the record statement isn't cached,
+        so its backend is asked either way.
+        """
+        mixin_class = self.object_type_mixins.get(object_type)
+        if mixin_class is None:
+            return None
+        context = {mixin_class._registry_objects_key: {}}  # type: Dict[str, Any]
+        try:
+            # Domain names are encoded by the mixin.
+            mixin_class.load_registry_object(context, handle)
+        except Exception:
+            WEBWHOIS_LOGGING.warning('Registry object of record statement of %s %r failed to load, it is not cached.',
+                                     object_type, handle, exc_info=True)
+            return None
+        registry_object = context[mixin_class._registry_objects_key].get(object_type)
+        if "server_exception" in context or registry_object is None:
+            # Let the record statement backend handle the errors.
+            return None
+        return 'record_statement:{}:{}'.format(object_type, get_etag(registry_object["detail"]))
+
     def get(self, request, object_type, handle):
         data = {
             'object_type': object_type,
@@ -65,17 +121,15 @@ class ServeRecordStatementView(LoggerMixin, View):
         }
         log_request = self.prepare_logging_request(data) if LOGGER else None
         error_object = None
+        file_cache = get_file_cache()
+        cache_key = file = None
         try:
-            if object_type == "domain":
-                pdf_content = RECORD_STATEMENT.domain_printout(handle, False)
-            elif object_type == "contact":
-                pdf_content = RECORD_STATEMENT.contact_printout(handle, False)
-            elif object_type == "nsset":
-                pdf_content = RECORD_STATEMENT.nsset_printout(handle)
-            elif object_type == "keyset":
-                pdf_content = RECORD_STATEMENT.keyset_printout(handle)
-            else:
-                raise ValueError("Unknown object_type.")
+            if file_cache is not None:
+                cache_key = self.get_cache_key(object_type, handle)
+                if cache_key is not None:
+                    file = file_cache.get(cache_key)
+            if file is None:
+                pdf_content = self.get_printout(object_type, handle)
         except (OBJECT_NOT_FOUND, OBJECT_DELETE_CANDIDATE) as err:
             error_object = err
             raise Http404
@@ -85,7 +139,16 @@ class ServeRecordStatementView(LoggerMixin, View):
         finally:
             self.finish_logging_request(log_request, error_object)
 
-        response = HttpResponse(pdf_content, content_type='application/pdf')
+        if file is not None:
+            response = get_file_response(request, file, file_cache.get_name(cache_key), 'application/pdf')
+        else:
+            if cache_key is not None:
+                try:
+                    file_cache.set(cache_key, [pdf_content]).close()
+                except OSError:
+                    WEBWHOIS_LOGGING.warning('Record statement of %s %r failed to be cached.', object_type, handle,
+                                             exc_info=True)
+            response = get_buffer_response(request, pdf_content, 'application/pdf')
         response['Content-Disposition'] = 'attachment; filename="record-statement-{0}-{1}.pdf"'.format(object_type,
                                                                                                        handle)
         return response
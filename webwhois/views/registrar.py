@@ -17,16 +17,19 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 import random
 import warnings
-from typing import Any, Iterable
+from typing import Any, FrozenSet, Mapping
 
-from django.http import Http404, HttpResponse
+from django.http import Http404, StreamingHttpResponse
 from django.utils.functional import SimpleLazyObject
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import TemplateView, View
 from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_NOT_FOUND
 
 from webwhois.utils import FILE_MANAGER, WHOIS
-from webwhois.views.base import BaseContextMixin, RegistryObjectMixin
+from webwhois.utils.file_cache import get_file_cache, get_file_response
+from webwhois.utils.registrar_catalogue import get_registrar_catalogue
+from webwhois.utils.streaming import FileDownloadIterator
+from webwhois.views.base import BaseContextMixin, PageCacheMixin, RegistryObjectMixin
 
 
 class RegistrarDetailMixin(RegistryObjectMixin):
@@ -38,9 +41,13 @@ class RegistrarDetailMixin(RegistryObjectMixin):
     @classmethod
     def load_registry_object(cls, context, handle):
         """Load registrar of the handle and append it into the context."""
+        catalogue = get_registrar_catalogue()
         try:
+            registrar = catalogue.registrar_index.get(handle) if catalogue else None
+            if registrar is None:
+                registrar = WHOIS.get_registrar_by_handle(handle)
             context[cls._registry_objects_key]["registrar"] = {
-                "detail": WHOIS.get_registrar_by_handle(handle),
+                "detail": registrar,
                 "label": _("Registrar"),
             }
         except OBJECT_NOT_FOUND:
@@ -52,7 +59,7 @@ class RegistrarDetailMixin(RegistryObjectMixin):
             context["server_exception"] = cls.message_invalid_handle(handle)
 
 
-class RegistrarDetailView(RegistrarDetailMixin, TemplateView):
+class RegistrarDetailView(PageCacheMixin, RegistrarDetailMixin, TemplateView):
     """View with details of a registrar."""
 
 
@@ -84,24 +91,45 @@ class RegistrarListMixin(BaseContextMixin):
 
         Results are filtered according to `group_name` attribute.
         """
+        catalogue = get_registrar_catalogue()
+        if catalogue is not None:
+            if not self.group_name:
+                return list(catalogue.registrars)
+            if self.group_name not in catalogue.group_registrars:
+                raise Http404('Registrar group {} not found.'.format(self.group_name))
+            return list(catalogue.group_registrars[self.group_name])
+
         registrars = WHOIS.get_registrars()
         if self.group_name:
-            groups = self.get_groups()
-            if self.group_name not in groups:
+            group_members = self.get_group_members()
+            if self.group_name not in group_members:
                 raise Http404('Registrar group {} not found.'.format(self.group_name))
-            members = groups[self.group_name].members  # type: Iterable[str]
+            members = group_members[self.group_name]
             registrars = [r for r in registrars if r.handle in members]
         return registrars
 
     def get_groups(self):
         """Return dictionary of registrar groups."""
         if self._groups is None:
+            catalogue = get_registrar_catalogue()
+            if catalogue is not None:
+                return catalogue.groups
             self._groups = {group.name: group for group in WHOIS.get_registrar_groups()}
         return self._groups
 
+    def get_group_members(self) -> Mapping[str, FrozenSet[str]]:
+        """Return handles of members of registrar groups by group names."""
+        catalogue = get_registrar_catalogue()
+        if catalogue is not None:
+            return catalogue.group_members
+        return {name: frozenset(group.members) for name, group in self.get_groups().items()}
+
     def get_certifications(self):
         """Return dictionary of registrar certifications."""
         if self._certifications is None:
+            catalogue = get_registrar_catalogue()
+            if catalogue is not None:
+                return catalogue.certifications
             self._certifications = {cert.registrar_handle: cert for cert in WHOIS.get_registrar_certification_list()}
         return self._certifications
 
@@ -138,6 +166,7 @@ class RegistrarListMixin(BaseContextMixin):
             registrars.append(self.get_registrar_context(reg))
 
         kwargs.setdefault("groups", self.get_groups())
+        kwargs.setdefault("group_members", self.get_group_members())
         kwargs.setdefault("registrars", self.sort_registrars(registrars))
         # Set is_retail and mark it as deprecated.
         kwargs.setdefault('is_retail', None)
@@ -152,22 +181,41 @@ class RegistrarListView(RegistrarListMixin, TemplateView):
 
 
 class DownloadEvalFileView(View):
+    """Download a registrar evaluation file.
+
+    The file is streamed in blocks as it is downloaded from the file manager.
+    If the file cache is enabled, files are stored in the cache and served from there.
+    """
+
     def _serve_file(self, file_id):
         # file_info: ccReg.FileInfo(id=1, name='test.txt', path='2015/12/9/1', mimetype='text/plain', filetype=6,
         #                           crdate='2015-12-09 16:16:28.598757', size=5L)
         file_info = FILE_MANAGER.info(file_id)
-        file_download = FILE_MANAGER.load(file_info.id)  # <ccReg._objref_FileDownload instance>
-        try:
-            file_data = file_download.download(file_info.size)
-        finally:
-            file_download.finalize_download()
+        file_cache = get_file_cache()
+        if file_cache is not None:
+            cache_key = 'evaluation_file:{}:{}'.format(file_info.id, file_info.size)
+            file = file_cache.get(cache_key)
+            if file is None:
+                file_download = FILE_MANAGER.load(file_info.id)
+                file = file_cache.set(cache_key, FileDownloadIterator(file_download, file_info.size))
+            response = get_file_response(self.request, file, file_cache.get_name(cache_key), file_info.mimetype)
+            response['Content-Disposition'] = 'attachment; filename="%s"' % file_info.name
+            return response
 
-        response = HttpResponse(content_type=file_info.mimetype)
+        file_download = FILE_MANAGER.load(file_info.id)  # <ccReg._objref_FileDownload instance>
+        response = StreamingHttpResponse(FileDownloadIterator(file_download, file_info.size),
+                                         content_type=file_info.mimetype)
         response['Content-Disposition'] = 'attachment; filename="%s"' % file_info.name
-        response.write(file_data)
+        response['Content-Length'] = str(file_info.size)
         return response
 
     def get(self, request, handle):
+        catalogue = get_registrar_catalogue()
+        if catalogue is not None:
+            if handle not in catalogue.certifications:
+                raise Http404
+            return self._serve_file(catalogue.certifications[handle].evaluation_file_id)
+
         for cert in WHOIS.get_registrar_certification_list():
             # cert: Registry.Whois.RegistrarCertification(registrar_handle='REG-FRED_A', score=2, evaluation_file_id=1L)
             if cert.registrar_handle == handle:
@@ -15,12 +15,17 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+from collections import OrderedDict
+from typing import Any, Dict
+
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import TemplateView
 
-from webwhois.utils import WHOIS
+from webwhois.utils.concurrency import call_all
+from webwhois.utils.handle_types import HANDLE_TYPE_CLASSIFIER
+from webwhois.utils.managed_zones import get_managed_zone_list
 from webwhois.views import ContactDetailMixin, DomainDetailMixin, KeysetDetailMixin, NssetDetailMixin
 from webwhois.views.base import RegistryObjectMixin
 from webwhois.views.registrar import RegistrarDetailMixin
@@ -31,15 +36,66 @@ class ResolveHandleTypeMixin(RegistryObjectMixin):
 
     multiple_entries_template = "webwhois/multiple_entries.html"
     object_type_name = "multiple"
+    # Mixins used to load the registry objects. The order defines the order in which the results are merged.
+    object_type_mixins = (ContactDetailMixin, NssetDetailMixin, KeysetDetailMixin, RegistrarDetailMixin,
+                          DomainDetailMixin)
+
+    @classmethod
+    def _load_partial_context(cls, mixin, handle):
+        """Load registry object of the handle by the mixin and return a separate context with the result."""
+        context = {cls._registry_objects_key: {}}  # type: Dict[str, Any]
+        mixin.load_registry_object(context, handle)
+        return context
+
+    @classmethod
+    def get_object_type_mixins(cls, handle):
+        """Return mixins of the object types the handle may belong to, see `WEBWHOIS_HANDLE_TYPE_RULES`."""
+        object_types = HANDLE_TYPE_CLASSIFIER.classify(
+            handle, [mixin.object_type_name for mixin in cls.object_type_mixins])
+        return [mixin for mixin in cls.object_type_mixins if mixin.object_type_name in object_types]
+
+    @classmethod
+    def get_fallback_mixins(cls, mixins, partial_contexts):
+        """Return mixins of the object types ruled out for the handle, if none of the looked up objects was found.
+
+        @param mixins: Mixins of the object types which were looked up.
+        @param partial_contexts: Their separate contexts with the results.
+        """
+        if len(mixins) == len(cls.object_type_mixins):
+            return []
+        if any(partial_context[cls._registry_objects_key] for partial_context in partial_contexts):
+            return []
+        HANDLE_TYPE_CLASSIFIER.record_fallback()
+        return [mixin for mixin in cls.object_type_mixins if mixin not in mixins]
+
+    @classmethod
+    def _order_partial_contexts(cls, partial_contexts):
+        """Return the separate contexts of the object types in the order of `object_type_mixins`."""
+        return [partial_contexts[mixin] for mixin in cls.object_type_mixins if mixin in partial_contexts]
 
     @classmethod
     def load_registry_object(cls, context, handle):
-        """Load all registry objects of the handle and append it into the context."""
-        ContactDetailMixin.load_registry_object(context, handle)
-        NssetDetailMixin.load_registry_object(context, handle)
-        KeysetDetailMixin.load_registry_object(context, handle)
-        RegistrarDetailMixin.load_registry_object(context, handle)
-        DomainDetailMixin.load_registry_object(context, handle)
+        """Load all registry objects of the handle and append it into the context.
+
+        Only object types the handle may belong to are looked up. If none of them is found, the other object types
+        are looked up as well.
+        Objects are loaded concurrently if `WEBWHOIS_CONCURRENT_LOOKUP` is enabled.
+        The results are merged in the order of `object_type_mixins` regardless of the order the lookups finished.
+        """
+        mixins = cls.get_object_type_mixins(handle)
+        partial_contexts = OrderedDict(zip(mixins, call_all((cls._load_partial_context, (mixin, handle))
+                                                            for mixin in mixins)))
+        fallback_mixins = cls.get_fallback_mixins(mixins, partial_contexts.values())
+        partial_contexts.update(zip(fallback_mixins, call_all((cls._load_partial_context, (mixin, handle))
+                                                              for mixin in fallback_mixins)))
+        cls._merge_partial_contexts(context, handle, cls._order_partial_contexts(partial_contexts))
+
+    @classmethod
+    def _merge_partial_contexts(cls, context, handle, partial_contexts):
+        """Merge the separate contexts of the object types into the context."""
+        for partial_context in partial_contexts:
+            context[cls._registry_objects_key].update(partial_context.pop(cls._registry_objects_key))
+            context.update(partial_context)
 
         if not context[cls._registry_objects_key]:
             # No object was found. Create a virtual server exception to render its template.
@@ -50,7 +106,7 @@ class ResolveHandleTypeMixin(RegistryObjectMixin):
                 "message": cls.message_with_handle_in_html(_("%s does not match any record."), handle),
                 "object_not_found": True,
             }
-            context["managed_zone_list"] = WHOIS.get_managed_zone_list()
+            context["managed_zone_list"] = get_managed_zone_list()
 
     def load_related_objects(self, context):
         """Prepare url for redirect to the registry object type."""